@@ -0,0 +1,80 @@
+"""
+Per-request client setup overhead: building clients per request vs reusing them.
+
+"per-request" reproduces what each route used to do: construct a
+RecipeParser (load_dotenv, a new OpenAI client and a new boto3 resource)
+and make one DynamoDB read. "reused" makes the same read through the
+app's process-wide clients. DynamoDB is served by moto, so the numbers
+isolate client construction rather than network latency; in production
+the per-request path also pays a new TLS handshake per request.
+
+    python benchmarks/client_overhead.py --iterations 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import boto3  # noqa: E402
+from moto import mock_aws  # noqa: E402
+
+from clients import ProcessLocal  # noqa: E402
+from recipe_parser import RecipeParser  # noqa: E402
+
+
+def time_per_call(func, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(statistics.median(timings) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        os.environ.setdefault(name, "benchmark")
+
+    with mock_aws():
+        boto3.resource("dynamodb", region_name="us-east-1").create_table(
+            TableName="recipes",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+        def per_request():
+            recipe_parser = RecipeParser(storage_type="dynamodb")
+            recipe_parser.client  # noqa: B018 - routes always built the OpenAI client
+            recipe_parser.recipe_exists("https://example.com", "bench@example.com")
+
+        shared = ProcessLocal(lambda: RecipeParser(storage_type="dynamodb"))
+        shared.get().client  # noqa: B018
+
+        def reused():
+            shared.get().recipe_exists("https://example.com", "bench@example.com")
+
+        results = {
+            "iterations": args.iterations,
+            "per_request": time_per_call(per_request, args.iterations),
+            "reused": time_per_call(reused, args.iterations),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Synthetic corpus of recipe pages for the benchmarks.
+
+Real saved pages can be used instead by pointing a benchmark's --corpus
+option at a directory of .html files. Generated pages mimic large recipe
+blogs: a normal <head>, a recipe, and one to three megabytes of ad and
+navigation markup.
+"""
+
+import json
+import random
+from pathlib import Path
+from typing import List
+
+INGREDIENTS = [
+    ("2 1/4", "cups", "all-purpose flour"),
+    ("1", "tsp", "baking soda"),
+    ("1", "cup", "butter, softened"),
+    ("3/4", "cup", "sugar"),
+    ("2", "", "eggs"),
+    ("2", "cups", "chocolate chips"),
+]
+
+INSTRUCTIONS = [
+    "Preheat oven to 375°F.",
+    "Mix flour and baking soda.",
+    "Cream butter and sugar.",
+    "Beat in eggs.",
+    "Stir in chocolate chips.",
+    "Bake for 10 minutes.",
+]
+
+
+def recipe_json_ld(name: str) -> dict:
+    return {
+        "@context": "https://schema.org",
+        "@type": "Recipe",
+        "name": name,
+        "recipeYield": "24 cookies",
+        "recipeIngredient": [" ".join(filter(None, i)) for i in INGREDIENTS],
+        "recipeInstructions": [
+            {"@type": "HowToStep", "text": step} for step in INSTRUCTIONS
+        ],
+        "nutrition": {
+            "@type": "NutritionInformation",
+            "calories": "210 kcal",
+            "fatContent": "11 g",
+            "carbohydrateContent": "27 g",
+            "proteinContent": "2 g",
+        },
+    }
+
+
+def make_page(
+    index: int,
+    size_bytes: int,
+    with_description: bool = True,
+    with_json_ld: bool = False,
+) -> str:
+    """
+    Build one synthetic recipe page of roughly size_bytes.
+
+    Args:
+        index: Page number, used to vary names and seed the filler
+        size_bytes: Approximate size of the page
+        with_description: Include a meta description in <head>
+        with_json_ld: Include a schema.org Recipe JSON-LD block
+    """
+    rng = random.Random(index)
+    name = f"Chocolate Chip Cookies #{index}"
+    head = [
+        f"<title>{name}</title>",
+        '<meta charset="utf-8">',
+        f'<meta property="og:image" content="https://example.com/images/{index}.jpg">',
+    ]
+    if with_description:
+        head.append(
+            f'<meta name="description" content="{name}: crisp edges, chewy middle.">'
+        )
+    if with_json_ld:
+        head.append(
+            '<script type="application/ld+json">'
+            + json.dumps(recipe_json_ld(name))
+            + "</script>"
+        )
+    head.extend(
+        f'<link rel="preload" href="https://cdn.example.com/{i}.js">' for i in range(20)
+    )
+
+    recipe = (
+        f"<article><h1>{name}</h1><h2>Ingredients</h2><ul>"
+        + "".join(f"<li>{' '.join(filter(None, i))}</li>" for i in INGREDIENTS)
+        + "</ul><h2>Instructions</h2><ol>"
+        + "".join(f"<li>{step}</li>" for step in INSTRUCTIONS)
+        + "</ol></article>"
+    )
+
+    filler = []
+    filler_size = 0
+    while filler_size < size_bytes:
+        block = (
+            f'<div class="ad-slot" id="ad-{rng.randrange(10**6)}">'
+            f'<iframe src="https://ads.example.com/{rng.randrange(10**6)}"></iframe>'
+            f"<p>{'Sponsored content. ' * rng.randint(5, 30)}</p></div>"
+            f'<nav><a href="/page/{rng.randrange(1000)}">Related recipe</a></nav>'
+        )
+        filler.append(block)
+        filler_size += len(block)
+
+    half = len(filler) // 2
+    return (
+        f"<!DOCTYPE html><html><head>{''.join(head)}</head><body>"
+        + "".join(filler[:half])
+        + recipe
+        + "".join(filler[half:])
+        + "</body></html>"
+    )
+
+
+def load_corpus(
+    corpus_dir: str = None,
+    pages: int = 20,
+    min_bytes: int = 1024 * 1024,
+    max_bytes: int = 3 * 1024 * 1024,
+    with_json_ld: bool = False,
+) -> List[str]:
+    """
+    Load saved pages from corpus_dir, or generate a synthetic corpus.
+
+    Generated corpora alternate pages with and without a meta description
+    so both extraction paths are exercised.
+    """
+    if corpus_dir:
+        return [
+            path.read_text(errors="replace")
+            for path in sorted(Path(corpus_dir).glob("*.html"))
+        ]
+    rng = random.Random(0)
+    return [
+        make_page(
+            i,
+            rng.randint(min_bytes, max_bytes),
+            with_description=i % 2 == 0,
+            with_json_ld=with_json_ld,
+        )
+        for i in range(pages)
+    ]
@@ -0,0 +1,79 @@
+"""
+Microbenchmark for recipe content extraction.
+
+Compares the previous approach (a full BeautifulSoup html.parser tree per
+page, then find()) with html_extractor.extract_recipe_content over a
+corpus of pages, reporting time per page and peak Python memory.
+
+    python benchmarks/extraction.py --pages 20
+    python benchmarks/extraction.py --corpus path/to/saved/pages
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from corpus import load_corpus  # noqa: E402
+
+from html_extractor import BS4_PARSER, extract_recipe_content  # noqa: E402
+
+
+def full_parse(html):
+    soup = BeautifulSoup(html, "html.parser")
+    description = soup.find("meta", attrs={"name": "description"})
+    return (
+        (description.get("content") if description else None)
+        or soup.find("article")
+        or soup.find("main")
+        or soup.find("div", class_="content")
+    )
+
+
+def measure(func, pages):
+    timings = []
+    for html in pages:
+        started = time.perf_counter()
+        func(html)
+        timings.append(time.perf_counter() - started)
+
+    # Memory is measured in a separate pass since tracing slows parsing down
+    tracemalloc.start()
+    for html in pages:
+        func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "mean_ms": round(statistics.mean(timings) * 1000, 2),
+        "p50_ms": round(statistics.median(timings) * 1000, 2),
+        "max_ms": round(max(timings) * 1000, 2),
+        "peak_mem_mb": round(peak / 1024 / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", help="Directory of saved .html pages")
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus, pages=args.pages)
+    results = {
+        "pages": len(pages),
+        "mean_page_kb": round(sum(map(len, pages)) / len(pages) / 1024),
+        "bs4_parser": BS4_PARSER,
+        "full_parse": measure(full_parse, pages),
+        "extract_recipe_content": measure(extract_recipe_content, pages),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+"What can I cook" queries: a Python loop over every recipe vs IngredientIndex.
+
+Generates recipes drawing their ingredients from a vocabulary with a
+skewed (Zipf-like) popularity, so common ingredients such as eggs appear
+in many recipes, as in real collections. "loop" is what answering the
+query took before the index: normalize and compare every recipe's
+ingredient list, then sort. The index is timed once cold (first query,
+loading the postings from SQLite) and then warm.
+
+    python benchmarks/ingredient_query.py --recipes 100000 --queries 50
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ingredient_index import (  # noqa: E402
+    PANTRY_STAPLES,
+    IngredientIndex,
+    normalize_ingredient,
+)
+
+
+def make_recipes(count, vocabulary_size, rng):
+    vocabulary = [f"ingredient {i}" for i in range(vocabulary_size)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary_size)]
+    for i in range(count):
+        names = set(rng.choices(vocabulary, weights, k=rng.randint(4, 14)))
+        yield {
+            "id": f"recipe-{i}",
+            "name": f"Recipe {i}",
+            "user_email": f"user{i % 50}@example.com",
+            "ingredients": [{"name": name} for name in names],
+        }
+
+
+def loop_query(recipes, on_hand, limit=20):
+    have = {normalize_ingredient(name) for name in on_hand}
+    ranked = []
+    for recipe in recipes:
+        names = {normalize_ingredient(i["name"]) for i in recipe["ingredients"]}
+        names.discard("")
+        matched_have = len(names & have)
+        if not matched_have:
+            continue
+        matched = matched_have + len(names & (PANTRY_STAPLES - have))
+        ranked.append((-matched / len(names), len(names) - matched, recipe["id"]))
+    ranked.sort()
+    return ranked[:limit]
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--vocabulary", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--loop-queries", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    recipes = list(make_recipes(args.recipes, args.vocabulary, rng))
+    queries = [
+        [f"ingredient {rng.randrange(200)}" for _ in range(rng.randint(3, 10))]
+        for _ in range(args.queries)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "ingredients.sqlite3")
+        start = time.perf_counter()
+        IngredientIndex(path).rebuild(recipes)
+        build_seconds = time.perf_counter() - start
+
+        index = IngredientIndex(path)
+        start = time.perf_counter()
+        index.query(queries[0])
+        cold_seconds = time.perf_counter() - start
+
+        warm = []
+        for query in queries:
+            start = time.perf_counter()
+            index.query(query)
+            warm.append(time.perf_counter() - start)
+
+    loop = []
+    for query in queries[: args.loop_queries]:
+        start = time.perf_counter()
+        loop_query(recipes, query)
+        loop.append(time.perf_counter() - start)
+
+    print(
+        json.dumps(
+            {
+                "recipes": args.recipes,
+                "index_build_seconds": round(build_seconds, 2),
+                "index_cold_query_ms": round(cold_seconds * 1000, 1),
+                "index": percentiles(warm),
+                "loop": percentiles(loop),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
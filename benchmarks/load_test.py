@@ -0,0 +1,113 @@
+"""
+Load benchmark for concurrent /scrape requests.
+
+Starts a local origin that serves a page after a configurable delay
+(standing in for a slow recipe site) and fires concurrent POST /scrape
+requests for distinct URLs on it at a running recime server. The page has
+no recipe content, so each scrape is bound by the page download and ends
+in a 404 without calling OpenAI.
+
+Compare worker classes by starting the server once per mode, e.g.
+
+    GUNICORN_WORKER_CLASS=sync gunicorn --config gunicorn.conf.py "web_scraper:create_app('testing')"
+    python benchmarks/load_test.py --requests 200 --concurrency 100
+
+    GUNICORN_WORKER_CLASS=gevent gunicorn --config gunicorn.conf.py "web_scraper:create_app('testing')"
+    python benchmarks/load_test.py --requests 200 --concurrency 100
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+
+def start_slow_origin(delay: float) -> ThreadingHTTPServer:
+    """Serve an empty HTML page after `delay` seconds on a free local port."""
+
+    class SlowHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = b"<html><head><title>Slow page</title></head><body></body></html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--server", default="http://127.0.0.1:8001")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--origin-delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    origin = start_slow_origin(args.origin_delay)
+    origin_url = f"http://127.0.0.1:{origin.server_address[1]}"
+    session = requests.Session()
+    session.mount(
+        "http://", requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    )
+
+    def scrape(_):
+        started = time.perf_counter()
+        response = session.post(
+            f"{args.server}/scrape",
+            json={
+                "url": f"{origin_url}/{uuid.uuid4().hex}",
+                "user_email": "bench@example.com",
+            },
+            timeout=120,
+        )
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(scrape, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _ in results]
+    statuses = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    print(
+        json.dumps(
+            {
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "origin_delay": args.origin_delay,
+                "elapsed_s": round(elapsed, 3),
+                "throughput_rps": round(args.requests / elapsed, 2),
+                "p50_s": round(statistics.median(latencies), 3),
+                "p95_s": round(percentile(latencies, 95), 3),
+                "statuses": statuses,
+            },
+            indent=2,
+        )
+    )
+    origin.shutdown()
+
+
+if __name__ == "__main__":
+    main()
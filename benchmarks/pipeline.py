@@ -0,0 +1,326 @@
+"""
+Offline end-to-end benchmark of POST /scrape: fetch, extract, parse, store.
+
+Everything runs locally and reproducibly: the corpus (synthetic pages, or
+saved .html files with --corpus) is served by a local origin, OpenAI is
+replaced by a local server answering chat completions after
+--llm-latency-ms, and recipes are written to moto's in-memory DynamoDB.
+The app itself runs in a threaded local server and is driven by
+--concurrency clients, each scraping distinct URLs so no request is
+answered from a cache or a shared in-flight scrape.
+
+Reports latency percentiles, throughput, peak RSS of the process (app,
+servers and clients together) and per-stage percentiles read from each
+response's Server-Timing header. Results can be written as JSON and
+compared with an earlier run, failing on regressions:
+
+    python benchmarks/pipeline.py --requests 200 --concurrency 16 --output before.json
+    python benchmarks/pipeline.py --requests 200 --concurrency 16 --baseline before.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import boto3  # noqa: E402
+import requests  # noqa: E402
+from corpus import INGREDIENTS, INSTRUCTIONS, load_corpus  # noqa: E402
+from moto import mock_aws  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from config import TestingConfig, config  # noqa: E402
+from dynamodb_store import create_recipes_table  # noqa: E402
+from web_scraper import create_app  # noqa: E402
+
+# Compared with --baseline: (result key, True if higher is better)
+COMPARED = [
+    ("latency.p50_ms", False),
+    ("latency.p95_ms", False),
+    ("latency.p99_ms", False),
+    ("throughput_rps", True),
+    ("peak_rss_mb", False),
+]
+
+
+def start_server(handler_class) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_origin(pages) -> ThreadingHTTPServer:
+    """Serve page i of the corpus at /page/<i>/<anything>."""
+
+    class OriginHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            body = pages[int(parts[1]) % len(pages)].encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return start_server(OriginHandler)
+
+
+def start_fake_openai(latency: float) -> ThreadingHTTPServer:
+    """Answer chat completions with a fixed recipe after `latency` seconds."""
+    recipe = {
+        "name": "Chocolate Chip Cookies",
+        "servings": 24,
+        "calories": 210,
+        "fat": {"amount": 11, "unit": "g"},
+        "carbs": {"amount": 27, "unit": "g"},
+        "protein": {"amount": 2, "unit": "g"},
+        "ingredients": [
+            {"quantity": quantity, "unit": unit, "name": name}
+            for quantity, unit, name in INGREDIENTS
+        ],
+        "instructions": INSTRUCTIONS,
+    }
+
+    class OpenAIHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = " ".join(message["content"] for message in request["messages"])
+            time.sleep(latency)
+            content = json.dumps(recipe)
+            body = json.dumps(
+                {
+                    "id": "chatcmpl-bench",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": len(prompt) // 4,
+                        "completion_tokens": len(content) // 4,
+                        "total_tokens": (len(prompt) + len(content)) // 4,
+                    },
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return start_server(OpenAIHandler)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(pct(95) * 1000, 2),
+        "p99_ms": round(pct(99) * 1000, 2),
+    }
+
+
+def parse_server_timing(header):
+    stages = {}
+    for part in filter(None, (part.strip() for part in header.split(","))):
+        name, _, duration = part.partition(";dur=")
+        if duration:
+            stages[name] = float(duration) / 1000
+    return stages
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(result, baseline, tolerance):
+    """Return a description of each compared value that got worse by more than tolerance."""
+    regressions = []
+    for key, higher_is_better in COMPARED:
+        section, _, name = key.rpartition(".")
+        old = (baseline.get(section, {}) if section else baseline).get(name)
+        new = (result.get(section, {}) if section else result).get(name)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{key}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def run(args, pages):
+    class BenchmarkConfig(TestingConfig):
+        DEBUG = False
+        LLM_CACHE_ENABLED = False
+        FETCH_PER_HOST_LIMIT = args.concurrency
+
+    config["benchmark"] = BenchmarkConfig
+    app = create_app("benchmark")
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    app_url = f"http://127.0.0.1:{server.server_port}"
+
+    origin = start_origin(pages)
+    origin_url = f"http://127.0.0.1:{origin.server_address[1]}"
+    session = requests.Session()
+    session.mount(
+        "http://", requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    )
+
+    def scrape(n):
+        started = time.perf_counter()
+        response = session.post(
+            f"{app_url}/scrape",
+            json={
+                "url": f"{origin_url}/page/{n % len(pages)}/{n}",
+                "user_email": "bench@example.com",
+            },
+            timeout=120,
+        )
+        return (
+            time.perf_counter() - started,
+            response.status_code,
+            parse_server_timing(response.headers.get("Server-Timing", "")),
+        )
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(scrape, range(-args.warmup, 0)))
+        started = time.perf_counter()
+        results = list(executor.map(scrape, range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    server.shutdown()
+    origin.shutdown()
+
+    statuses, stages = {}, {}
+    for _, status, timings in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+        for stage, seconds in timings.items():
+            stages.setdefault(stage, []).append(seconds)
+    return {
+        "latency": percentiles([latency for latency, _, _ in results]),
+        "throughput_rps": round(args.requests / elapsed, 2),
+        "elapsed_s": round(elapsed, 3),
+        "statuses": statuses,
+        "stages": {stage: percentiles(samples) for stage, samples in stages.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--page-kb", type=int, default=256)
+    parser.add_argument("--corpus", help="Directory of saved .html pages")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Relative change counted as a regression",
+    )
+    args = parser.parse_args()
+
+    pages = load_corpus(
+        args.corpus,
+        pages=args.pages,
+        min_bytes=args.page_kb * 1024 // 2,
+        max_bytes=args.page_kb * 1024,
+    )
+    fake_openai = start_fake_openai(args.llm_latency_ms / 1000)
+    os.environ["OPENAI_BASE_URL"] = (
+        f"http://127.0.0.1:{fake_openai.server_address[1]}/v1"
+    )
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        os.environ[name] = "benchmark"
+
+    # Keep stdout for the results: the app logs every request, and the
+    # parser prints every save
+    logging.getLogger().setLevel(logging.WARNING)
+    with mock_aws(), redirect_stdout(sys.stderr):
+        create_recipes_table(
+            boto3.resource("dynamodb", region_name="us-east-1"), "recipes"
+        )
+        result = run(args, pages)
+    fake_openai.shutdown()
+
+    result = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "settings": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "llm_latency_ms": args.llm_latency_ms,
+            "pages": len(pages),
+            "corpus": args.corpus or f"synthetic, up to {args.page_kb} KB",
+        },
+        **result,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline.get("settings") != result["settings"]:
+            print(
+                f"Warning: baseline settings differ: {baseline.get('settings')}",
+                file=sys.stderr,
+            )
+        regressions = compare(result, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Sequential scan vs parallel segmented scan for a full-table export.
+
+Exports a table three ways: the single-threaded scan loop GET /recipes
+used to run (pages read one after another into a list), SegmentedExporter
+with one segment, and SegmentedExporter with --segments parallel segments.
+
+moto scans the whole table in Python on every call, so it can't show how
+DynamoDB behaves at scale. The table here is an in-memory stand-in that
+implements Scan's paging and segments, and adds --latency-ms to every call
+plus --ms-per-mb for the page transfer: the waits parallel segments overlap
+against real DynamoDB.
+
+    python benchmarks/scan_export.py --items 100000 --segments 8 --latency-ms 20
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dynamodb_store import iter_recipes  # noqa: E402
+from recipe_export import SegmentedExporter  # noqa: E402
+
+# Approximate stored size of one recipe_item(), used for transfer time
+ITEM_BYTES = 600
+
+
+class SimulatedTable:
+    """In-memory table answering scan calls with DynamoDB's paging and segments."""
+
+    name = "recipes"
+
+    def __init__(self, items, latency, seconds_per_mb, page_size):
+        self.items = items
+        self.latency = latency
+        self.seconds_per_mb = seconds_per_mb
+        self.page_size = page_size
+        # Segments split the items by key hash, like DynamoDB's partitions
+        self._positions = {item["id"]: i for i, item in enumerate(items)}
+
+    def scan(self, **kwargs):
+        segment = kwargs.get("Segment", 0)
+        total = kwargs.get("TotalSegments", 1)
+        limit = kwargs.get("Limit", self.page_size)
+        start_key = kwargs.get("ExclusiveStartKey")
+        position = self._positions[start_key["id"]] + 1 if start_key else 0
+
+        page = []
+        while position < len(self.items) and len(page) < limit:
+            item = self.items[position]
+            if _segment_of(item["id"], total) == segment:
+                page.append(item)
+            position += 1
+        time.sleep(self.latency + len(page) * ITEM_BYTES / 1e6 * self.seconds_per_mb)
+
+        response = {"Items": page, "ConsumedCapacity": {"CapacityUnits": 0.5}}
+        if position < len(self.items):
+            # Real scans stop at the page limit, so the key is the last item read
+            response["LastEvaluatedKey"] = {"id": self.items[position - 1]["id"]}
+        return response
+
+
+def _segment_of(key, total):
+    return int(hashlib.md5(key.encode()).hexdigest(), 16) % total
+
+
+def recipe_item(i):
+    return {
+        "id": f"recipe-{i:07d}",
+        "name": f"Recipe {i}",
+        "user_email": f"user{i % 100}@example.com",
+        "created_at": 1_700_000_000 + i,
+        "updated_at": 1_700_000_000 + i,
+        "url": f"https://example.com/recipes/{i}",
+        "servings": 4,
+        "calories": 350,
+        "ingredients": [
+            {"name": "flour", "quantity": 2, "unit": "cup"},
+            {"name": "sugar", "quantity": 1, "unit": "cup"},
+            {"name": "eggs", "quantity": 2, "unit": ""},
+        ],
+        "instructions": ["Mix everything.", "Bake for 30 minutes."],
+    }
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return round(time.perf_counter() - start, 3), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--segments", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument(
+        "--ms-per-mb", type=float, default=100, help="Transfer time per MB read"
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=1000, help="Items per scan call"
+    )
+    args = parser.parse_args()
+
+    table = SimulatedTable(
+        [recipe_item(i) for i in range(args.items)],
+        args.latency_ms / 1000,
+        args.ms_per_mb / 1000,
+        args.page_size,
+    )
+    results = {"items": args.items}
+    seconds, items = timed(lambda: list(iter_recipes(table)))
+    results["sequential_scan"] = {"seconds": seconds, "items": len(items)}
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name, segments in (("one_segment", 1), ("parallel", args.segments)):
+            summary = SegmentedExporter(
+                table,
+                os.path.join(output_dir, name),
+                total_segments=segments,
+                page_size=args.page_size,
+            ).run()
+            results[name] = {"segments": segments, **summary}
+
+    results["speedup_vs_sequential"] = round(
+        results["sequential_scan"]["seconds"] / results["parallel"]["seconds"], 2
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
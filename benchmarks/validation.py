@@ -0,0 +1,116 @@
+"""
+Per-recipe CPU time of turning an OpenAI response into a /scrape response body.
+
+"validate" is the path the app used to take: json.loads the message
+content, validate a BaseRecipe, dump it to a dict, validate the dict again
+as a Recipe, dump that for jsonify and encode it with json.dumps. "lean" is
+the current path: validate the content once with model_validate_json (in
+the app the SDK has usually done this already), build the Recipe with
+model_construct and serialize it with pydantic-core. Times are CPU time
+per recipe, for recipes of each --ingredients size.
+
+    python benchmarks/validation.py --ingredients 10 50 200 --iterations 2000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ingredient_units import normalize_ingredients  # noqa: E402
+from models import BaseRecipe, DecimalEncoder, Recipe, to_json  # noqa: E402
+
+METADATA = {
+    "url": "https://example.com/recipe",
+    "image_url": "https://example.com/recipe.jpg",
+    "user_email": "bench@example.com",
+    "parse_method": "llm",
+}
+
+
+def make_content(ingredients: int) -> str:
+    """Message content as OpenAI returns it, for a recipe of this many ingredients."""
+    return json.dumps(
+        {
+            "name": "Big Batch Chili",
+            "servings": 12,
+            "calories": "410",
+            "fat": {"amount": "18", "unit": "g"},
+            "carbs": {"amount": "35", "unit": "g"},
+            "protein": {"amount": "28", "unit": "g"},
+            "ingredients": [
+                {"quantity": f"{i % 4 + 1} 1/2", "unit": "cups", "name": f"item {i}"}
+                for i in range(ingredients)
+            ],
+            "instructions": [f"Step {i + 1}: stir well." for i in range(20)],
+        }
+    )
+
+
+def validate(content: str) -> str:
+    base_recipe = BaseRecipe.model_validate(json.loads(content))
+    recipe_dict = base_recipe.model_dump()
+    recipe_dict.update(
+        {
+            **METADATA,
+            "created_at": int(time.time()),
+            "updated_at": int(time.time()),
+            "normalized_ingredients": [
+                item.model_dump()
+                for item in normalize_ingredients(base_recipe.ingredients)
+            ],
+        }
+    )
+    recipe = Recipe.model_validate(recipe_dict)
+    return json.dumps([recipe.model_dump()], cls=DecimalEncoder)
+
+
+def lean(content: str) -> str:
+    base_recipe = BaseRecipe.model_validate_json(content)
+    now = int(time.time())
+    recipe = Recipe.model_construct(
+        **dict(base_recipe),
+        **METADATA,
+        created_at=now,
+        updated_at=now,
+        normalized_ingredients=normalize_ingredients(base_recipe.ingredients),
+    )
+    return to_json([recipe])
+
+
+def cpu_per_call(func, content: str, iterations: int, repeats: int = 5) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.process_time()
+        for _ in range(iterations):
+            func(content)
+        samples.append((time.process_time() - started) / iterations)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ingredients", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    for ingredients in args.ingredients:
+        content = make_content(ingredients)
+        # Both paths must produce the same response body
+        expected = json.loads(validate(content))[0]["ingredients"]
+        assert json.loads(lean(content))[0]["ingredients"] == expected
+        iterations = max(1, args.iterations * 10 // max(ingredients, 10))
+        before = cpu_per_call(validate, content, iterations)
+        after = cpu_per_call(lean, content, iterations)
+        print(
+            f"{ingredients:>4} ingredients: validate {before * 1e6:8.1f} us, "
+            f"lean {after * 1e6:8.1f} us ({before / after:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import Config
+from fetcher import PageFetcher
+from html_extractor import extract_recipe_content
+from models import DecimalEncoder, StructuredRecipe
+from recipe_parser import RecipeParser
+from structured_data import extract_structured_recipe
+
+_HREF = re.compile(r"""<a\s[^>]*href\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+
+# Checkpointed statuses that a resumed import doesn't repeat
+FINISHED_STATUSES = ("parsed", "skipped")
+
+
+def read_urls(text: str) -> List[str]:
+    """
+    Read URLs from a plain list (one per line) or a browser bookmarks export.
+
+    Blank lines, "#" comments and non-http(s) links are ignored, and
+    duplicates are dropped keeping the first occurrence.
+
+    Args:
+        text: File contents
+
+    Returns:
+        List of URLs in input order
+    """
+    if re.search(r"<a\s", text, re.IGNORECASE):
+        candidates = _HREF.findall(text)
+    else:
+        candidates = [line.strip() for line in text.splitlines()]
+    urls = [
+        url
+        for url in candidates
+        if url
+        and not url.startswith("#")
+        and urllib.parse.urlsplit(url).scheme in ("http", "https")
+    ]
+    return list(dict.fromkeys(urls))
+
+
+class Checkpoint:
+    """JSON Lines log of finished URLs, so an interrupted import can resume."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the checkpoint, creating its directory if needed.
+
+        Args:
+            path: Path to the checkpoint file
+        """
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Terminate a line cut short by a crash so new results start on their own line
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb+") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
+    def finished(self) -> Dict[str, str]:
+        """
+        Read the URLs that don't need to be imported again.
+
+        Returns:
+            dict: URL -> status ("parsed" or "skipped")
+        """
+        finished = {}
+        if not os.path.exists(self.path):
+            return finished
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # The last line may be cut short by a crash
+                    continue
+                if event.get("status") in FINISHED_STATUSES:
+                    finished[event["url"]] = event["status"]
+                else:
+                    finished.pop(event.get("url"), None)
+        return finished
+
+    def record(self, event: dict):
+        """
+        Append a per-URL result.
+
+        Args:
+            event: Result event with "url" and "status"
+        """
+        line = json.dumps(event, cls=DecimalEncoder) + "\n"
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class HostPacer:
+    """Spaces out requests to each host by a minimum interval."""
+
+    def __init__(self, min_interval: float = 1.0):
+        """
+        Initialize the pacer.
+
+        Args:
+            min_interval: Minimum seconds between two requests to the same host
+        """
+        self.min_interval = min_interval
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        """
+        Block until a request to url's host is allowed.
+
+        Args:
+            url: URL about to be fetched
+        """
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class BulkImporter:
+    """Imports many recipe URLs, fetching pages concurrently and parsing in batches.
+
+    Pages are fetched by a thread pool, paced per host. As pages arrive
+    they are handed to RecipeParser.parse_recipes_detailed in batches, so
+    OpenAI concurrency stays bounded by the parser and storage writes are
+    batched, while later pages keep downloading.
+    """
+
+    def __init__(
+        self,
+        fetcher: PageFetcher,
+        parser: RecipeParser,
+        fetch_workers: int = 8,
+        host_delay: float = 1.0,
+        batch_size: Optional[int] = None,
+    ):
+        """
+        Initialize the importer.
+
+        Args:
+            fetcher: Fetcher used for every page
+            parser: Parser that parses and stores the recipes
+            fetch_workers: Pages fetched at once
+            host_delay: Minimum seconds between requests to the same host
+            batch_size: Pages per parse batch (defaults to 4x the parser's concurrency)
+        """
+        self.fetcher = fetcher
+        self.parser = parser
+        self.fetch_workers = fetch_workers
+        self.pacer = HostPacer(host_delay)
+        self.batch_size = batch_size or max(1, parser.max_concurrency) * 4
+
+    def run(
+        self,
+        urls: Iterable[str],
+        user_email: str,
+        force: bool = False,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> Iterator[dict]:
+        """
+        Import every URL for user_email, yielding progress events as it goes.
+
+        Events are dicts with an "event" key:
+        - "start": total URLs and how many were already finished in the checkpoint
+        - "result": index, url and status ("parsed", "skipped" or "failed"),
+          plus the recipe name or the error
+        - "done": counts per status
+
+        Args:
+            urls: URLs to import
+            user_email: Email of the user who owns the recipes
+            force: Re-parse and overwrite recipes that already exist
+            checkpoint: Checkpoint to resume from and record results in (optional)
+
+        Yields:
+            Progress events
+        """
+        urls = list(dict.fromkeys(urls))
+        finished = checkpoint.finished() if checkpoint is not None else {}
+        todo = [(i, url) for i, url in enumerate(urls) if url not in finished]
+        counts = Counter()
+        yield {"event": "start", "total": len(urls), "resumed": len(urls) - len(todo)}
+
+        def result(index, url, status, **details):
+            event = {"event": "result", "index": index, "url": url, "status": status}
+            event.update(details)
+            counts[status] += 1
+            if checkpoint is not None:
+                checkpoint.record(event)
+            return event
+
+        if not force and todo:
+            exists = self.parser.recipes_exist(
+                [url for _, url in todo], [user_email] * len(todo)
+            )
+            for (i, url), stored in zip(todo, exists):
+                if stored:
+                    yield result(i, url, "skipped")
+            todo = [item for item, stored in zip(todo, exists) if not stored]
+
+        executor = ThreadPoolExecutor(max_workers=max(1, self.fetch_workers))
+        try:
+            futures = {
+                executor.submit(self._load, url, force): (i, url) for i, url in todo
+            }
+            ready = []
+            for future in as_completed(futures):
+                i, url = futures[future]
+                try:
+                    ready.append((i, url, *future.result()))
+                except Exception as e:
+                    yield result(i, url, "failed", error=str(e))
+                    continue
+                if len(ready) >= self.batch_size:
+                    yield from self._parse(ready, user_email, force, result)
+                    ready = []
+            if ready:
+                yield from self._parse(ready, user_email, force, result)
+        finally:
+            # Stop fetching if the consumer went away (e.g. the client disconnected)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        yield {
+            "event": "done",
+            **{status: counts[status] for status in FINISHED_STATUSES + ("failed",)},
+        }
+
+    def _load(
+        self, url: str, force: bool = False
+    ) -> Tuple[Optional[str], Optional[str], Optional[StructuredRecipe]]:
+        self.pacer.wait(url)
+        # Forced imports download the page again rather than use the cache
+        html = self.fetcher.fetch(url, use_cache=not force)
+        content, image_url = extract_recipe_content(html)
+        structured = extract_structured_recipe(html)
+        if not content and not structured:
+            raise ValueError("No recipe content found")
+        if structured is not None:
+            image_url = image_url or structured.image_url
+        return content, image_url, structured
+
+    def _parse(
+        self, ready: list, user_email: str, force: bool, result
+    ) -> Iterator[dict]:
+        indexes, urls, contents, image_urls, structured = zip(*ready)
+        outcomes = self.parser.parse_recipes_detailed(
+            list(contents),
+            list(urls),
+            [user_email] * len(ready),
+            list(image_urls),
+            force=force,
+            structured=list(structured),
+        )
+        for outcome in outcomes:
+            i = indexes[outcome.index]
+            if outcome.status == "parsed":
+                yield result(i, outcome.url, "parsed", name=outcome.recipe.name)
+            elif outcome.status == "failed":
+                yield result(i, outcome.url, "failed", error=outcome.error)
+            else:
+                yield result(i, outcome.url, outcome.status)
+
+
+def format_sse(event: dict) -> str:
+    """
+    Format a progress event as a server-sent event.
+
+    Args:
+        event: Progress event from BulkImporter.run
+
+    Returns:
+        str: SSE message using the event type as the SSE event name
+    """
+    return f"event: {event['event']}\ndata: {json.dumps(event, cls=DecimalEncoder)}\n\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scrape many recipe URLs, printing progress as NDJSON"
+    )
+    parser.add_argument(
+        "source", help="File of URLs (one per line) or a bookmarks export; - for stdin"
+    )
+    parser.add_argument("--user-email", required=True)
+    parser.add_argument("--force", action="store_true", help="Re-parse stored recipes")
+    parser.add_argument("--checkpoint", help="Checkpoint file to resume from")
+    parser.add_argument(
+        "--storage", choices=["dynamodb", "jsonl", "file"], default="dynamodb"
+    )
+    parser.add_argument("--output-file", default="recipes.jsonl")
+    parser.add_argument("--table-name", default="recipes")
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--host-delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.source == "-":
+        text = sys.stdin.read()
+    else:
+        with open(args.source, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+
+    app_config = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+    importer = BulkImporter(
+        PageFetcher.from_config(app_config),
+        # Built like the server's parser, so imported recipes reach the same
+        # indexes and go through the same model cascade
+        RecipeParser.from_config(
+            app_config,
+            storage_type=args.storage,
+            output_file=args.output_file,
+            table_name=args.table_name,
+        ),
+        fetch_workers=args.fetch_workers,
+        host_delay=args.host_delay,
+    )
+    checkpoint = Checkpoint(args.checkpoint) if args.checkpoint else None
+    for event in importer.run(read_urls(text), args.user_email, args.force, checkpoint):
+        print(json.dumps(event, cls=DecimalEncoder), flush=True)
+
+
+if __name__ == "__main__":
+    main()
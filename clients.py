@@ -0,0 +1,42 @@
+import os
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ProcessLocal(Generic[T]):
+    """Lazily created value shared by every request in a process.
+
+    The value is created on first use and recreated after a fork, so clients
+    built in a gunicorn master (e.g. with --preload) are never shared with
+    workers, whose sockets and locks must not cross process boundaries.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        """
+        Initialize the holder without creating the value.
+
+        Args:
+            factory: Zero-argument callable that builds the value
+        """
+        self.factory = factory
+        self._value: Optional[T] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """Return the value for this process, creating it if needed."""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._value = self.factory()
+                    self._pid = pid
+        return self._value
+
+    def reset(self):
+        """Drop the value so the next get() creates a new one."""
+        with self._lock:
+            self._value = None
+            self._pid = None
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 
 class Config:
@@ -9,10 +10,91 @@ class Config:
 
     # Request settings
     REQUEST_TIMEOUT = 30
+    FETCH_MAX_BYTES = 5 * 1024 * 1024
+    FETCH_POOL_MAXSIZE = 20
+    FETCH_PER_HOST_LIMIT = 4
+
+    # HTTP cache for fetched pages (stale entries are kept for revalidation)
+    HTTP_CACHE_PATH = os.environ.get("HTTP_CACHE_PATH", "http_cache.sqlite3")
+    HTTP_CACHE_TTL = 7 * 24 * 60 * 60
+    HTTP_CACHE_MAX_ENTRIES = 256
+    # Pages kept in the on-disk tier; each one can be up to FETCH_MAX_BYTES
+    HTTP_CACHE_DISK_MAX_ENTRIES = int(
+        os.environ.get("HTTP_CACHE_DISK_MAX_ENTRIES", 2000)
+    )
 
     # AWS settings (used by RecipeParser)
     AWS_REGION = os.environ.get("AWS_REGION", "us-east-1")
 
+    # Largest page GET /recipes returns when paginating
+    RECIPES_PAGE_MAX_LIMIT = 100
+
+    # Full-text search index (GET /recipes/search), updated as recipes are saved
+    SEARCH_INDEX_PATH = os.environ.get("SEARCH_INDEX_PATH", "search_index.sqlite3")
+    SEARCH_DEFAULT_LIMIT = 20
+
+    # Ingredient index for GET /recipes/cookable
+    INGREDIENT_INDEX_PATH = os.environ.get(
+        "INGREDIENT_INDEX_PATH", "ingredient_index.sqlite3"
+    )
+
+    # Per-serving nutrition index for GET /recipes filters and sorting
+    NUTRITION_INDEX_PATH = os.environ.get(
+        "NUTRITION_INDEX_PATH", "nutrition_index.sqlite3"
+    )
+
+    # LLM response cache (used by RecipeParser)
+    LLM_CACHE_ENABLED = True
+    LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "llm_cache.sqlite3")
+    LLM_CACHE_TTL = 30 * 24 * 60 * 60
+    LLM_CACHE_MAX_ENTRIES = 1024
+    LLM_CACHE_MAX_BYTES = 32 * 1024 * 1024
+    # Page content is compacted to this many tokens before it's sent to OpenAI
+    LLM_INPUT_MAX_TOKENS = int(os.environ.get("LLM_INPUT_MAX_TOKENS", 3000))
+
+    # OpenAI request limits (used by RecipeParser)
+    OPENAI_MAX_CONCURRENCY = int(os.environ.get("OPENAI_MAX_CONCURRENCY", 4))
+    OPENAI_REQUESTS_PER_MINUTE = int(os.environ.get("OPENAI_REQUESTS_PER_MINUTE", 500))
+    OPENAI_TOKENS_PER_MINUTE = int(os.environ.get("OPENAI_TOKENS_PER_MINUTE", 200_000))
+    # The limits are for the whole OpenAI account, so the web app splits them
+    # evenly between its gunicorn worker processes
+    OPENAI_RATE_LIMIT_PROCESSES = int(os.environ.get("GUNICORN_WORKERS", 2))
+    OPENAI_MAX_RETRIES = 3
+    # Model cascade: regex heuristics first (if enabled), then OPENAI_MODEL,
+    # then each escalation model while the parsed recipe fails its checks
+    OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini-2024-07-18")
+    OPENAI_ESCALATION_MODELS = [
+        model.strip()
+        for model in os.environ.get("OPENAI_ESCALATION_MODELS", "").split(",")
+        if model.strip()
+    ]
+    HEURISTIC_PARSING = os.environ.get("HEURISTIC_PARSING", "1") != "0"
+
+    # Lease and result files letting gunicorn workers share scrapes of the same URL
+    SINGLEFLIGHT_DIR = os.environ.get(
+        "SINGLEFLIGHT_DIR", os.path.join(tempfile.gettempdir(), "recime-singleflight")
+    )
+
+    # Background scrape jobs (POST /scrape?async=1)
+    JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", "jobs.sqlite3")
+    JOBS_WORKERS = int(os.environ.get("JOBS_WORKERS", 2))
+    JOBS_MAX_DEPTH = int(os.environ.get("JOBS_MAX_DEPTH", 100))
+    JOBS_RESULT_TTL = 24 * 60 * 60
+    # Seconds before a running job whose worker died is run again
+    JOBS_LEASE = int(os.environ.get("JOBS_LEASE", 15 * 60))
+
+    # Bulk imports (POST /scrape/batch and bulk_import.py)
+    BULK_IMPORT_MAX_URLS = 1000
+    BULK_IMPORT_FETCH_WORKERS = 8
+    BULK_IMPORT_HOST_DELAY = 1.0
+    BULK_IMPORT_CHECKPOINT_DIR = os.environ.get(
+        "BULK_IMPORT_CHECKPOINT_DIR", "bulk_imports"
+    )
+
+    # Prometheus metrics (GET /metrics), shared by all workers through SQLite
+    METRICS_DB_PATH = os.environ.get("METRICS_DB_PATH", "metrics.sqlite3")
+    METRICS_FLUSH_INTERVAL = 5.0
+
     # Logging
     LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 
@@ -37,6 +119,16 @@ class TestingConfig(Config):
     TESTING = True
     DEBUG = True
 
+    # Keep caches in memory so tests don't share state on disk
+    LLM_CACHE_PATH = None
+    HTTP_CACHE_PATH = None
+    JOBS_DB_PATH = None
+    SINGLEFLIGHT_DIR = None
+    SEARCH_INDEX_PATH = None
+    INGREDIENT_INDEX_PATH = None
+    NUTRITION_INDEX_PATH = None
+    METRICS_DB_PATH = None
+
 
 # Configuration dictionary
 config = {
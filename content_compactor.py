@@ -0,0 +1,276 @@
+import logging
+import re
+from functools import lru_cache
+from typing import List
+
+from bs4 import BeautifulSoup, Comment
+
+from html_extractor import BS4_PARSER
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Default budget for the page content sent to the LLM
+DEFAULT_MAX_TOKENS = 3000
+
+# Elements that never hold recipe text
+DROPPED_TAGS = [
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "iframe",
+    "svg",
+    "canvas",
+    "form",
+    "button",
+    "nav",
+    "footer",
+    "aside",
+]
+
+# Site headers hold navigation, but an <article>'s own <header> holds its title
+CONTENT_TAGS = ["article", "main"]
+
+# Words marking ads, sharing widgets, comments and the like, matched against
+# the start of each class or id token ("ad", "ad-slot", but not "content-sidebar")
+BOILERPLATE = re.compile(
+    r"(?:ads?|advert\w*|sponsor\w*|promo\w*|share|sharing|social|newsletter|"
+    r"subscribe|related|sidebar|comments?|cookies?|consent|popup|modal|"
+    r"breadcrumbs?)(?:[-_]|$)",
+    re.IGNORECASE,
+)
+
+# Headings and class/id names of the recipe's own sections; a container holding
+# one is kept even if its class looks like boilerplate (a "sponsored-" wrapper)
+HEADING_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6"]
+RECIPE_HEADING = re.compile(
+    r"^\W*(?:ingredients|instructions|directions|method|steps)\b", re.IGNORECASE
+)
+RECIPE_SECTION_NAME = re.compile(r"ingredient|instruction|direction", re.IGNORECASE)
+
+# Elements that start a new line of text
+BLOCK_TAGS = [
+    "p",
+    "div",
+    "section",
+    "article",
+    "main",
+    "li",
+    "ul",
+    "ol",
+    "dl",
+    "dt",
+    "dd",
+    "tr",
+    "table",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "br",
+    "blockquote",
+    "pre",
+    "figcaption",
+]
+
+# Markers for blocks the parsing heuristics look for
+LINE_PREFIXES = {"li": "\n- ", "h1": "\n# "}
+
+_QUANTITY_LINE = re.compile(
+    r"^(?:- )?(?:\d|[½⅓⅔¼¾⅕⅛⅜⅝⅞])[\d\s/.,½⅓⅔¼¾⅕⅛⅜⅝⅞-]*\s*"
+    r"(?:cups?|c\.|tbsps?|tablespoons?|tsps?|teaspoons?|g|grams?|kg|mg|ml|l|"
+    r"liters?|litres?|oz|ounces?|lbs?|pounds?|pinch|dash|cloves?|cans?|"
+    r"slices?|sticks?|large|medium|small|whole)?\b",
+    re.IGNORECASE,
+)
+_SECTION = re.compile(
+    r"\b(?:ingredients|instructions|directions|method|steps|serves|servings|"
+    r"yield|prep time|cook time|total time|calories|nutrition)\b",
+    re.IGNORECASE,
+)
+_COOKING_VERB = re.compile(
+    r"\b(?:preheat|bake|stir|mix|whisk|combine|add|cook|simmer|boil|fry|roast|"
+    r"chop|slice|dice|season|serve|heat|pour|fold|knead|drain|grill)\b",
+    re.IGNORECASE,
+)
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, estimating tokens: {str(e)}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens text would use in a prompt.
+
+    Uses tiktoken when it is installed, and otherwise a regex estimate
+    that counts a word as one token per five characters and each
+    punctuation mark as one, within about 10% of tiktoken on recipe text.
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        int: Number of tokens
+    """
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum((len(piece) + 4) // 5 for piece in _PIECES.findall(text))
+
+
+def html_to_lines(markup: str) -> List[str]:
+    """
+    Reduce markup to its visible text, one line per block, without boilerplate.
+
+    Args:
+        markup: HTML fragment, e.g. an <article>
+
+    Returns:
+        Lines of text with whitespace collapsed; list items start with "- "
+        and <h1> titles with "# "
+    """
+    soup = BeautifulSoup(markup, BS4_PARSER)
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+    for element in soup.find_all(DROPPED_TAGS):
+        element.decompose()
+    for element in soup.find_all("header"):
+        if element.find_parent(CONTENT_TAGS) is None:
+            element.decompose()
+    for element in soup.find_all(attrs={"class": True}) + soup.find_all(id=True):
+        if getattr(element, "decomposed", False) or element.attrs is None:
+            continue
+        tokens = element.get("class", []) + element.get("id", "").split()
+        if any(BOILERPLATE.match(token) for token in tokens) and (
+            element.find(_is_recipe_section) is None
+        ):
+            element.decompose()
+    for element in soup.find_all(BLOCK_TAGS):
+        element.insert_before(LINE_PREFIXES.get(element.name, "\n"))
+        element.append("\n")
+    return [
+        line
+        for line in (" ".join(line.split()) for line in soup.get_text().split("\n"))
+        if line and line not in ("-", "#")
+    ]
+
+
+def _is_recipe_section(tag) -> bool:
+    """Whether tag heads or holds the recipe's ingredients or instructions."""
+    if tag.name in HEADING_TAGS and RECIPE_HEADING.match(tag.get_text(strip=True)):
+        return True
+    names = " ".join(tag.get("class", [])) + " " + tag.get("id", "")
+    return bool(RECIPE_SECTION_NAME.search(names))
+
+
+def score_line(line: str) -> int:
+    """
+    Score how much a line looks like part of a recipe.
+
+    Args:
+        line: One line of page text
+
+    Returns:
+        int: 0 for unrelated text, higher for ingredients, steps and headings
+    """
+    score = 0
+    if _QUANTITY_LINE.match(line):
+        score += 3
+    if _SECTION.search(line):
+        score += 3
+    score += min(2, len(_COOKING_VERB.findall(line)))
+    return score
+
+
+def densest_region(lines: List[str], max_tokens: int) -> List[str]:
+    """
+    Pick the run of consecutive lines scoring highest within the token budget.
+
+    Args:
+        lines: Lines of page text
+        max_tokens: Budget for the lines together
+
+    Returns:
+        The chosen lines; a single line over budget is cut to fit
+    """
+    tokens = [count_tokens(line) + 1 for line in lines]
+    scores = [score_line(line) for line in lines]
+    best = (-1, 0, 0)  # (score, start, end)
+    start = window_tokens = window_score = 0
+    for end, (line_tokens, line_score) in enumerate(zip(tokens, scores)):
+        window_tokens += line_tokens
+        window_score += line_score
+        while window_tokens > max_tokens and start <= end:
+            window_tokens -= tokens[start]
+            window_score -= scores[start]
+            start += 1
+        if start <= end and window_score > best[0]:
+            best = (window_score, start, end + 1)
+    if best[0] < 0:
+        # Even the first line is over budget; cut it at a word boundary
+        words, kept = lines[0].split(), []
+        while words and count_tokens(" ".join(kept + words[:1])) <= max_tokens:
+            kept.append(words.pop(0))
+        return [" ".join(kept)]
+    return lines[best[1] : best[2]]
+
+
+def compact_content(content: str, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
+    """
+    Shrink page content to the text the LLM needs to parse the recipe.
+
+    Markup, comments, scripts, navigation and ad/sharing/comment blocks are
+    dropped, whitespace is collapsed and repeated blocks are kept once,
+    except list items and ingredient lines. If the text is still over
+    max_tokens, the densest recipe-like region (ingredient lines, section
+    headings, cooking steps) that fits is kept.
+
+    Args:
+        content: Extracted page content: an HTML fragment or plain text
+        max_tokens: Token budget for the result
+
+    Returns:
+        str: Compacted text, one block per line
+    """
+    before = count_tokens(content)
+    if "<" in content and ">" in content:
+        lines = html_to_lines(content)
+    else:
+        lines = [" ".join(line.split()) for line in content.splitlines()]
+
+    # Keep the first of repeated blocks (ad copy, "jump to recipe" links), but
+    # every list item and quantity line: ingredients and steps can repeat
+    seen = set()
+    unique = []
+    for line in lines:
+        if not line:
+            continue
+        repeatable = line.startswith("- ") or _QUANTITY_LINE.match(line)
+        if repeatable or line not in seen:
+            seen.add(line)
+            unique.append(line)
+
+    text = "\n".join(unique)
+    after = count_tokens(text)
+    if after > max_tokens and unique:
+        text = "\n".join(densest_region(unique, max_tokens))
+        after = count_tokens(text)
+    if after != before:
+        logger.info(f"Compacted recipe content from {before} to {after} tokens")
+    return text
@@ -0,0 +1,505 @@
+import argparse
+import base64
+import json
+import threading
+import time
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import BotoCoreError, ClientError
+
+from rate_limiter import backoff_delay, retry_with_backoff
+
+# Global secondary index for listing one user's recipes, newest first
+USER_EMAIL_INDEX = "user_email-index"
+
+# Attributes returned for list views (fields=summary)
+SUMMARY_FIELDS = ["id", "name", "image_url", "calories"]
+
+# DynamoDB limits on requests per BatchWriteItem and keys per BatchGetItem call
+BATCH_WRITE_SIZE = 25
+BATCH_GET_SIZE = 100
+
+# Error codes DynamoDB returns when a call was throttled
+THROTTLE_ERRORS = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+}
+
+
+class BatchWriteError(Exception):
+    """Raised when put_many fails partway, with the items it did and didn't write."""
+
+    def __init__(self, message: str, written: List[bool], failed: List[bool]):
+        """
+        Args:
+            message: Description of the error that stopped the writes
+            written: One flag per item, True if it was written before the error
+            failed: One flag per item, True if it was due to be written but wasn't
+        """
+        super().__init__(message)
+        self.written = written
+        self.failed = failed
+
+
+def is_throttle(error: Exception) -> bool:
+    """
+    Check whether a boto3 error means DynamoDB throttled the call.
+
+    Args:
+        error: Exception raised by a DynamoDB call
+
+    Returns:
+        bool: True if the call should be retried after backing off
+    """
+    return (
+        isinstance(error, ClientError)
+        and error.response["Error"]["Code"] in THROTTLE_ERRORS
+    )
+
+
+def create_recipes_table(dynamodb, table_name: str = "recipes"):
+    """
+    Create the recipes table with its user_email index.
+
+    Used by tests and local runs (e.g. DynamoDB Local) so the schema matches production.
+
+    Args:
+        dynamodb: boto3 DynamoDB resource
+        table_name: Name of the table to create
+
+    Returns:
+        The created boto3 Table
+    """
+    table = dynamodb.create_table(
+        TableName=table_name,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_email", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "N"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": USER_EMAIL_INDEX,
+                "KeySchema": [
+                    {"AttributeName": "user_email", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    table.wait_until_exists()
+    return table
+
+
+def encode_cursor(last_evaluated_key: Optional[dict]) -> Optional[str]:
+    """
+    Turn a LastEvaluatedKey into an opaque, URL-safe cursor token.
+
+    Args:
+        last_evaluated_key: LastEvaluatedKey from a scan or query response
+
+    Returns:
+        Cursor token, or None if there are no more pages
+    """
+    if not last_evaluated_key:
+        return None
+
+    def default(value):
+        if isinstance(value, Decimal):
+            return int(value) if value == value.to_integral_value() else float(value)
+        raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+    data = json.dumps(last_evaluated_key, default=default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Turn a cursor token back into an ExclusiveStartKey.
+
+    Args:
+        cursor: Token from encode_cursor
+
+    Returns:
+        dict: ExclusiveStartKey for the next scan or query
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded), parse_float=Decimal)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(key, dict):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return key
+
+
+def _projection_kwargs(fields: Optional[List[str]]) -> dict:
+    if not fields:
+        return {}
+    # Attribute names go through placeholders since "name" is a reserved word
+    names = {f"#f{i}": field for i, field in enumerate(fields)}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
+    }
+
+
+def _read_page(table, user_email, limit, start_key, fields) -> dict:
+    kwargs = _projection_kwargs(fields)
+    if limit:
+        kwargs["Limit"] = limit
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+    if user_email:
+        return table.query(
+            IndexName=USER_EMAIL_INDEX,
+            KeyConditionExpression=Key("user_email").eq(user_email),
+            ScanIndexForward=False,
+            **kwargs,
+        )
+    return table.scan(**kwargs)
+
+
+def query_recipes(
+    table,
+    user_email: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Read one page of recipes, for one user through the index or for everyone by scan.
+
+    Args:
+        table: boto3 Table
+        user_email: Only return this user's recipes, newest first (optional)
+        limit: Maximum number of recipes in the page (optional)
+        cursor: Token from a previous page (optional)
+        fields: Attributes to return; all if not given
+
+    Returns:
+        Tuple of (recipes, cursor for the next page or None)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    start_key = decode_cursor(cursor) if cursor else None
+    response = _read_page(table, user_email, limit, start_key, fields)
+    return response.get("Items", []), encode_cursor(response.get("LastEvaluatedKey"))
+
+
+def iter_recipes(
+    table, user_email: Optional[str] = None, fields: Optional[List[str]] = None
+) -> Iterator[dict]:
+    """
+    Iterate over every recipe (or every recipe of one user), a page at a time.
+
+    Args:
+        table: boto3 Table
+        user_email: Only return this user's recipes, newest first (optional)
+        fields: Attributes to return; all if not given
+
+    Yields:
+        Recipes
+    """
+    start_key = None
+    while True:
+        response = _read_page(table, user_email, None, start_key, fields)
+        yield from response.get("Items", [])
+        start_key = response.get("LastEvaluatedKey")
+        if not start_key:
+            return
+
+
+def iter_recipes_by_id(
+    table, ids: Iterable[str], fields: Optional[List[str]] = None, max_retries: int = 8
+) -> Iterator[dict]:
+    """
+    Read recipes by ID with BatchGetItem, 100 keys per call, in the order given.
+
+    Args:
+        table: boto3 Table
+        ids: Recipe IDs; IDs that aren't stored are skipped
+        fields: Attributes to return; all if not given
+        max_retries: Retries for unprocessed keys
+
+    Yields:
+        Recipes
+    """
+    ids = list(dict.fromkeys(ids))
+    projection = _projection_kwargs(sorted(set(fields) | {"id"}) if fields else None)
+    client = table.meta.client
+    for chunk_start in range(0, len(ids), BATCH_GET_SIZE):
+        chunk = ids[chunk_start : chunk_start + BATCH_GET_SIZE]
+        request = {table.name: {"Keys": [{"id": i} for i in chunk], **projection}}
+        found = {}
+        for attempt in range(max_retries + 1):
+            response = retry_with_backoff(
+                lambda: client.batch_get_item(RequestItems=request),
+                max_retries=max_retries,
+                retryable=is_throttle,
+            )
+            for item in response["Responses"].get(table.name, []):
+                found[item["id"]] = item
+            request = response.get("UnprocessedKeys")
+            if not request:
+                break
+            if attempt == max_retries:
+                raise RuntimeError("BatchGetItem left keys unprocessed after retries")
+            time.sleep(backoff_delay(attempt, 0.05, 5.0))
+        for recipe_id in chunk:
+            if recipe_id in found:
+                item = found[recipe_id]
+                if fields and "id" not in fields:
+                    item.pop("id")
+                yield item
+
+
+class DynamoDBRecipeWriter:
+    """Writes recipes to DynamoDB with conditional puts and batched bulk writes.
+
+    Single writes use attribute_not_exists(id), so a duplicate costs one
+    call and can't race a concurrent insert. Bulk writes read which IDs
+    already exist with BatchGetItem, then write the rest with BatchWriteItem,
+    retrying unprocessed items with backoff. BatchWriteItem takes no
+    conditions, so a recipe inserted between the two calls is overwritten;
+    IDs are derived from URL and user, so the loser writes the same recipe.
+    """
+
+    def __init__(
+        self,
+        table,
+        max_retries: int = 8,
+        base_delay: float = 0.05,
+        max_delay: float = 5.0,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            table: boto3 Table
+            max_retries: Retries for throttled calls and unprocessed items
+            base_delay: Delay ceiling in seconds for the first retry
+            max_delay: Upper bound for any single delay in seconds
+        """
+        self.table = table
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._client = table.meta.client
+        self._lock = threading.Lock()
+        self._stats = {
+            "items_written": 0,
+            "items_skipped": 0,
+            "write_calls": 0,
+            "unprocessed_retries": 0,
+            "throttled": 0,
+            "write_seconds": 0.0,
+        }
+
+    def put(self, item: dict, overwrite: bool = False) -> bool:
+        """
+        Write one recipe, skipping it if its ID already exists unless overwrite is set.
+
+        Args:
+            item: Recipe item with an "id"
+            overwrite: Replace an existing item instead of skipping it
+
+        Returns:
+            bool: True if the item was written
+        """
+        kwargs = (
+            {} if overwrite else {"ConditionExpression": "attribute_not_exists(id)"}
+        )
+        start = time.monotonic()
+        try:
+            self._call(lambda: self.table.put_item(Item=item, **kwargs))
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            self._record(skipped=1, calls=1)
+            return False
+        self._record(written=1, calls=1, seconds=time.monotonic() - start)
+        return True
+
+    def put_many(
+        self,
+        items: List[dict],
+        overwrite: bool = False,
+        existing: Optional[Set[str]] = None,
+    ) -> List[bool]:
+        """
+        Write recipes in batches of 25, skipping existing IDs unless overwrite is set.
+
+        Args:
+            items: Recipe items with an "id"
+            overwrite: Replace existing items instead of skipping them
+            existing: IDs the caller already found stored with existing_ids
+                (looked up here if None)
+
+        Returns:
+            One flag per item, True if it was written
+
+        Raises:
+            BatchWriteError: If a lookup or write failed; earlier batches stay
+                written and the error records which items they hold
+        """
+        written = [False] * len(items)
+        try:
+            if overwrite:
+                existing = set()
+            elif existing is None:
+                existing = self.existing_ids(item["id"] for item in items)
+        except (BotoCoreError, ClientError, RuntimeError) as e:
+            raise BatchWriteError(str(e), written, [True] * len(items)) from e
+        # BatchWriteItem rejects two requests for the same key; the last one wins
+        latest = {}
+        for i, item in enumerate(items):
+            if item["id"] not in existing:
+                latest[item["id"]] = i
+        indexes = sorted(latest.values())
+
+        start = time.monotonic()
+        try:
+            for chunk_start in range(0, len(indexes), BATCH_WRITE_SIZE):
+                chunk = indexes[chunk_start : chunk_start + BATCH_WRITE_SIZE]
+                self._batch_write([{"PutRequest": {"Item": items[i]}} for i in chunk])
+                for i in chunk:
+                    written[i] = True
+        except (BotoCoreError, ClientError, RuntimeError) as e:
+            failed = [False] * len(items)
+            for i in indexes:
+                failed[i] = not written[i]
+            raise BatchWriteError(str(e), written, failed) from e
+        finally:
+            self._record(
+                written=sum(written),
+                skipped=len(items) - len(indexes),
+                seconds=time.monotonic() - start,
+            )
+        return written
+
+    def existing_ids(self, ids: Iterable[str]) -> Set[str]:
+        """
+        Find which IDs are already stored, 100 keys per BatchGetItem call.
+
+        Args:
+            ids: Recipe IDs
+
+        Returns:
+            The subset of ids that exist in the table
+        """
+        ids = list(dict.fromkeys(ids))
+        found = set()
+        for chunk_start in range(0, len(ids), BATCH_GET_SIZE):
+            request = {
+                self.table.name: {
+                    "Keys": [
+                        {"id": i}
+                        for i in ids[chunk_start : chunk_start + BATCH_GET_SIZE]
+                    ],
+                    "ProjectionExpression": "id",
+                }
+            }
+            for attempt in range(self.max_retries + 1):
+                response = self._call(
+                    lambda: self._client.batch_get_item(RequestItems=request)
+                )
+                found.update(
+                    item["id"]
+                    for item in response["Responses"].get(self.table.name, [])
+                )
+                request = response.get("UnprocessedKeys")
+                if not request:
+                    break
+                if attempt == self.max_retries:
+                    raise RuntimeError(
+                        "BatchGetItem left keys unprocessed after retries"
+                    )
+                time.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+        return found
+
+    def stats(self) -> dict:
+        """
+        Return write counters and throughput.
+
+        Returns:
+            dict: items_written, items_skipped, write_calls, unprocessed_retries,
+            throttled, write_seconds and items_per_second
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        seconds = stats["write_seconds"]
+        stats["items_per_second"] = stats["items_written"] / seconds if seconds else 0.0
+        return stats
+
+    def _batch_write(self, requests: List[dict]):
+        pending = {self.table.name: requests}
+        for attempt in range(self.max_retries + 1):
+            response = self._call(
+                lambda: self._client.batch_write_item(RequestItems=pending)
+            )
+            self._record(calls=1)
+            pending = response.get("UnprocessedItems")
+            if not pending:
+                return
+            self._record(unprocessed=len(pending.get(self.table.name, [])))
+            if attempt < self.max_retries:
+                time.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+        raise RuntimeError("BatchWriteItem left items unprocessed after retries")
+
+    def _call(self, func):
+        return retry_with_backoff(
+            func,
+            max_retries=self.max_retries,
+            base_delay=self.base_delay,
+            max_delay=self.max_delay,
+            retryable=self._is_throttle,
+        )
+
+    def _is_throttle(self, error: Exception) -> bool:
+        if not is_throttle(error):
+            return False
+        self._record(throttled=1)
+        return True
+
+    def _record(
+        self, written=0, skipped=0, calls=0, unprocessed=0, throttled=0, seconds=0.0
+    ):
+        with self._lock:
+            self._stats["items_written"] += written
+            self._stats["items_skipped"] += skipped
+            self._stats["write_calls"] += calls
+            self._stats["unprocessed_retries"] += unprocessed
+            self._stats["throttled"] += throttled
+            self._stats["write_seconds"] += seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the recipes DynamoDB table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    create = subparsers.add_parser("create-table", help="Create the recipes table")
+    create.add_argument("--table-name", default="recipes")
+    create.add_argument("--region", default="us-east-1")
+    create.add_argument("--endpoint-url", help="e.g. http://localhost:8000")
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource(
+        "dynamodb", region_name=args.region, endpoint_url=args.endpoint_url
+    )
+    create_recipes_table(dynamodb, args.table_name)
+    print(f"Created table {args.table_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import json
+import logging
+import threading
+import time
+import urllib.parse
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from llm_cache import MemoryCache, SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli  # noqa: F401 - urllib3 decodes br responses when it is installed
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+class FetchError(Exception):
+    """Raised when a page cannot be fetched."""
+
+
+class HTTPCache:
+    """Local HTTP cache honoring ETag, Last-Modified and Cache-Control."""
+
+    def __init__(self, tiers: List):
+        """
+        Initialize the cache with an ordered list of storage tiers.
+
+        Args:
+            tiers: String key/value tiers from llm_cache, ordered fastest first
+        """
+        self.tiers = tiers
+
+    def get(self, url: str) -> Optional[dict]:
+        for i, tier in enumerate(self.tiers):
+            try:
+                value = tier.get(url)
+            except Exception as e:
+                logger.warning(f"HTTP cache tier {type(tier).__name__} failed: {e}")
+                continue
+            if value is not None:
+                for faster_tier in self.tiers[:i]:
+                    faster_tier.set(url, value)
+                return json.loads(value)
+        return None
+
+    def set(self, url: str, entry: dict):
+        value = json.dumps(entry)
+        for tier in self.tiers:
+            try:
+                tier.set(url, value)
+            except Exception as e:
+                logger.warning(f"HTTP cache tier {type(tier).__name__} failed: {e}")
+
+    @staticmethod
+    def freshness_lifetime(headers) -> Optional[float]:
+        """
+        Work out how long a response may be served without revalidation.
+
+        Args:
+            headers: Response headers
+
+        Returns:
+            Seconds the response stays fresh, or None if it must not be stored
+        """
+        directives = {}
+        for directive in headers.get("Cache-Control", "").split(","):
+            name, _, value = directive.strip().partition("=")
+            if name:
+                directives[name.lower()] = value.strip('"')
+
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            return 0
+        if "max-age" in directives:
+            try:
+                return max(0, int(directives["max-age"]))
+            except ValueError:
+                return 0
+        if headers.get("Expires"):
+            try:
+                expires = parsedate_to_datetime(headers["Expires"]).timestamp()
+                return max(0, expires - time.time())
+            except (TypeError, ValueError):
+                return 0
+        return 0
+
+
+class PageFetcher:
+    """Fetch web pages over pooled keep-alive connections with a local HTTP cache."""
+
+    def __init__(
+        self,
+        timeout: float = 30,
+        max_bytes: int = 5 * 1024 * 1024,
+        pool_maxsize: int = 20,
+        per_host_limit: int = 4,
+        cache: Optional[HTTPCache] = None,
+    ):
+        """
+        Initialize the fetcher and its connection pool.
+
+        Args:
+            timeout: Seconds to wait for the server before giving up
+            max_bytes: Maximum body size read from a response; longer bodies are truncated
+            pool_maxsize: Keep-alive connections kept per host
+            per_host_limit: Maximum concurrent requests to a single host
+            cache: Optional HTTP cache for conditional requests
+        """
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.per_host_limit = per_host_limit
+        self.cache = cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+        self._host_limits = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "cache_hits": 0,
+            "revalidated": 0,
+            "cache_misses": 0,
+            "bytes_downloaded": 0,
+            "bytes_saved": 0,
+            "truncated": 0,
+        }
+
+    @classmethod
+    def from_config(cls, app_config) -> "PageFetcher":
+        """
+        Build the fetcher described by a Flask config.
+
+        Args:
+            app_config: Mapping with the REQUEST_TIMEOUT, FETCH_* and HTTP_CACHE_* settings
+        """
+        tiers = [
+            MemoryCache(
+                max_entries=app_config["HTTP_CACHE_MAX_ENTRIES"],
+                ttl=app_config["HTTP_CACHE_TTL"],
+            )
+        ]
+        if app_config.get("HTTP_CACHE_PATH"):
+            tiers.append(
+                SQLiteCache(
+                    path=app_config["HTTP_CACHE_PATH"],
+                    max_entries=app_config["HTTP_CACHE_DISK_MAX_ENTRIES"],
+                    ttl=app_config["HTTP_CACHE_TTL"],
+                )
+            )
+        return cls(
+            timeout=app_config["REQUEST_TIMEOUT"],
+            max_bytes=app_config["FETCH_MAX_BYTES"],
+            pool_maxsize=app_config["FETCH_POOL_MAXSIZE"],
+            per_host_limit=app_config["FETCH_PER_HOST_LIMIT"],
+            cache=HTTPCache(tiers),
+        )
+
+    def fetch(self, url: str, use_cache: bool = True) -> str:
+        """
+        Fetch a page, serving it from the cache when it is fresh or unchanged.
+
+        Args:
+            url: URL of the page
+            use_cache: Read the page from the cache if possible; when False
+                the page is downloaded in full, and still stored in the cache
+
+        Returns:
+            str: Decoded body of the page
+
+        Raises:
+            FetchError: If the request fails or returns an error status
+        """
+        self._count("requests")
+        entry = self.cache.get(url) if self.cache is not None and use_cache else None
+        if entry is not None and entry["expires_at"] > time.time():
+            self._count("cache_hits")
+            self._count("bytes_saved", len(entry["body"].encode()))
+            return entry["body"]
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with self._host_limit(url):
+            try:
+                response = self.session.get(
+                    url, headers=headers, timeout=self.timeout, stream=True
+                )
+                try:
+                    if response.status_code == 304 and entry is not None:
+                        self._count("revalidated")
+                        self._count("bytes_saved", len(entry["body"].encode()))
+                        self._store(url, entry["body"], response.headers, entry)
+                        return entry["body"]
+                    response.raise_for_status()
+                    body = self._read_body(url, response)
+                finally:
+                    response.close()
+            except requests.RequestException as e:
+                raise FetchError(str(e)) from e
+
+        self._count("cache_misses")
+        self._store(url, body, response.headers)
+        return body
+
+    def stats(self) -> dict:
+        """Return request counters, the cache hit ratio and bytes saved."""
+        with self._lock:
+            stats = dict(self._stats)
+        served_from_cache = stats["cache_hits"] + stats["revalidated"]
+        stats["hit_ratio"] = (
+            served_from_cache / stats["requests"] if stats["requests"] else 0.0
+        )
+        return stats
+
+    def _read_body(self, url: str, response: requests.Response) -> str:
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_bytes:
+                logger.warning(f"Truncated {url} at {self.max_bytes} bytes")
+                self._count("truncated")
+                break
+        content = b"".join(chunks)[: self.max_bytes]
+        # Bytes read off the wire, before gzip/deflate/br decoding
+        raw = response.raw
+        self._count(
+            "bytes_downloaded", raw.tell() if hasattr(raw, "tell") else len(content)
+        )
+
+        # Without an explicit charset requests assumes ISO-8859-1 for text/*,
+        # which mangles the UTF-8 most recipe sites serve
+        encoding = "utf-8"
+        if "charset" in response.headers.get("Content-Type", "").lower():
+            encoding = response.encoding or encoding
+        return content.decode(encoding, errors="replace")
+
+    def _store(self, url: str, body: str, headers, previous: Optional[dict] = None):
+        if self.cache is None:
+            return
+        lifetime = HTTPCache.freshness_lifetime(headers)
+        etag = headers.get("ETag") or (previous or {}).get("etag")
+        last_modified = headers.get("Last-Modified") or (previous or {}).get(
+            "last_modified"
+        )
+        # Nothing to gain from storing a response that is never fresh and
+        # can't be revalidated
+        if lifetime is None or (lifetime == 0 and not (etag or last_modified)):
+            return
+        self.cache.set(
+            url,
+            {
+                "body": body,
+                "etag": etag,
+                "last_modified": last_modified,
+                "expires_at": time.time() + lifetime,
+            },
+        )
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(
+                    self.per_host_limit
+                )
+            return self._host_limits[host]
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
@@ -3,9 +3,17 @@ import os
 # Server socket
 bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8001")
 
-# Worker processes - for low traffic, we can use a minimal setup
-workers = 2  # 2 workers should be sufficient for low traffic
-worker_class = "sync"
+# Worker processes - gevent workers serve each request in a greenlet, so a
+# slow page download or OpenAI call only blocks that request, not the worker.
+# requests, the OpenAI client and boto3 all become cooperative once gevent
+# monkey-patches the standard library. File locks (the JSON Lines store,
+# single-flight leases) are polled so waiting on them yields too. SQLite calls
+# (indexes, job queue, metrics, LLM cache) still block the worker while they
+# run, including up to 5s waiting on another writer. Set
+# GUNICORN_WORKER_CLASS=sync to go back to one request per worker.
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 500))
 timeout = 30
 
 # Logging
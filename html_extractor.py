@@ -0,0 +1,151 @@
+import logging
+import re
+import urllib.parse
+from html.parser import HTMLParser
+from typing import Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+
+    BS4_PARSER = "lxml"
+except ImportError:
+    BS4_PARSER = "html.parser"
+
+# Size of each piece of the document fed to the head scanner
+CHUNK_SIZE = 16 * 1024
+
+
+class HeadMetadataParser(HTMLParser):
+    """Incremental parser that collects <head> metadata and stops at <body>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.description: Optional[str] = None
+        self.image_url: Optional[str] = None
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            self.done = True
+            return
+        if tag != "meta":
+            return
+        attrs = dict(attrs)
+        content = attrs.get("content")
+        if not content:
+            return
+        if attrs.get("name", "").lower() == "description" and self.description is None:
+            self.description = content
+        elif attrs.get("property", "").lower() == "og:image" and self.image_url is None:
+            self.image_url = content
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.done = True
+
+
+def scan_head(html: str) -> HeadMetadataParser:
+    """
+    Feed the document to a HeadMetadataParser until the head is finished.
+
+    Args:
+        html: HTML document
+
+    Returns:
+        HeadMetadataParser holding whatever metadata was found
+    """
+    parser = HeadMetadataParser()
+    for start in range(0, len(html), CHUNK_SIZE):
+        parser.feed(html[start : start + CHUNK_SIZE])
+        if parser.done:
+            break
+    return parser
+
+
+# Start tags of the main content candidates, in order of preference; the
+# div's class list must hold exactly "content", not e.g. "post-content"
+CONTENT_CANDIDATES = [
+    ("article", re.compile(r"<article[\s>]", re.IGNORECASE)),
+    ("main", re.compile(r"<main[\s>]", re.IGNORECASE)),
+    (
+        "div",
+        re.compile(
+            r"""<div(?=\s)[^>]*?\sclass\s*=\s*"""
+            r"""(?:"(?:[^"]*\s)?content(?:\s[^"]*)?"|'(?:[^']*\s)?content(?:\s[^']*)?'"""
+            r"""|content(?=[\s/>]))""",
+            re.IGNORECASE,
+        ),
+    ),
+]
+
+# Comments and elements whose text isn't markup, which could hold a
+# candidate's start tag (e.g. a template in a <script>)
+NON_MARKUP = re.compile(
+    r"<!--.*?-->|<(script|style|template|noscript)\b[^>]*>.*?</\1\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def slice_element(html: str, tag: str, start: int) -> str:
+    """Cut the markup of the element starting at start, matching nested tags."""
+    depth = 0
+    for match in re.finditer(rf"<(/?){tag}\b[^>]*>", html[start:], re.IGNORECASE):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return html[start : start + match.end()]
+    return html[start:]
+
+
+def find_main_content(html: str) -> Optional[str]:
+    """
+    Find the main content block, building a tree only for that element.
+
+    Candidates are located with a plain text scan, so BeautifulSoup only
+    parses the slice of the page holding the element instead of the whole
+    document. Comments, scripts and styles are removed before the scan.
+
+    Args:
+        html: HTML document
+
+    Returns:
+        Markup of the first <article>, <main> or <div class="content">, if any
+    """
+    html = NON_MARKUP.sub("", html)
+    for tag, start_tag in CONTENT_CANDIDATES:
+        match = start_tag.search(html)
+        if match is None:
+            continue
+        markup = slice_element(html, tag, match.start())
+        soup = BeautifulSoup(markup, BS4_PARSER, parse_only=SoupStrainer(tag))
+        element = soup.find(tag)
+        if element is not None:
+            return str(element)
+    return None
+
+
+def extract_recipe_content(html: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Extract the recipe description and image URL from a page.
+
+    The meta description and og:image are read by a streaming scan that
+    stops at the end of <head>. The body is only parsed, for the main
+    content block, when there is no meta description.
+
+    Args:
+        html: HTML document
+
+    Returns:
+        Tuple of (recipe content, decoded image URL); either may be None
+    """
+    try:
+        head = scan_head(html)
+        image_url = urllib.parse.unquote(head.image_url) if head.image_url else None
+        main_content = head.description or find_main_content(html)
+        return main_content, image_url
+    except Exception as e:
+        logger.error(f"Error extracting recipe content: {str(e)}")
+        return None, None
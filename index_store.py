@@ -0,0 +1,242 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from sqlite_db import SQLiteDatabase
+
+
+def normalize_email(user_email: Optional[str]) -> str:
+    """Canonical form of an owner's email, so indexes match it in any casing."""
+    return (user_email or "").strip().lower()
+
+
+class IndexStore:
+    """Per-recipe index entries in SQLite, with a sequence number per change.
+
+    Every change (including a deletion, stored as a NULL entry) takes the
+    next sequence number, so a process can catch up on changes made by any
+    other process by reading the rows after the last number it saw.
+    """
+
+    def __init__(self, path: Optional[str], table: str):
+        """
+        Initialize the store, creating the database if needed.
+
+        Args:
+            path: Path to the SQLite database file (None keeps the entries in memory)
+            table: Name of the table holding the entries
+        """
+        self.table = table
+        self._db = SQLiteDatabase(path, table)
+
+        with self._db.connect() as conn:
+            conn.execute(f"""CREATE TABLE IF NOT EXISTS {table} (
+                    recipe_id TEXT PRIMARY KEY,
+                    seq INTEGER NOT NULL,
+                    entry TEXT
+                )""")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_seq ON {table} (seq)")
+
+    def put(self, entries: List[Tuple[str, Optional[dict]]]):
+        """
+        Store entries, replacing earlier ones for the same recipes.
+
+        Args:
+            entries: (recipe ID, entry) pairs; a None entry marks a deletion
+        """
+        if not entries:
+            return
+        with self._db.connect() as conn:
+            # Sequence numbers are taken under the write lock, so they are
+            # committed in order and a reader never skips one
+            conn.execute("BEGIN IMMEDIATE")
+            (last,) = conn.execute(
+                f"SELECT COALESCE(MAX(seq), 0) FROM {self.table}"
+            ).fetchone()
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (recipe_id, seq, entry) "
+                "VALUES (?, ?, ?)",
+                [
+                    (
+                        recipe_id,
+                        last + i + 1,
+                        None if entry is None else json.dumps(entry),
+                    )
+                    for i, (recipe_id, entry) in enumerate(entries)
+                ],
+            )
+
+    def changes(self, since: int) -> List[Tuple[str, int, Optional[dict]]]:
+        """
+        Read the changes made after a sequence number.
+
+        Args:
+            since: Last sequence number already applied
+
+        Returns:
+            (recipe ID, sequence number, entry or None) tuples in order
+        """
+        with self._db.connect() as conn:
+            rows = conn.execute(
+                f"SELECT recipe_id, seq, entry FROM {self.table} "
+                "WHERE seq > ? ORDER BY seq",
+                (since,),
+            ).fetchall()
+        return [
+            (recipe_id, seq, None if entry is None else json.loads(entry))
+            for recipe_id, seq, entry in rows
+        ]
+
+    def clear(self):
+        """Mark every entry as deleted."""
+        with self._db.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            (last,) = conn.execute(
+                f"SELECT COALESCE(MAX(seq), 0) FROM {self.table}"
+            ).fetchone()
+            conn.execute(
+                f"UPDATE {self.table} SET entry = NULL, seq = ? + rowid", (last,)
+            )
+
+
+class MirroredIndex(ABC):
+    """Base for recipe indexes that live in an IndexStore and are queried in memory.
+
+    Each process keeps the entries in row-ordered lists and numpy arrays and
+    applies the store's changes before every query. A replaced or deleted
+    recipe's row is marked dead rather than removed, so rows never move;
+    the mirror is rebuilt once dead rows outnumber live ones.
+
+    Subclasses set table, and implement _entry (what to store for a recipe),
+    _append (mirror one live entry) and _build_arrays (refresh numpy columns
+    after a sync).
+    """
+
+    table: str
+
+    def __init__(self, path: Optional[str]):
+        """
+        Initialize the index, creating the database if needed.
+
+        Args:
+            path: Path to the SQLite database file (None keeps the index in memory)
+        """
+        self.store = IndexStore(path, self.table)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def add(self, recipes: Iterable[dict]):
+        """
+        Index recipes, replacing earlier versions of the same IDs.
+
+        Args:
+            recipes: Stored recipe items, each with an "id"
+        """
+        self.store.put([(recipe["id"], self._entry(recipe)) for recipe in recipes])
+
+    def remove(self, recipe_id: str):
+        """
+        Drop a recipe from the index.
+
+        Args:
+            recipe_id: ID of the deleted recipe
+        """
+        self.store.put([(recipe_id, None)])
+
+    def rebuild(self, recipes: Iterable[dict], batch_size: int = 500) -> int:
+        """
+        Replace the whole index with the given recipes.
+
+        Args:
+            recipes: Every stored recipe
+            batch_size: Recipes indexed per transaction
+
+        Returns:
+            int: Number of recipes indexed
+        """
+        self.store.clear()
+        count, batch = 0, []
+        for recipe in recipes:
+            batch.append(recipe)
+            if len(batch) >= batch_size:
+                self.add(batch)
+                count, batch = count + len(batch), []
+        self.add(batch)
+        return count + len(batch)
+
+    def __len__(self):
+        with self._lock:
+            self._sync()
+            return len(self._rows)
+
+    @abstractmethod
+    def _entry(self, recipe: dict) -> dict:
+        """Build the entry stored for a recipe."""
+
+    @abstractmethod
+    def _append(self, row: int, entry: dict):
+        """Mirror a live entry at row."""
+
+    @abstractmethod
+    def _build_arrays(self):
+        """Refresh the numpy columns after a sync."""
+
+    def _reset(self):
+        self._seq = 0
+        self._rows: Dict[str, int] = {}  # recipe ID -> row of its current version
+        self._ids: List[str] = []
+        self._owner_list: List[int] = []
+        self._owner_codes: Dict[str, int] = {}
+        self._dead = set()
+        self._alive = np.zeros(0, dtype=bool)
+        self._owners = np.zeros(0, dtype=np.int32)
+
+    def _sync(self):
+        """Apply changes written since the last sync, by any process."""
+        changes = self.store.changes(self._seq)
+        if not changes:
+            return
+
+        for recipe_id, seq, entry in changes:
+            self._seq = seq
+            old_row = self._rows.pop(recipe_id, None)
+            if old_row is not None:
+                self._dead.add(old_row)
+            if entry is None:
+                continue
+            row = len(self._ids)
+            self._rows[recipe_id] = row
+            self._ids.append(recipe_id)
+            user_email = normalize_email(entry.get("user_email"))
+            self._owner_list.append(
+                self._owner_codes.setdefault(user_email, len(self._owner_codes))
+            )
+            self._append(row, entry)
+
+        if len(self._dead) > 1000 and len(self._dead) > len(self._rows):
+            # Mostly superseded rows: rebuild from the database without them
+            self._reset()
+            self._sync()
+            return
+        self._alive = np.ones(len(self._ids), dtype=bool)
+        if self._dead:
+            self._alive[np.fromiter(self._dead, dtype=np.int64)] = False
+        self._owners = np.array(self._owner_list, dtype=np.int32)
+        self._build_arrays()
+
+    def _candidates(self, user_email: Optional[str]) -> Optional[np.ndarray]:
+        """
+        Mask of the live rows a query may return.
+
+        Returns:
+            Boolean array, or None if user_email owns no recipes
+        """
+        if not user_email:
+            return self._alive.copy()
+        owner = self._owner_codes.get(normalize_email(user_email))
+        if owner is None:
+            return None
+        return self._alive & (self._owners == owner)
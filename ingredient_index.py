@@ -0,0 +1,307 @@
+import argparse
+import json
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+import boto3
+import numpy as np
+
+from dynamodb_store import iter_recipes
+from index_store import MirroredIndex
+
+# Words that describe how an ingredient is prepared or sold, not what it is
+DESCRIPTORS = {
+    "boneless",
+    "canned",
+    "chopped",
+    "cold",
+    "cooked",
+    "crushed",
+    "diced",
+    "dried",
+    "extra",
+    "finely",
+    "fresh",
+    "freshly",
+    "frozen",
+    "grated",
+    "ground",
+    "large",
+    "medium",
+    "melted",
+    "minced",
+    "of",
+    "optional",
+    "organic",
+    "packed",
+    "peeled",
+    "raw",
+    "room",
+    "roughly",
+    "salted",
+    "shredded",
+    "skinless",
+    "sliced",
+    "small",
+    "softened",
+    "taste",
+    "temperature",
+    "thinly",
+    "to",
+    "unsalted",
+    "virgin",
+    "warm",
+    "whole",
+}
+
+# Regional and brand-style names mapped to one canonical name
+SYNONYMS = {
+    "all purpose flour": "flour",
+    "plain flour": "flour",
+    "white flour": "flour",
+    "granulated sugar": "sugar",
+    "white sugar": "sugar",
+    "caster sugar": "sugar",
+    "confectioner sugar": "powdered sugar",
+    "confectioners sugar": "powdered sugar",
+    "icing sugar": "powdered sugar",
+    "scallion": "green onion",
+    "spring onion": "green onion",
+    "coriander leaf": "cilantro",
+    "garbanzo bean": "chickpea",
+    "courgette": "zucchini",
+    "aubergine": "eggplant",
+    "capsicum": "bell pepper",
+    "black pepper": "pepper",
+    "kosher salt": "salt",
+    "sea salt": "salt",
+    "table salt": "salt",
+    "heavy cream": "cream",
+    "double cream": "cream",
+    "whipping cream": "cream",
+    "heavy whipping cream": "cream",
+    "garlic clove": "garlic",
+    "clove garlic": "garlic",
+    "egg yolk": "egg",
+    "egg white": "egg",
+}
+
+# Assumed to be on hand even when the query doesn't list them
+PANTRY_STAPLES = frozenset({"salt", "pepper", "water"})
+
+_NON_LETTERS = re.compile(r"[^a-z ]+")
+
+
+def normalize_ingredient(name: str) -> str:
+    """
+    Reduce an ingredient name to the canonical name used for matching.
+
+    Preparation notes ("chopped", text in parentheses or after a comma),
+    alternatives after "or" and plurals are dropped, then SYNONYMS is applied:
+    "2 Large Eggs, beaten" and "egg" both become "egg".
+
+    Args:
+        name: Ingredient name as parsed or typed
+
+    Returns:
+        str: Canonical name, empty if nothing is left
+    """
+    text = unicodedata.normalize("NFKD", name.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"\([^)]*\)", " ", text).split(",")[0].split(" or ")[0]
+    words = [
+        word
+        for word in _NON_LETTERS.sub(" ", text.replace("-", " ")).split()
+        if word not in DESCRIPTORS
+    ]
+    if not words:
+        return ""
+    words[-1] = _singular(words[-1])
+    phrase = " ".join(words)
+    return SYNONYMS.get(phrase, phrase)
+
+
+def _singular(word: str) -> str:
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("oes") and len(word) > 4:
+        return word[:-2]
+    if word.endswith("s") and len(word) > 3 and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+class IngredientIndex(MirroredIndex):
+    """Ranks recipes by how many of their ingredients are on hand.
+
+    Each recipe's normalized ingredient names are kept in an IndexStore,
+    shared by every gunicorn worker and kept across restarts. Each process
+    mirrors them in memory as posting lists (ingredient -> recipe rows, as
+    numpy arrays). A query concatenates the postings of the ingredients on
+    hand and counts matches per recipe with one bincount, so its cost
+    depends on how many recipes use those ingredients, not on the total
+    number of recipes.
+    """
+
+    table = "recipe_ingredients"
+
+    def __init__(self, path: Optional[str] = "ingredient_index.sqlite3"):
+        """
+        Initialize the index, creating the database if needed.
+
+        Args:
+            path: Path to the SQLite database file (None keeps the index in memory)
+        """
+        super().__init__(path)
+
+    def _entry(self, recipe: dict) -> dict:
+        names = {
+            normalize_ingredient(str(ingredient.get("name", "")))
+            for ingredient in recipe.get("ingredients") or []
+        }
+        names.discard("")
+        return {
+            "user_email": recipe.get("user_email"),
+            "name": recipe.get("name"),
+            "image_url": recipe.get("image_url"),
+            "ingredients": sorted(names),
+        }
+
+    def query(
+        self,
+        ingredients: Iterable[str],
+        user_email: Optional[str] = None,
+        limit: int = 20,
+        max_missing: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Find the recipes that can best be cooked with the given ingredients.
+
+        Recipes are ranked by coverage (the fraction of their ingredients on
+        hand), then by fewest missing ingredients. PANTRY_STAPLES count as on
+        hand. Recipes using none of the ingredients are left out.
+
+        Args:
+            ingredients: Ingredient names on hand, in any form normalize_ingredient accepts
+            user_email: Only consider this user's recipes (optional)
+            limit: Maximum number of results
+            max_missing: Leave out recipes missing more ingredients than this (optional)
+
+        Returns:
+            Results with id, name, image_url, coverage, matched, missing_count
+            and the missing ingredient names, best first
+        """
+        have = {normalize_ingredient(name) for name in ingredients}
+        have.discard("")
+        if not have:
+            return []
+
+        # The whole query holds the lock: a sync may rebuild the row lists
+        with self._lock:
+            self._sync()
+            candidates = self._candidates(user_email)
+            if candidates is None:
+                return []
+            size = len(self._ids)
+            matched_have = self._count(have, size)
+            matched = matched_have + self._count(PANTRY_STAPLES - have, size)
+            candidates &= matched_have > 0
+            missing = self._totals - matched
+            if max_missing is not None:
+                candidates &= missing <= max_missing
+
+            rows = np.flatnonzero(candidates)
+            coverage = matched[rows] / self._totals[rows]
+            # lexsort sorts by its last key first: coverage descending, then
+            # fewest missing, then oldest row
+            order = np.lexsort((rows, missing[rows], -coverage))[:limit]
+
+            return [
+                {
+                    "id": self._ids[rows[i]],
+                    "name": self._names[rows[i]],
+                    "image_url": self._image_urls[rows[i]],
+                    "coverage": round(float(coverage[i]), 4),
+                    "matched": int(matched[rows[i]]),
+                    "missing_count": int(missing[rows[i]]),
+                    "missing": [
+                        name
+                        for name in self._ingredients[rows[i]]
+                        if name not in have and name not in PANTRY_STAPLES
+                    ],
+                }
+                for i in order
+            ]
+
+    def _count(self, ingredients: Iterable[str], size: int) -> np.ndarray:
+        """Count, per row, how many of the ingredients the recipe uses."""
+        postings = [self._posting_array(name) for name in ingredients]
+        postings = [posting for posting in postings if posting is not None]
+        if not postings:
+            return np.zeros(size, dtype=np.int64)
+        return np.bincount(np.concatenate(postings), minlength=size)
+
+    def _reset(self):
+        super()._reset()
+        self._names: List[Optional[str]] = []
+        self._image_urls: List[Optional[str]] = []
+        self._ingredients: List[List[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._totals = np.zeros(0, dtype=np.int32)
+
+    def _append(self, row: int, entry: dict):
+        self._names.append(entry["name"])
+        self._image_urls.append(entry["image_url"])
+        self._ingredients.append(entry["ingredients"])
+        for ingredient in entry["ingredients"]:
+            self._postings.setdefault(ingredient, []).append(row)
+            self._arrays.pop(ingredient, None)
+
+    def _build_arrays(self):
+        self._totals = np.fromiter(
+            (len(names) for names in self._ingredients),
+            dtype=np.int32,
+            count=len(self._ingredients),
+        )
+
+    def _posting_array(self, ingredient: str) -> Optional[np.ndarray]:
+        array = self._arrays.get(ingredient)
+        if array is None:
+            rows = self._postings.get(ingredient)
+            if rows is None:
+                return None
+            array = self._arrays[ingredient] = np.array(rows, dtype=np.int32)
+        return array
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the ingredient index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild = subparsers.add_parser(
+        "rebuild", help="Index every recipe in the DynamoDB table"
+    )
+    rebuild.add_argument("--index-path", default="ingredient_index.sqlite3")
+    rebuild.add_argument("--table-name", default="recipes")
+    rebuild.add_argument("--region", default="us-east-1")
+    query = subparsers.add_parser("query", help="Rank recipes for ingredients on hand")
+    query.add_argument("ingredients", nargs="+")
+    query.add_argument("--index-path", default="ingredient_index.sqlite3")
+    query.add_argument("--user-email")
+    query.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    index = IngredientIndex(args.index_path)
+    if args.command == "rebuild":
+        table = boto3.resource("dynamodb", region_name=args.region).Table(
+            args.table_name
+        )
+        print(json.dumps({"indexed": index.rebuild(iter_recipes(table))}))
+    else:
+        for result in index.query(args.ingredients, args.user_email, args.limit):
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
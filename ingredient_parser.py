@@ -0,0 +1,181 @@
+import re
+import unicodedata
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+from models import Ingredient
+
+# Unit spellings recognized at the start of an ingredient line
+UNITS = {
+    "cup",
+    "cups",
+    "c",
+    "tablespoon",
+    "tablespoons",
+    "tbsp",
+    "tbs",
+    "tbl",
+    "teaspoon",
+    "teaspoons",
+    "tsp",
+    "gram",
+    "grams",
+    "g",
+    "kilogram",
+    "kilograms",
+    "kg",
+    "milligram",
+    "milligrams",
+    "mg",
+    "milliliter",
+    "milliliters",
+    "millilitre",
+    "millilitres",
+    "ml",
+    "liter",
+    "liters",
+    "litre",
+    "litres",
+    "l",
+    "ounce",
+    "ounces",
+    "oz",
+    "fluid ounce",
+    "fluid ounces",
+    "fl oz",
+    "pound",
+    "pounds",
+    "lb",
+    "lbs",
+    "pint",
+    "pints",
+    "pt",
+    "quart",
+    "quarts",
+    "qt",
+    "gallon",
+    "gallons",
+    "gal",
+    "pinch",
+    "pinches",
+    "dash",
+    "dashes",
+    "clove",
+    "cloves",
+    "can",
+    "cans",
+    "slice",
+    "slices",
+    "piece",
+    "pieces",
+    "stick",
+    "sticks",
+    "bunch",
+    "bunches",
+    "sprig",
+    "sprigs",
+    "package",
+    "packages",
+    "pkg",
+}
+
+# A comma followed by exactly three digits separates thousands ("1,000");
+# any other comma is a decimal point ("0,5")
+_THOUSANDS = re.compile(r",(?=\d{3}(?!\d))")
+_NUMBER = r"\d+\s+\d+/\d+|\d+/\d+|\d+(?:,\d{3}(?!\d))*(?:[.,]\d+)?"
+_QUANTITY = re.compile(
+    rf"^\s*(?P<quantity>(?:{_NUMBER})(?:\s*(?:-|–|to)\s*(?:{_NUMBER}))?)\s*"
+)
+_UNIT = re.compile(
+    r"^(?P<unit>"
+    + "|".join(sorted((re.escape(unit) for unit in UNITS), key=len, reverse=True))
+    + r")\.?(?=\s|$)",
+    re.IGNORECASE,
+)
+
+
+def normalize_fractions(text: str) -> str:
+    """
+    Replace unicode vulgar fractions with ASCII ones ("1½" becomes "1 1/2").
+
+    Args:
+        text: Text that may contain characters like ½ or ¾
+
+    Returns:
+        str: Text with every vulgar fraction spelled as n/d
+    """
+    result = []
+    for char in text:
+        if unicodedata.category(char) == "No" and "/" not in char:
+            value = unicodedata.numeric(char, None)
+            fraction = unicodedata.normalize("NFKC", char).replace("⁄", "/")
+            if value is not None and "/" in fraction:
+                if result and result[-1].isdigit():
+                    result.append(" ")
+                result.append(fraction)
+                continue
+        result.append(char)
+    return "".join(result)
+
+
+def parse_quantity(text: str) -> Optional[Decimal]:
+    """
+    Parse a single quantity such as "2", "1.5", "1,000", "3/4" or "2 1/4".
+
+    Args:
+        text: Quantity text
+
+    Returns:
+        Decimal value, or None if the text isn't a single number
+    """
+    total = Decimal(0)
+    parts = _THOUSANDS.sub("", normalize_fractions(text)).replace(",", ".").split()
+    if not parts:
+        return None
+    try:
+        for part in parts:
+            if "/" in part:
+                numerator, denominator = part.split("/")
+                total += Decimal(numerator) / Decimal(denominator)
+            else:
+                total += Decimal(part)
+    except (InvalidOperation, ValueError, ZeroDivisionError):
+        return None
+    return total
+
+
+def parse_ingredient_line(line: str) -> Optional[Ingredient]:
+    """
+    Split an ingredient line like "2 1/4 cups all-purpose flour" into its parts.
+
+    Ranges ("1-2 cloves garlic") keep their quantity as text, and lines
+    without a leading quantity ("salt to taste") get an empty quantity.
+
+    Args:
+        line: One line from a recipe's ingredient list
+
+    Returns:
+        Ingredient, or None if the line is empty
+    """
+    text = " ".join(normalize_fractions(line).split())
+    if not text:
+        return None
+
+    quantity = ""
+    match = _QUANTITY.match(text)
+    if match:
+        raw_quantity = match.group("quantity")
+        quantity = parse_quantity(raw_quantity)
+        if quantity is None:
+            quantity = re.sub(r"\s*(?:-|–|to)\s*", "-", raw_quantity)
+        text = text[match.end() :]
+
+    unit = ""
+    match = _UNIT.match(text)
+    if match:
+        unit = match.group("unit").lower()
+        text = text[match.end() :].strip()
+        if text.lower().startswith("of "):
+            text = text[3:]
+
+    return Ingredient(name=text or line.strip(), quantity=quantity, unit=unit)
@@ -0,0 +1,319 @@
+import re
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ingredient_parser import normalize_fractions, parse_quantity
+from models import Ingredient, NormalizedIngredient
+
+# Spellings -> canonical unit
+UNIT_ALIASES = {
+    "teaspoon": "tsp",
+    "teaspoons": "tsp",
+    "tsp": "tsp",
+    "tsps": "tsp",
+    "tablespoon": "tbsp",
+    "tablespoons": "tbsp",
+    "tbsp": "tbsp",
+    "tbsps": "tbsp",
+    "tbs": "tbsp",
+    "tbl": "tbsp",
+    "cup": "cup",
+    "cups": "cup",
+    "c": "cup",
+    "fluid ounce": "fl oz",
+    "fluid ounces": "fl oz",
+    "fl oz": "fl oz",
+    "pint": "pint",
+    "pints": "pint",
+    "pt": "pint",
+    "quart": "quart",
+    "quarts": "quart",
+    "qt": "quart",
+    "gallon": "gallon",
+    "gallons": "gallon",
+    "gal": "gallon",
+    "milliliter": "ml",
+    "milliliters": "ml",
+    "millilitre": "ml",
+    "millilitres": "ml",
+    "ml": "ml",
+    "liter": "l",
+    "liters": "l",
+    "litre": "l",
+    "litres": "l",
+    "l": "l",
+    "milligram": "mg",
+    "milligrams": "mg",
+    "mg": "mg",
+    "gram": "g",
+    "grams": "g",
+    "gr": "g",
+    "g": "g",
+    "kilogram": "kg",
+    "kilograms": "kg",
+    "kg": "kg",
+    "ounce": "oz",
+    "ounces": "oz",
+    "oz": "oz",
+    "pound": "lb",
+    "pounds": "lb",
+    "lb": "lb",
+    "lbs": "lb",
+    "pinch": "pinch",
+    "pinches": "pinch",
+    "dash": "dash",
+    "dashes": "dash",
+    "clove": "clove",
+    "cloves": "clove",
+    "can": "can",
+    "cans": "can",
+    "slice": "slice",
+    "slices": "slice",
+    "piece": "piece",
+    "pieces": "piece",
+    "stick": "stick",
+    "sticks": "stick",
+    "bunch": "bunch",
+    "bunches": "bunch",
+    "sprig": "sprig",
+    "sprigs": "sprig",
+    "package": "package",
+    "packages": "package",
+    "pkg": "package",
+}
+
+# Units a scaled amount may be re-expressed in, smallest first, as
+# (unit, size in the ladder's base unit, smallest amount shown in it)
+LADDERS = (
+    (
+        ("tsp", 4.92892159375, 0.0),
+        ("tbsp", 14.78676478125, 14.78676478125),
+        ("cup", 236.5882365, 59.147059125),  # from 1/4 cup
+    ),
+    (("ml", 1.0, 0.0), ("l", 1000.0, 1000.0)),
+    (("g", 1.0, 0.0), ("kg", 1000.0, 1000.0)),
+    (("oz", 28.349523125, 0.0), ("lb", 453.59237, 453.59237)),
+)
+
+# US cooking units are rounded to the nearest 1/8, counts to the nearest 1/4;
+# metric units and the rest keep three significant digits
+US_UNITS = {"tsp", "tbsp", "cup", "fl oz", "pint", "quart", "gallon", "oz", "lb"}
+COUNT_UNITS = {
+    "",
+    "pinch",
+    "dash",
+    "clove",
+    "can",
+    "slice",
+    "piece",
+    "stick",
+    "bunch",
+    "sprig",
+    "package",
+}
+
+_RANGE = re.compile(r"\s*(?:-|–|—|\bto\b|\bor\b)\s*")
+_APPROXIMATE = re.compile(r"^(?:about|approx(?:imately|\.)?|~)\s*", re.IGNORECASE)
+
+
+def canonical_unit(unit: str) -> str:
+    """
+    Map a unit spelling to its canonical form ("Tablespoons" becomes "tbsp").
+
+    Args:
+        unit: Unit as written
+
+    Returns:
+        str: Canonical unit; unknown units are lowercased and kept
+    """
+    unit = " ".join(unit.lower().replace(".", " ").split())
+    return UNIT_ALIASES.get(unit, unit)
+
+
+def parse_amount(
+    quantity: Decimal | str,
+) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+    """
+    Parse a quantity, including fractions, vulgar fractions and ranges.
+
+    Args:
+        quantity: Quantity as stored, e.g. Decimal("2"), "1 1/2", "½" or "1-2"
+
+    Returns:
+        Tuple of the amount (lower bound of a range) and the range's upper
+        bound, None where the quantity isn't numeric
+    """
+    if isinstance(quantity, (int, Decimal)):
+        return Decimal(quantity), None
+    text = _APPROXIMATE.sub("", normalize_fractions(str(quantity)).strip())
+    if not text:
+        return None, None
+    amount = parse_quantity(text)
+    if amount is not None:
+        return amount, None
+    parts = _RANGE.split(text, maxsplit=1)
+    if len(parts) == 2:
+        low, high = parse_quantity(parts[0]), parse_quantity(parts[1])
+        if low is not None and high is not None:
+            return low, high
+    return None, None
+
+
+def normalize_ingredients(
+    ingredients: Iterable[Ingredient],
+) -> List[NormalizedIngredient]:
+    """
+    Parse every ingredient's quantity and unit, for storing with the recipe.
+
+    Args:
+        ingredients: Ingredients as parsed
+
+    Returns:
+        One NormalizedIngredient per ingredient, in the same order
+    """
+    normalized = []
+    for ingredient in ingredients:
+        quantity, quantity_max = parse_amount(ingredient.quantity)
+        normalized.append(
+            NormalizedIngredient(
+                quantity=quantity,
+                quantity_max=quantity_max,
+                unit=canonical_unit(ingredient.unit),
+            )
+        )
+    return normalized
+
+
+def scale_ingredients(
+    ingredients: List[dict], normalized: List[dict], factor: float
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Scale ingredient amounts by a factor, e.g. to cook for more servings.
+
+    Amounts are scaled as numpy arrays. Amounts in a unit with a larger or
+    smaller sibling are re-expressed in the most readable one (9 tsp becomes
+    3 tbsp, 1500 g becomes 1.5 kg), then rounded for cooking.
+
+    Args:
+        ingredients: Stored ingredients ({"name", "quantity", "unit"})
+        normalized: Stored normalized ingredients, in the same order
+        factor: Multiplier for every amount
+
+    Returns:
+        Tuple of the scaled ingredients, in the stored format, and the
+        scaled normalized ingredients. Non-numeric quantities are unchanged.
+    """
+    units = [item["unit"] for item in normalized]
+    low = np.array([_float(item["quantity"]) for item in normalized], dtype=np.float64)
+    high = np.array(
+        [_float(item.get("quantity_max")) for item in normalized], dtype=np.float64
+    )
+    low *= factor
+    high *= factor
+
+    # Re-express each ladder's amounts in the largest unit they reach
+    display_units = list(units)
+    for ladder in LADDERS:
+        names = [name for name, _, _ in ladder]
+        rows = np.flatnonzero([unit in names for unit in units])
+        if not len(rows):
+            continue
+        sizes = np.array([size for _, size, _ in ladder])
+        thresholds = np.array([threshold for _, _, threshold in ladder])
+        to_base = sizes[[names.index(units[row]) for row in rows]]
+        steps = np.searchsorted(thresholds, low[rows] * to_base, side="right") - 1
+        steps = np.clip(steps, 0, len(ladder) - 1)
+        low[rows] *= to_base / sizes[steps]
+        high[rows] *= to_base / sizes[steps]
+        for row, step in zip(rows, steps):
+            display_units[row] = names[step]
+
+    increments = np.array([_increment(unit) for unit in display_units])
+    low, high = _round(low, increments), _round(high, increments)
+
+    scaled, scaled_normalized = [], []
+    for i, (ingredient, unit) in enumerate(zip(ingredients, display_units)):
+        if np.isnan(low[i]):
+            scaled.append(dict(ingredient))
+            scaled_normalized.append(dict(normalized[i]))
+            continue
+        amount = _decimal(low[i])
+        amount_max = None if np.isnan(high[i]) else _decimal(high[i])
+        scaled.append(
+            {
+                **ingredient,
+                "quantity": amount if amount_max is None else f"{amount}-{amount_max}",
+                "unit": unit if unit != units[i] else ingredient["unit"],
+            }
+        )
+        scaled_normalized.append(
+            {"quantity": amount, "quantity_max": amount_max, "unit": unit}
+        )
+    return scaled, scaled_normalized
+
+
+def _float(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+def _increment(unit: str) -> float:
+    if unit in US_UNITS:
+        return 0.125
+    if unit in COUNT_UNITS:
+        return 0.25
+    return 0.0  # three significant digits
+
+
+def _round(values: np.ndarray, increments: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitude = np.floor(np.log10(np.abs(values)))
+        steps = np.where(increments > 0, increments, 10.0 ** (magnitude - 2))
+        rounded = np.round(values / steps) * steps
+    # Don't round a small amount (a pinch for a tenth of the servings) to nothing
+    return np.where((rounded == 0) | (values == 0), values, rounded)
+
+
+def _decimal(value: float) -> Decimal:
+    return Decimal(f"{value:.3g}" if value < 0.125 else f"{value:.10g}")
+
+
+def scale_recipe(recipe: dict, servings: int) -> dict:
+    """
+    Scale a stored recipe's ingredients to a number of servings.
+
+    Recipes saved before quantities were normalized are normalized on the
+    fly. Calories and macros are per serving, so they are unchanged.
+
+    Args:
+        recipe: Stored recipe item
+        servings: Servings to cook
+
+    Returns:
+        dict: Copy of the recipe for the new servings, with "original_servings"
+
+    Raises:
+        ValueError: If the recipe doesn't say how many servings it makes
+    """
+    if not recipe.get("servings"):
+        raise ValueError("Recipe has no servings count to scale from")
+    normalized = recipe.get("normalized_ingredients")
+    if normalized is None:
+        normalized = [
+            item.model_dump()
+            for item in normalize_ingredients(
+                Ingredient.model_validate(ingredient)
+                for ingredient in recipe["ingredients"]
+            )
+        ]
+    ingredients, normalized = scale_ingredients(
+        recipe["ingredients"], normalized, servings / float(recipe["servings"])
+    )
+    return {
+        **recipe,
+        "servings": servings,
+        "original_servings": recipe["servings"],
+        "ingredients": ingredients,
+        "normalized_ingredients": normalized,
+    }
@@ -0,0 +1,395 @@
+import ipaddress
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from models import DecimalEncoder, to_json
+from sqlite_db import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+# Statuses of jobs still waiting for or holding a worker
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue is at its maximum depth."""
+
+
+def validate_callback_url(url: str):
+    """
+    Check that a webhook URL is http(s) and points only at public addresses.
+
+    Webhooks are sent from inside the server, so a callback URL must not
+    reach private, loopback or link-local hosts such as cloud metadata.
+
+    Args:
+        url: Callback URL supplied with a job
+
+    Raises:
+        ValueError: If the URL isn't http(s) or its host resolves to a
+            non-public address (or doesn't resolve)
+    """
+    parts = urlsplit(url) if isinstance(url, str) else None
+    if parts is None or parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http or https URL")
+    try:
+        addresses = socket.getaddrinfo(
+            parts.hostname, parts.port, proto=socket.IPPROTO_TCP
+        )
+    except (socket.gaierror, ValueError):
+        raise ValueError(
+            f"callback_url host {parts.hostname} doesn't resolve"
+        ) from None
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"callback_url host {parts.hostname} isn't public")
+
+
+class JobQueue:
+    """Bounded job queue backed by SQLite and drained by a pool of worker threads.
+
+    Jobs live in SQLite, so every gunicorn worker sharing the database file
+    can answer status requests and pick up queued work. Submitting a job
+    whose key matches a queued or running job returns that job instead of
+    queueing a duplicate, and adds the submitter's callback URL to the job's
+    webhooks. A running job holds a lease; if its worker dies
+    before finishing, the job is claimed again once the lease expires.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[dict], object],
+        path: Optional[str] = "jobs.sqlite3",
+        workers: int = 2,
+        max_depth: int = 100,
+        result_ttl: float = 24 * 60 * 60,
+        webhook_timeout: float = 10,
+        poll_interval: float = 1.0,
+        lease: float = 15 * 60,
+    ):
+        """
+        Initialize the queue, creating the database if needed.
+
+        Workers are started on the first submit.
+
+        Args:
+            handler: Called with a job's payload; its JSON-serializable return
+                value becomes the job result, and an exception fails the job
+            path: Path to the SQLite database file (None keeps jobs in memory)
+            workers: Number of worker threads in this process
+            max_depth: Maximum number of queued jobs before submit raises QueueFull
+            result_ttl: Seconds finished jobs are kept
+            webhook_timeout: Timeout in seconds for completion webhooks
+            poll_interval: Seconds idle workers wait before checking for jobs
+                queued by other processes
+            lease: Seconds a worker may hold a running job before another
+                worker claims it again
+        """
+        self.handler = handler
+        self.workers = workers
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self.webhook_timeout = webhook_timeout
+        self.poll_interval = poll_interval
+        self.lease = lease
+
+        self._db = SQLiteDatabase(path, "jobs")
+
+        with self._db.connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    key TEXT,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    callback_url TEXT,
+                    extra_callback_urls TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    claimed_at REAL,
+                    lease_expires_at REAL
+                )""")
+            # Databases created before leases and shared jobs' callbacks
+            # existed lack those columns
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in (
+                ("claimed_at", "REAL"),
+                ("lease_expires_at", "REAL"),
+                ("extra_callback_urls", "TEXT"),
+            ):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key)")
+
+        self._threads: List[threading.Thread] = []
+        self._wakeup = threading.Condition()
+        self._stopping = False
+
+    @classmethod
+    def from_config(cls, handler: Callable[[dict], object], app_config) -> "JobQueue":
+        """
+        Build the queue described by a Flask config.
+
+        Args:
+            handler: Job handler, see __init__
+            app_config: Mapping with the JOBS_* settings from config.py
+        """
+        return cls(
+            handler,
+            path=app_config.get("JOBS_DB_PATH"),
+            workers=app_config["JOBS_WORKERS"],
+            max_depth=app_config["JOBS_MAX_DEPTH"],
+            result_ttl=app_config["JOBS_RESULT_TTL"],
+            lease=app_config["JOBS_LEASE"],
+        )
+
+    def submit(
+        self,
+        payload: dict,
+        key: Optional[str] = None,
+        callback_url: Optional[str] = None,
+    ) -> dict:
+        """
+        Queue a job, or return the active job with the same key.
+
+        Args:
+            payload: JSON-serializable job input passed to the handler
+            key: Deduplication key; jobs with the same key share one run
+            callback_url: URL that receives the finished job as a JSON POST
+                (optional); also added to the active job returned for key
+
+        Returns:
+            dict: The job (see get())
+
+        Raises:
+            QueueFull: If max_depth jobs are already queued
+            ValueError: If callback_url isn't a public http(s) URL
+        """
+        if callback_url:
+            validate_callback_url(callback_url)
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._db.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if key is not None:
+                row = conn.execute(
+                    "SELECT id, callback_url, extra_callback_urls FROM jobs "
+                    "WHERE key = ? AND status IN (?, ?)",
+                    (key, *ACTIVE_STATUSES),
+                ).fetchone()
+                if row is not None:
+                    logger.info(f"Job {row[0]} already covers {key}")
+                    extra = json.loads(row[2]) if row[2] else []
+                    if callback_url and callback_url not in [row[1], *extra]:
+                        conn.execute(
+                            "UPDATE jobs SET extra_callback_urls = ? WHERE id = ?",
+                            (json.dumps([*extra, callback_url]), row[0]),
+                        )
+                    # Workers here can reclaim the job if its own worker died
+                    self._start_workers()
+                    return self._get(conn, row[0])
+            (depth,) = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued'"
+            ).fetchone()
+            if depth >= self.max_depth:
+                raise QueueFull(f"Job queue is full ({depth} jobs queued)")
+            conn.execute(
+                "DELETE FROM jobs WHERE status NOT IN (?, ?) AND updated_at < ?",
+                (*ACTIVE_STATUSES, now - self.result_ttl),
+            )
+            conn.execute(
+                "INSERT INTO jobs (id, key, status, payload, callback_url, created_at, "
+                "updated_at) VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, key, json.dumps(payload), callback_url, now, now),
+            )
+            job = self._get(conn, job_id)
+
+        self._start_workers()
+        with self._wakeup:
+            self._wakeup.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: ID returned by submit()
+
+        Returns:
+            dict with id, status ("queued", "running", "succeeded" or "failed"),
+            result, error, created_at and updated_at; None if there is no such job
+        """
+        with self._db.connect() as conn:
+            return self._get(conn, job_id)
+
+    @staticmethod
+    def _get(conn: sqlite3.Connection, job_id: str) -> Optional[dict]:
+        row = conn.execute(
+            "SELECT id, status, result, error, created_at, updated_at "
+            "FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "status": row[1],
+            "result": json.loads(row[2]) if row[2] is not None else None,
+            "error": row[3],
+            "created_at": row[4],
+            "updated_at": row[5],
+        }
+
+    def depth(self) -> int:
+        """Return the number of queued jobs."""
+        with self._db.connect() as conn:
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued'"
+            ).fetchone()
+        return count
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[dict]:
+        """
+        Block until a job finishes or the timeout expires.
+
+        Args:
+            job_id: ID returned by submit()
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            dict: The job in its latest state, or None if there is no such job
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] not in ACTIVE_STATUSES:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(0.05)
+
+    def close(self):
+        """Stop the worker threads after their current jobs."""
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._stopping = False
+
+    def _start_workers(self):
+        with self._wakeup:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"job-worker-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while not self._stopping:
+            try:
+                claimed = self._claim()
+            except sqlite3.Error as e:
+                # e.g. the database stayed locked past the timeout; try again later
+                logger.error(f"Error claiming a job: {str(e)}")
+                claimed = None
+            if claimed is None:
+                with self._wakeup:
+                    if not self._stopping:
+                        self._wakeup.wait(self.poll_interval)
+                continue
+            self._run(*claimed)
+
+    def _claim(self):
+        """Mark the oldest queued or abandoned running job as running and return it."""
+        now = time.time()
+        with self._db.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Running jobs from before leases existed expire a lease after
+            # their last update
+            row = conn.execute(
+                "SELECT id, payload, status FROM jobs "
+                "WHERE status = 'queued' OR (status = 'running' "
+                "AND COALESCE(lease_expires_at, updated_at + ?) < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (self.lease, now),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] == "running":
+                logger.warning(f"Reclaiming job {row[0]}, whose lease expired")
+            conn.execute(
+                "UPDATE jobs SET status = 'running', claimed_at = ?, "
+                "lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                (now, now + self.lease, now, row[0]),
+            )
+        return row[0], json.loads(row[1])
+
+    def _run(self, job_id: str, payload: dict):
+        result, error = None, None
+        try:
+            result = to_json(self.handler(payload))
+            status = "succeeded"
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            status, error = "failed", str(e)
+
+        with self._db.connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? "
+                "WHERE id = ?",
+                (status, result, error, time.time(), job_id),
+            )
+            job = self._get(conn, job_id)
+            # Read after the job left the active statuses, so no submit can
+            # add a callback that is then missed
+            callback_url, extra_callback_urls = conn.execute(
+                "SELECT callback_url, extra_callback_urls FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+
+        callback_urls = [callback_url] if callback_url else []
+        callback_urls += json.loads(extra_callback_urls) if extra_callback_urls else []
+        for url in callback_urls:
+            self._notify(url, job)
+
+    def _notify(self, callback_url: str, job: dict):
+        try:
+            # Checked again in case the host now resolves somewhere private
+            validate_callback_url(callback_url)
+        except ValueError as e:
+            logger.error(f"Not sending webhook for job {job['id']}: {e}")
+            return
+        try:
+            # Redirects could point the POST at a private host
+            response = requests.post(
+                callback_url,
+                data=json.dumps(job, cls=DecimalEncoder),
+                headers={"Content-Type": "application/json"},
+                timeout=self.webhook_timeout,
+                allow_redirects=False,
+            )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.error(f"Webhook for job {job['id']} to {callback_url} failed: {e}")
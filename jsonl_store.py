@@ -0,0 +1,297 @@
+import argparse
+import fcntl
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from models import DecimalEncoder
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts to take a file lock another process holds
+LOCK_POLL_INTERVAL = 0.005
+
+
+class JsonlRecipeStore:
+    """Append-only JSON Lines recipe store with an in-memory offset index.
+
+    Every save appends one line, so a batch of N recipes costs O(N) I/O. A
+    delete appends a tombstone. The latest line for an ID wins until
+    compact() rewrites the file without superseded lines. Appends take an
+    exclusive flock, so several gunicorn workers can share one file.
+    """
+
+    def __init__(
+        self,
+        path: str = "recipes.jsonl",
+        fsync_every: int = 32,
+        fsync_interval: float = 1.0,
+    ):
+        """
+        Initialize the store, creating the file if needed.
+
+        Args:
+            path: Path to the JSON Lines file
+            fsync_every: Appends between fsync calls
+            fsync_interval: Maximum seconds between fsync calls while appending
+        """
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).touch(exist_ok=True)
+
+        self._index: Dict[str, int] = {}  # recipe ID -> offset of its latest line
+        self._indexed_size = 0
+        self._inode = None
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _locked(self, mode: str, lock_type: int):
+        with self._lock:
+            while True:
+                f = open(self.path, mode)
+                _flock(f, lock_type)
+                # compact() may have replaced the file while we waited for the lock
+                if os.fstat(f.fileno()).st_ino == os.stat(self.path).st_ino:
+                    break
+                f.close()
+            try:
+                yield f
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+                f.close()
+
+    def append(self, record: dict):
+        """
+        Append a record, replacing any earlier record with the same ID.
+
+        Args:
+            record: JSON-serializable record with an "id" key
+        """
+        line = json.dumps(record, cls=DecimalEncoder) + "\n"
+        with self._locked("r+b", fcntl.LOCK_EX) as f:
+            # Catch up on lines other processes appended before taking the offset
+            self._refresh_index()
+            offset = f.seek(0, os.SEEK_END)
+            if offset > self._indexed_size:
+                # Appends hold the exclusive lock until their line is complete,
+                # so a partial last line was left by a writer that crashed
+                logger.warning(
+                    f"Truncating {offset - self._indexed_size} bytes of a partial "
+                    f"line at the end of {self.path}"
+                )
+                f.truncate(self._indexed_size)
+                offset = f.seek(self._indexed_size)
+            f.write(line.encode())
+            f.flush()
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_fsync >= self.fsync_interval
+            ):
+                self._fsync(f)
+            self._apply(record, offset)
+            self._indexed_size = offset + len(line.encode())
+
+    def delete(self, recipe_id: str):
+        """
+        Delete a record by appending a tombstone.
+
+        Args:
+            recipe_id: ID of the record to delete
+        """
+        self.append({"id": recipe_id, "_deleted": True})
+
+    def flush(self):
+        """fsync any appends that haven't been synced yet."""
+        with self._locked("ab", fcntl.LOCK_EX) as f:
+            if self._unsynced:
+                self._fsync(f)
+
+    def get(self, recipe_id: str) -> Optional[dict]:
+        """
+        Look up the latest record for an ID with a single seek.
+
+        Args:
+            recipe_id: ID of the record
+
+        Returns:
+            The record, or None if it doesn't exist or was deleted
+        """
+        with self._locked("rb", fcntl.LOCK_SH) as f:
+            self._refresh_index()
+            offset = self._index.get(recipe_id)
+            if offset is None:
+                return None
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def __contains__(self, recipe_id: str) -> bool:
+        with self._locked("rb", fcntl.LOCK_SH):
+            self._refresh_index()
+            return recipe_id in self._index
+
+    def __len__(self) -> int:
+        with self._locked("rb", fcntl.LOCK_SH):
+            self._refresh_index()
+            return len(self._index)
+
+    def scan(self) -> Iterator[dict]:
+        """
+        Iterate over the latest version of every live record, in file order.
+
+        The file is read through a memory map, so records are decoded one at
+        a time without loading the whole file. The records are those stored
+        when iteration starts; the lock isn't held while they are yielded, so
+        the caller may append or delete as it goes.
+
+        Yields:
+            Live records
+        """
+        with self._locked("rb", fcntl.LOCK_SH) as f:
+            self._refresh_index()
+            live_offsets = set(self._index.values())
+            size = self._indexed_size
+            if size == 0:
+                return
+            # Lines up to size never change: appends go after them and compact()
+            # writes a new file, so the map can be read after the lock is released
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with mapped:
+            offset = 0
+            while offset < size:
+                end = mapped.find(b"\n", offset, size)
+                if offset in live_offsets:
+                    record = self._decode(mapped[offset:end], offset)
+                    if record is not None:
+                        yield record
+                offset = end + 1
+
+    def compact(self) -> dict:
+        """
+        Rewrite the file with only the latest version of each live record.
+
+        Returns:
+            dict: Line counts before and after compaction
+        """
+        tmp_path = f"{self.path}.compact"
+        with self._locked("rb", fcntl.LOCK_EX) as f:
+            self._refresh_index()
+            lines_before = self._line_count(f)
+            with open(tmp_path, "wb") as tmp:
+                for offset in sorted(self._index.values()):
+                    f.seek(offset)
+                    tmp.write(f.readline())
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, self.path)
+            self._reset_index()
+            self._refresh_index()
+            return {"lines_before": lines_before, "lines_after": len(self._index)}
+
+    def export_json(self, output_file: str):
+        """
+        Write every live record as a JSON array, the legacy recipes.json format.
+
+        Args:
+            output_file: Path of the JSON file to write
+        """
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, "w") as out:
+            json.dump(list(self.scan()), out, indent=4, cls=DecimalEncoder)
+
+    def _refresh_index(self):
+        """Index lines appended since the last refresh (by any process)."""
+        stat = os.stat(self.path)
+        if stat.st_ino != self._inode or stat.st_size < self._indexed_size:
+            # The file was compacted (possibly by another process)
+            self._reset_index()
+            self._inode = stat.st_ino
+        if stat.st_size == self._indexed_size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed_size)
+            offset = self._indexed_size
+            for line in f:
+                # A line without its newline is still being written
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    record = self._decode(line, offset)
+                    if record is not None:
+                        self._apply(record, offset)
+                offset += len(line)
+            self._indexed_size = offset
+
+    def _decode(self, line: bytes, offset: int) -> Optional[dict]:
+        try:
+            return json.loads(line)
+        except ValueError as e:
+            logger.error(f"Skipping unreadable line at {self.path}:{offset}: {str(e)}")
+            return None
+
+    def _apply(self, record: dict, offset: int):
+        if record.get("_deleted"):
+            self._index.pop(record["id"], None)
+        else:
+            self._index[record["id"]] = offset
+
+    def _reset_index(self):
+        self._index = {}
+        self._indexed_size = 0
+        self._inode = None
+
+    def _fsync(self, f):
+        os.fsync(f.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    @staticmethod
+    def _line_count(f) -> int:
+        f.seek(0)
+        return sum(1 for _ in f)
+
+
+def _flock(f, lock_type: int):
+    """
+    Take an flock, polling instead of blocking in the kernel.
+
+    A blocking flock would stall a gevent worker's every greenlet; time.sleep
+    yields to them once gevent has monkey-patched it.
+    """
+    while True:
+        try:
+            fcntl.flock(f, lock_type | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            time.sleep(LOCK_POLL_INTERVAL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain a JSON Lines recipe store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compact = subparsers.add_parser("compact", help="Drop superseded and deleted lines")
+    compact.add_argument("path")
+    export = subparsers.add_parser("export", help="Export as a JSON array")
+    export.add_argument("path")
+    export.add_argument("output_file")
+    args = parser.parse_args()
+
+    store = JsonlRecipeStore(args.path)
+    if args.command == "compact":
+        print(json.dumps(store.compact()))
+    else:
+        store.export_json(args.output_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from sqlite_db import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """In-memory LRU cache tier with TTL and size-based eviction."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl: Optional[float] = 24 * 60 * 60,
+    ):
+        """
+        Initialize the in-memory tier.
+
+        Args:
+            max_entries: Maximum number of entries kept before evicting the least recently used
+            max_bytes: Maximum total size of cached values in bytes
+            ttl: Seconds an entry stays valid (None disables expiry)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, value)
+            self._size += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._size > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self._size -= len(value.encode())
+
+
+class SQLiteCache:
+    """On-disk cache tier backed by a local SQLite database."""
+
+    def __init__(
+        self,
+        path: str = "llm_cache.sqlite3",
+        max_entries: int = 100_000,
+        ttl: Optional[float] = 30 * 24 * 60 * 60,
+    ):
+        """
+        Initialize the SQLite tier, creating the database if needed.
+
+        Args:
+            path: Path to the SQLite database file
+            max_entries: Maximum number of rows kept before pruning the oldest
+            ttl: Seconds an entry stays valid (None disables expiry)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._db = SQLiteDatabase(path, "llm_cache")
+        with self._db.connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS llm_cache_accessed_at "
+                "ON llm_cache (accessed_at)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._db.connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and created_at + self.ttl <= now:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._db.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    "SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def clear(self):
+        with self._db.connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def __len__(self):
+        with self._db.connect() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        return count
+
+
+class LLMCache:
+    """Content-addressed cache of LLM responses, checked tier by tier."""
+
+    def __init__(self, tiers: List):
+        """
+        Initialize the cache with an ordered list of tiers.
+
+        Args:
+            tiers: Cache tiers ordered fastest first; each needs get(key) and set(key, value)
+        """
+        self.tiers = tiers
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, app_config) -> Optional["LLMCache"]:
+        """
+        Build the cache described by a Flask config, or None if caching is disabled.
+
+        Args:
+            app_config: Mapping with the LLM_CACHE_* settings from config.py
+        """
+        if not app_config.get("LLM_CACHE_ENABLED"):
+            return None
+        tiers = [
+            MemoryCache(
+                max_entries=app_config["LLM_CACHE_MAX_ENTRIES"],
+                max_bytes=app_config["LLM_CACHE_MAX_BYTES"],
+                ttl=app_config["LLM_CACHE_TTL"],
+            )
+        ]
+        if app_config.get("LLM_CACHE_PATH"):
+            tiers.append(
+                SQLiteCache(
+                    path=app_config["LLM_CACHE_PATH"],
+                    ttl=app_config["LLM_CACHE_TTL"],
+                )
+            )
+        return cls(tiers)
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, description: str) -> str:
+        """
+        Build a cache key from everything that determines the LLM response.
+
+        Args:
+            model: Name of the model the request is sent to
+            system_prompt: System prompt sent with the request
+            description: Recipe description sent as the user message
+
+        Returns:
+            str: SHA-256 hash of the model, prompt and description
+        """
+        digest = hashlib.sha256()
+        for part in (model, system_prompt, description):
+            digest.update(part.encode())
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look a key up in each tier, promoting hits into the faster tiers.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            The cached value if any tier has it, None otherwise
+        """
+        for i, tier in enumerate(self.tiers):
+            try:
+                value = tier.get(key)
+            except Exception as e:
+                logger.warning(f"LLM cache tier {type(tier).__name__} failed: {e}")
+                continue
+            if value is not None:
+                for faster_tier in self.tiers[:i]:
+                    faster_tier.set(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        """
+        Store a value in every tier.
+
+        Args:
+            key: Cache key from make_key
+            value: Serialized LLM response
+        """
+        for tier in self.tiers:
+            try:
+                tier.set(key, value)
+            except Exception as e:
+                logger.warning(f"LLM cache tier {type(tier).__name__} failed: {e}")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
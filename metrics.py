@@ -0,0 +1,423 @@
+import atexit
+import bisect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlite_db import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+# Name -> (type, help) for every metric the app exports
+METRICS = {
+    "recime_http_request_duration_seconds": (
+        "histogram",
+        "Time to handle an HTTP request, by endpoint and status",
+    ),
+    "recime_stage_duration_seconds": (
+        "histogram",
+        "Time spent in each stage of a scrape",
+    ),
+    "recime_stage_bytes": (
+        "histogram",
+        "Size of each stage's output (fetched HTML, extracted content, "
+        "compacted content sent to the LLM)",
+    ),
+    "recime_llm_tokens_total": ("counter", "OpenAI tokens used, from response usage"),
+    "recime_scrapes_total": ("counter", "Scrapes by outcome"),
+    "recime_cascade_tier_total": (
+        "counter",
+        "Recipes each parsing tier read, by whether the result was accepted",
+    ),
+    "recime_cascade_tier_duration_seconds": (
+        "histogram",
+        "Time each parsing tier took, including its LLM call",
+    ),
+    "recime_http_cache_events_total": ("counter", "Page fetches by cache outcome"),
+    "recime_http_cache_bytes_total": (
+        "counter",
+        "Page bytes downloaded, and bytes the page cache saved downloading",
+    ),
+    "recime_llm_cache_lookups_total": ("counter", "LLM response cache lookups"),
+    "recime_singleflight_calls_total": (
+        "counter",
+        "Fetch-and-parse calls made, and callers that shared another's result",
+    ),
+}
+
+# Process key the totals of exited processes are merged under
+EXITED_PROCESS = "exited"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (1024, 10240, 102400, 524288, 1048576, 5242880)
+
+# Stage timings of the request being handled, for its Server-Timing header
+_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar(
+    "timings", default=None
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def start_timing() -> List[Tuple[str, float]]:
+    """
+    Start collecting stage timings for the current request.
+
+    Returns:
+        The list Metrics.stage appends (stage, seconds) pairs to
+    """
+    timings: List[Tuple[str, float]] = []
+    _timings.set(timings)
+    return timings
+
+
+def server_timing(timings: List[Tuple[str, float]], total: float) -> str:
+    """
+    Format stage timings as a Server-Timing header value.
+
+    Args:
+        timings: (stage, seconds) pairs; repeated stages are added up
+        total: Seconds the whole request took
+
+    Returns:
+        str: e.g. "fetch;dur=120.3, llm;dur=850.0, total;dur=990.1"
+    """
+    durations: Dict[str, float] = {}
+    for stage, seconds in timings:
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    durations["total"] = total
+    return ", ".join(
+        f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in durations.items()
+    )
+
+
+class Metrics:
+    """Prometheus counters and histograms, aggregated across processes.
+
+    Each process keeps running totals in memory and a background thread
+    writes them to SQLite every flush_interval seconds, under a key unique
+    to the process. Rendering sums every process's rows, so /metrics served
+    by any gunicorn worker reports the whole server. When a process exits
+    its rows are merged into one aggregate row per series, so restarts don't
+    add series; rows of processes that died without merging are merged by
+    the next process to start once they stop being flushed.
+    """
+
+    def __init__(self, path: Optional[str] = "metrics.sqlite3", flush_interval=5.0):
+        """
+        Initialize the metrics, creating the database if needed.
+
+        Args:
+            path: Path to the SQLite database file shared by every process
+                (None keeps the metrics of this process only, in memory)
+            flush_interval: Seconds between writes of this process's totals;
+                a process that hasn't written for ten intervals (and at least
+                a minute) is taken to have exited
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self._process = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        # (name, labels) -> [bucket counts..., +Inf count], sum
+        self._histograms: Dict[Tuple[str, Labels], Tuple[List[int], float]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._collectors: List[Callable[[], Dict[Tuple[str, Labels], float]]] = []
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        # Totals as last written, and the part of them another process merged
+        # into the exited processes' row while this one wasn't flushing
+        self._flushed: Dict[Tuple[str, Labels], float] = {}
+        self._merged: Dict[Tuple[str, Labels], float] = {}
+        self._flush_lock = threading.Lock()
+
+        if path:
+            self._db = SQLiteDatabase(path, "metrics")
+            with self._db.connect() as conn:
+                conn.execute("""CREATE TABLE IF NOT EXISTS metrics (
+                        process TEXT NOT NULL,
+                        name TEXT NOT NULL,
+                        labels TEXT NOT NULL,
+                        value REAL NOT NULL,
+                        updated_at REAL,
+                        PRIMARY KEY (process, name, labels)
+                    )""")
+                # Databases created before rows were timestamped lack updated_at
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(metrics)")}
+                if "updated_at" not in columns:
+                    conn.execute("ALTER TABLE metrics ADD COLUMN updated_at REAL")
+                self._merge_stale(conn)
+            atexit.register(self.close)
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        """
+        Add to a counter.
+
+        Args:
+            name: Metric name (see METRICS)
+            amount: Amount to add
+            **labels: Label values, e.g. kind="prompt"
+        """
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._start_flusher()
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        buckets: Tuple[float, ...] = DURATION_BUCKETS,
+        **labels: str,
+    ):
+        """
+        Record a value in a histogram.
+
+        Args:
+            name: Metric name (see METRICS)
+            value: Observed value, e.g. seconds
+            buckets: Upper bounds of the histogram's buckets
+            **labels: Label values, e.g. stage="fetch"
+        """
+        key = (name, _labels(labels))
+        with self._lock:
+            self._buckets.setdefault(name, buckets)
+            counts, total = self._histograms.get(key) or ([0] * (len(buckets) + 1), 0)
+            counts[bisect.bisect_left(buckets, value)] += 1
+            self._histograms[key] = (counts, total + value)
+        self._start_flusher()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a stage of the pipeline, for its histogram and the Server-Timing header.
+
+        Args:
+            name: Stage name, e.g. "fetch" or "llm"
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe("recime_stage_duration_seconds", seconds, stage=name)
+            timings = _timings.get()
+            if timings is not None:
+                timings.append((name, seconds))
+
+    def add_collector(self, collect: Callable[[], Dict[Tuple[str, Labels], float]]):
+        """
+        Add counters read from elsewhere, e.g. a cache's stats(), when rendering.
+
+        Args:
+            collect: Returns this process's running totals as
+                {(name, labels): value}; see counter()
+        """
+        self._collectors.append(collect)
+
+    def flush(self):
+        """Write this process's totals to the database."""
+        if not self.path:
+            return
+        samples = self._samples()
+        with self._flush_lock:
+            try:
+                with self._db.connect() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    merged = (
+                        self._flushed
+                        and not conn.execute(
+                            "SELECT 1 FROM metrics WHERE process = ? LIMIT 1",
+                            (self._process,),
+                        ).fetchone()
+                    )
+                    if merged:
+                        # Taken for a dead process's rows and merged (see
+                        # _merge_stale); only what came after is still ours
+                        for key, value in self._flushed.items():
+                            self._merged[key] = self._merged.get(key, 0) + value
+                    values = {
+                        key: value - self._merged.get(key, 0)
+                        for key, value in samples.items()
+                    }
+                    now = time.time()
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO metrics "
+                        "(process, name, labels, value, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (self._process, name, json.dumps(labels), value, now)
+                            for (name, labels), value in values.items()
+                        ],
+                    )
+                self._flushed = values
+            except sqlite3.Error as e:
+                logger.error(f"Error writing metrics: {str(e)}")
+
+    def close(self):
+        """Write this process's totals and merge them into the exited processes' row."""
+        if not self.path:
+            return
+        self.flush()
+        try:
+            with self._db.connect() as conn:
+                self._merge(conn, "process = ?", (self._process,))
+        except sqlite3.Error as e:
+            logger.error(f"Error merging metrics: {str(e)}")
+
+    def _merge_stale(self, conn: sqlite3.Connection):
+        """
+        Merge the rows of processes that stopped flushing, e.g. killed workers.
+
+        A process that was only idle finds its rows gone on its next flush,
+        and from then on writes only what it counted after the merge.
+        """
+        stale_before = time.time() - max(60.0, 10 * self.flush_interval)
+        self._merge(
+            conn,
+            "process IN (SELECT process FROM metrics WHERE process != ? "
+            "GROUP BY process HAVING MAX(COALESCE(updated_at, 0)) < ?)",
+            (EXITED_PROCESS, stale_before),
+        )
+
+    def _merge(self, conn: sqlite3.Connection, where: str, params: tuple):
+        """Add the rows matching where to the exited processes' row, then delete them."""
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "INSERT INTO metrics (process, name, labels, value, updated_at) "
+            f"SELECT ?, name, labels, SUM(value), ? FROM metrics WHERE {where} "
+            "GROUP BY name, labels "
+            "ON CONFLICT (process, name, labels) "
+            "DO UPDATE SET value = value + excluded.value, "
+            "updated_at = excluded.updated_at",
+            (EXITED_PROCESS, time.time(), *params),
+        )
+        conn.execute(f"DELETE FROM metrics WHERE {where}", params)
+
+    def render(self) -> str:
+        """
+        Render every process's metrics in the Prometheus text format.
+
+        Returns:
+            str: Exposition text for GET /metrics
+        """
+        if self.path:
+            # This process's rows only stay fresh if they are flushed regularly
+            self._start_flusher()
+            self.flush()
+            with self._db.connect() as conn:
+                rows = conn.execute(
+                    "SELECT name, labels, SUM(value) FROM metrics "
+                    "GROUP BY name, labels ORDER BY name, labels"
+                ).fetchall()
+            samples = {
+                (name, tuple(tuple(pair) for pair in json.loads(labels))): value
+                for name, labels, value in rows
+            }
+        else:
+            samples = self._samples()
+
+        lines = []
+        for family, (kind, help_text) in METRICS.items():
+            family_samples = sorted(
+                (
+                    (name, labels, value)
+                    for (name, labels), value in samples.items()
+                    if name == family
+                    or (
+                        name.startswith(family + "_")
+                        and name[len(family) + 1 :] in ("bucket", "sum", "count")
+                    )
+                ),
+                key=_sort_key,
+            )
+            if not family_samples:
+                continue
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {kind}")
+            for name, labels, value in family_samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _samples(self) -> Dict[Tuple[str, Labels], float]:
+        """This process's counters, histogram series and collected counters."""
+        with self._lock:
+            samples = dict(self._counters)
+            histograms = {
+                key: (list(counts), total)
+                for key, (counts, total) in self._histograms.items()
+            }
+        for (name, labels), (counts, total) in histograms.items():
+            cumulative = 0
+            for bound, count in zip(self._buckets[name] + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                samples[(f"{name}_bucket", labels + (("le", le),))] = cumulative
+            samples[(f"{name}_sum", labels)] = total
+            samples[(f"{name}_count", labels)] = cumulative
+        for collect in self._collectors:
+            try:
+                samples.update(collect())
+            except Exception as e:
+                logger.error(f"Error collecting metrics: {str(e)}")
+        return samples
+
+    def _start_flusher(self):
+        if not self.path or self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+def counter(name: str, value: float, **labels: str) -> Dict[Tuple[str, Labels], float]:
+    """
+    Build one collected counter sample, for Metrics.add_collector.
+
+    Args:
+        name: Metric name (see METRICS)
+        value: Running total
+        **labels: Label values
+
+    Returns:
+        {(name, labels): value}
+    """
+    return {(name, _labels(labels)): value}
+
+
+def _sort_key(sample) -> tuple:
+    # Series stay together, with their buckets in increasing order of le
+    name, labels, _ = sample
+    series = tuple(pair for pair in labels if pair[0] != "le")
+    le = dict(labels).get("le")
+    return (series, name, float(le) if le is not None else 0.0)
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
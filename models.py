@@ -1,9 +1,37 @@
+import json
 from decimal import Decimal
-from typing import List
+from typing import List, Literal
 
+import pydantic_core
 from pydantic import BaseModel
 
 
+class DecimalEncoder(json.JSONEncoder):
+    """Custom JSON encoder to handle Decimal values."""
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return str(obj)
+        return super().default(obj)
+
+
+def to_json(value, indent: int | None = None) -> str:
+    """
+    Serialize a value to JSON with pydantic-core, without a Python encoder pass.
+
+    Decimals are written as strings, like DecimalEncoder does, and models
+    are serialized directly rather than dumped to dicts first.
+
+    Args:
+        value: Models, dicts, lists and JSON scalars, in any nesting
+        indent: Spaces to indent by (None writes compact JSON)
+
+    Returns:
+        str: JSON text
+    """
+    return pydantic_core.to_json(value, indent=indent).decode()
+
+
 class Ingredient(BaseModel):
     """Represents a recipe ingredient with quantity and unit."""
 
@@ -12,6 +40,14 @@ class Ingredient(BaseModel):
     unit: str
 
 
+class NormalizedIngredient(BaseModel):
+    """An ingredient's quantity parsed to numbers, with its unit in canonical form."""
+
+    quantity: Decimal | None  # None if the quantity isn't numeric ("to taste")
+    quantity_max: Decimal | None = None  # Upper bound of a range like "1-2"
+    unit: str  # Canonical unit, e.g. "tbsp" for "Tablespoons"; "" if none
+
+
 class Macro(BaseModel):
     """Represents nutritional macro information."""
 
@@ -41,3 +77,57 @@ class Recipe(BaseRecipe):
     updated_at: int  # unix timestamp
     user_email: str  # Email of the user who owns the recipe
     image_url: str | None
+    # How the recipe was parsed: "json-ld", "microdata", "heuristic", "llm",
+    # or e.g. "json-ld+llm"
+    parse_method: str | None = None
+    # Parsed quantities, one per ingredient, set when saving
+    normalized_ingredients: List[NormalizedIngredient] | None = None
+
+
+class ParsedPage(BaseModel):
+    """Recipe content parsed from a page, before it is stored for a user."""
+
+    recipe: BaseRecipe
+    image_url: str | None = None
+    parse_method: str | None = None
+
+
+# BaseRecipe fields that may be None, when a page doesn't state them
+OPTIONAL_RECIPE_FIELDS = ("fat", "carbs", "protein")
+
+
+class StructuredRecipe(BaseModel):
+    """Recipe fields found in a page's schema.org structured data."""
+
+    source: Literal["json-ld", "microdata"]
+    fields: dict  # Subset of BaseRecipe fields that were found
+    image_url: str | None = None
+
+    def missing_fields(self) -> List[str]:
+        """
+        Return the required BaseRecipe fields the structured data didn't provide.
+
+        Macros are optional in BaseRecipe, and many nutrition blocks give
+        only calories, so missing macros don't count.
+        """
+        return [
+            name
+            for name in BaseRecipe.model_fields
+            if name not in self.fields and name not in OPTIONAL_RECIPE_FIELDS
+        ]
+
+    def base_recipe(self) -> BaseRecipe:
+        """Build a BaseRecipe from complete fields, leaving missing macros None."""
+        return BaseRecipe.model_validate(
+            {**dict.fromkeys(OPTIONAL_RECIPE_FIELDS), **self.fields}
+        )
+
+
+class ParseResult(BaseModel):
+    """Outcome of parsing one recipe in a batch."""
+
+    index: int  # Position of the recipe in the batch input
+    url: str
+    status: Literal["parsed", "skipped", "failed"]
+    recipe: Recipe | None = None
+    error: str | None = None
@@ -0,0 +1,217 @@
+import argparse
+import json
+import math
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import boto3
+import numpy as np
+
+from dynamodb_store import iter_recipes
+from index_store import MirroredIndex
+
+# Grams per unit for macro amounts; other units are treated as unknown
+GRAMS_PER_UNIT = {
+    "g": 1.0,
+    "gr": 1.0,
+    "gram": 1.0,
+    "grams": 1.0,
+    "mg": 0.001,
+    "milligram": 0.001,
+    "milligrams": 0.001,
+    "kg": 1000.0,
+    "oz": 28.349523125,
+    "ounce": 28.349523125,
+    "ounces": 28.349523125,
+}
+
+# Per-serving columns; recipes store nutrition per serving, like schema.org
+COLUMNS = ("calories", "protein_g", "fat_g", "carbs_g")
+
+# GET /recipes parameters -> (column, bound)
+FILTER_PARAMS = {
+    "min_calories_per_serving": ("calories", "min"),
+    "max_calories_per_serving": ("calories", "max"),
+    "min_protein_g": ("protein_g", "min"),
+    "max_protein_g": ("protein_g", "max"),
+    "min_fat_g": ("fat_g", "min"),
+    "max_fat_g": ("fat_g", "max"),
+    "min_carbs_g": ("carbs_g", "min"),
+    "max_carbs_g": ("carbs_g", "max"),
+}
+
+# Columns results can be sorted by ("-" prefix for descending)
+SORT_KEYS = COLUMNS + ("created_at",)
+
+
+def macro_grams(macro: Optional[dict]) -> Optional[float]:
+    """
+    Convert a stored Macro to grams.
+
+    Args:
+        macro: Macro as stored ({"amount": ..., "unit": ...}) or None
+
+    Returns:
+        float: Amount in grams, or None if it is missing or in an unknown unit
+    """
+    if not isinstance(macro, dict):
+        return None
+    unit = str(macro.get("unit") or "g").strip().lower().rstrip(".")
+    factor = GRAMS_PER_UNIT.get(unit)
+    amount = _number(macro.get("amount"))
+    if factor is None or amount is None:
+        return None
+    return amount * factor
+
+
+def _number(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def parse_filters(args: Mapping[str, str]) -> List[Tuple[str, str, float]]:
+    """
+    Read the nutrition filters out of request parameters.
+
+    Args:
+        args: Request parameters, e.g. {"max_calories_per_serving": "500"}
+
+    Returns:
+        (column, "min" or "max", value) for every filter parameter present
+
+    Raises:
+        ValueError: If a filter value isn't a finite number
+    """
+    filters = []
+    for param, (column, bound) in FILTER_PARAMS.items():
+        if param in args:
+            value = _number(args[param])
+            if value is None:
+                raise ValueError(f"Invalid {param}: {args[param]}")
+            filters.append((column, bound, value))
+    return filters
+
+
+class NutritionIndex(MirroredIndex):
+    """Columnar per-serving nutrition values for filtering and sorting recipes.
+
+    Each recipe's calories and macros (converted to grams) are kept in an
+    IndexStore and mirrored in memory as one float64 numpy array per column,
+    with NaN for unknown values. A query combines every range predicate into
+    one boolean mask and sorts the matches with lexsort, without reading the
+    recipes themselves.
+    """
+
+    table = "recipe_nutrition"
+
+    def __init__(self, path: Optional[str] = "nutrition_index.sqlite3"):
+        """
+        Initialize the index, creating the database if needed.
+
+        Args:
+            path: Path to the SQLite database file (None keeps the index in memory)
+        """
+        super().__init__(path)
+
+    def query(
+        self,
+        filters: Iterable[Tuple[str, str, float]] = (),
+        user_email: Optional[str] = None,
+        sort: str = "-created_at",
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[str], int]:
+        """
+        Find the recipes within every range, in sorted order.
+
+        Recipes with an unknown value for a filtered column don't match, and
+        sort after known values. Ties are broken newest first.
+
+        Args:
+            filters: (column, "min" or "max", value) bounds, inclusive (see parse_filters)
+            user_email: Only consider this user's recipes (optional)
+            sort: Column in SORT_KEYS, "-" prefixed for descending
+            offset: Matches to skip, for pagination
+            limit: Maximum number of IDs to return (None for all)
+
+        Returns:
+            Tuple of the matching recipe IDs and the total number of matches
+
+        Raises:
+            ValueError: If sort names an unknown column
+        """
+        key = sort.lstrip("-")
+        if key not in SORT_KEYS:
+            raise ValueError(f"Invalid sort: {sort}")
+
+        with self._lock:
+            self._sync()
+            mask = self._candidates(user_email)
+            if mask is None:
+                return [], 0
+            for column, bound, value in filters:
+                values = self._columns[column]
+                # Comparisons with NaN are False, so unknown values never match
+                mask &= values >= value if bound == "min" else values <= value
+
+            rows = np.flatnonzero(mask)
+            values = self._columns[key][rows]
+            newest_first = -self._columns["created_at"][rows]
+            order = np.lexsort(
+                (newest_first, -values if sort.startswith("-") else values)
+            )
+            end = None if limit is None else offset + limit
+            return [self._ids[rows[i]] for i in order[offset:end]], len(rows)
+
+    def _entry(self, recipe: dict) -> dict:
+        return {
+            "user_email": recipe.get("user_email"),
+            "created_at": _number(recipe.get("created_at")),
+            "calories": _number(recipe.get("calories")),
+            "protein_g": macro_grams(recipe.get("protein")),
+            "fat_g": macro_grams(recipe.get("fat")),
+            "carbs_g": macro_grams(recipe.get("carbs")),
+        }
+
+    def _reset(self):
+        super()._reset()
+        self._values: Dict[str, List[float]] = {key: [] for key in SORT_KEYS}
+        self._columns: Dict[str, np.ndarray] = {
+            key: np.zeros(0, dtype=np.float64) for key in SORT_KEYS
+        }
+
+    def _append(self, row: int, entry: dict):
+        for key in SORT_KEYS:
+            value = entry.get(key)
+            self._values[key].append(math.nan if value is None else value)
+
+    def _build_arrays(self):
+        # Rows are only ever appended, so only the new tail is converted
+        for key, values in self._values.items():
+            column = self._columns[key]
+            if len(column) < len(values):
+                self._columns[key] = np.concatenate(
+                    [column, np.array(values[len(column) :], dtype=np.float64)]
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the nutrition index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild = subparsers.add_parser(
+        "rebuild", help="Index every recipe in the DynamoDB table"
+    )
+    rebuild.add_argument("--index-path", default="nutrition_index.sqlite3")
+    rebuild.add_argument("--table-name", default="recipes")
+    rebuild.add_argument("--region", default="us-east-1")
+    args = parser.parse_args()
+
+    index = NutritionIndex(args.index_path)
+    table = boto3.resource("dynamodb", region_name=args.region).Table(args.table_name)
+    print(json.dumps({"indexed": index.rebuild(iter_recipes(table))}))
+
+
+if __name__ == "__main__":
+    main()
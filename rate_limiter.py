@@ -0,0 +1,162 @@
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+import openai
+
+T = TypeVar("T")
+
+
+class RateLimiter:
+    """Token-bucket limiter for OpenAI requests-per-minute and tokens-per-minute."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        """
+        Initialize the limiter. A limit of None is not enforced.
+
+        Args:
+            requests_per_minute: Maximum requests started per minute
+            tokens_per_minute: Maximum estimated tokens sent per minute
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, app_config, processes: int = 1) -> "RateLimiter":
+        """
+        Build one process's limiter for the OPENAI_*_PER_MINUTE settings.
+
+        Each limiter only sees its own process's requests, so when several
+        processes share the account's limits, each gets an equal share.
+
+        Args:
+            app_config: Mapping with the OPENAI_*_PER_MINUTE settings from config.py
+            processes: Number of processes sharing the limits
+        """
+        processes = max(1, processes)
+        return cls(
+            requests_per_minute=_share(
+                app_config["OPENAI_REQUESTS_PER_MINUTE"], processes
+            ),
+            tokens_per_minute=_share(app_config["OPENAI_TOKENS_PER_MINUTE"], processes),
+        )
+
+    def acquire(self, tokens: int = 0):
+        """
+        Block until a request of the given token size is allowed.
+
+        Args:
+            tokens: Estimated number of tokens the request will use
+        """
+        if self.tokens_per_minute:
+            # A single request larger than the budget still has to go through
+            tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                self._refill()
+                wait = max(
+                    self._wait_time(self._requests, 1, self.requests_per_minute),
+                    self._wait_time(self._tokens, tokens, self.tokens_per_minute),
+                )
+                if wait == 0:
+                    if self.requests_per_minute:
+                        self._requests -= 1
+                    if self.tokens_per_minute:
+                        self._tokens -= tokens
+                    return
+            time.sleep(wait)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        if self.requests_per_minute:
+            self._requests = min(
+                self.requests_per_minute,
+                self._requests + elapsed * self.requests_per_minute / 60,
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                self.tokens_per_minute,
+                self._tokens + elapsed * self.tokens_per_minute / 60,
+            )
+
+    @staticmethod
+    def _wait_time(available: float, needed: int, per_minute: Optional[int]) -> float:
+        if not per_minute or available >= needed:
+            return 0
+        return (needed - available) * 60 / per_minute
+
+
+def _share(limit: Optional[int], processes: int) -> Optional[int]:
+    return max(1, limit // processes) if limit else limit
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Check whether an OpenAI error is worth retrying (429, 5xx or connection errors).
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        bool: True if the request should be retried
+    """
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500
+    return False
+
+
+def retry_with_backoff(
+    func: Callable[[], T],
+    max_retries: int = 3,
+    base_delay: float = 0.5,
+    max_delay: float = 20.0,
+    retryable: Callable[[Exception], bool] = is_retryable,
+) -> T:
+    """
+    Call func, retrying retryable errors with full-jitter exponential backoff.
+
+    Args:
+        func: Zero-argument callable to run
+        max_retries: Number of retries after the first attempt
+        base_delay: Delay ceiling in seconds for the first retry
+        max_delay: Upper bound for any single delay in seconds
+        retryable: Decides whether an error is worth retrying (OpenAI errors by default)
+
+    Returns:
+        The return value of func
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == max_retries or not retryable(e):
+                raise
+            time.sleep(backoff_delay(attempt, base_delay, max_delay))
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Full-jitter delay before retry number attempt (counting from 0).
+
+    Args:
+        attempt: Number of retries already made
+        base_delay: Delay ceiling in seconds for the first retry
+        max_delay: Upper bound for any single delay in seconds
+
+    Returns:
+        float: Seconds to sleep
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
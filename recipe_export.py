@@ -0,0 +1,380 @@
+import argparse
+import gzip
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+from typing import List, Optional
+
+import boto3
+
+from dynamodb_store import decode_cursor, encode_cursor, is_throttle
+from models import DecimalEncoder
+from rate_limiter import retry_with_backoff
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+MANIFEST_NAME = "manifest.json"
+
+# Read capacity of one eventually consistent read of up to 4 KB
+RCU_PER_4KB = 0.5
+
+
+class CapacityLimiter:
+    """Paces DynamoDB reads to a read capacity budget shared by every worker.
+
+    Each call's consumed capacity is charged after it returns, pushing back
+    the time the next call may start. There is no burst allowance, so the
+    average rate never exceeds the budget.
+    """
+
+    def __init__(self, units_per_second: Optional[float]):
+        """
+        Initialize the limiter.
+
+        Args:
+            units_per_second: Capacity units allowed per second (None disables the limit)
+        """
+        self.units_per_second = units_per_second
+        self._next_call = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the budget allows another call."""
+        if not self.units_per_second:
+            return
+        with self._lock:
+            delay = self._next_call - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def consume(self, units: float):
+        """
+        Charge a finished call's consumed capacity.
+
+        Args:
+            units: Capacity units the call consumed
+        """
+        if not self.units_per_second:
+            return
+        with self._lock:
+            start = max(self._next_call, time.monotonic())
+            self._next_call = start + units / self.units_per_second
+
+
+class _ShardWriter:
+    """Writes one shard as gzipped JSON Lines or Parquet."""
+
+    def __init__(self, path: str, file_format: str):
+        self.path = path
+        self.file_format = file_format
+        self.items = 0
+        self._rows = []
+        # Level 6 compresses nearly as well as gzip's default 9 at a fraction
+        # of the CPU, which the scan threads share under the GIL
+        self._file = (
+            gzip.open(path, "wt", compresslevel=6) if file_format == "jsonl" else None
+        )
+
+    def write(self, items: List[dict]):
+        self.items += len(items)
+        if self._file is not None:
+            for item in items:
+                self._file.write(json.dumps(item, cls=DecimalEncoder) + "\n")
+        else:
+            self._rows.extend(_to_arrow_row(item) for item in items)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        else:
+            table = pyarrow.Table.from_pylist(self._rows)
+            pyarrow.parquet.write_table(table, self.path, compression="zstd")
+
+
+def _to_arrow_row(value):
+    # Parquet columns need one type per field, so Decimals become floats
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {key: _to_arrow_row(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_arrow_row(item) for item in value]
+    return value
+
+
+class SegmentedExporter:
+    """Exports a whole table with a parallel scan into compressed shard files.
+
+    The table is split into total_segments scan segments, read by a pool
+    of worker threads. Each segment writes its own shards. Progress is kept
+    in manifest.json: a segment records its LastEvaluatedKey each time it
+    closes a shard, so a rerun after a crash resumes every segment from its
+    last complete shard instead of starting over.
+    """
+
+    def __init__(
+        self,
+        table,
+        output_dir: str,
+        total_segments: int = 8,
+        workers: Optional[int] = None,
+        max_rcu: Optional[float] = None,
+        page_size: Optional[int] = None,
+        items_per_shard: int = 50_000,
+        file_format: str = "jsonl",
+    ):
+        """
+        Initialize the exporter.
+
+        Args:
+            table: boto3 Table to export
+            output_dir: Directory for the shards and manifest
+            total_segments: Number of parallel scan segments
+            workers: Segments scanned at once (defaults to total_segments)
+            max_rcu: Read capacity units per second to stay under (None for no limit)
+            page_size: Items per scan call (None lets DynamoDB fill 1 MB pages)
+            items_per_shard: Items written to a shard before starting the next
+            file_format: "jsonl" for gzipped JSON Lines or "parquet" (needs pyarrow)
+        """
+        if file_format not in ("jsonl", "parquet"):
+            raise ValueError(f"Unsupported format: {file_format}")
+        if file_format == "parquet" and not PARQUET_AVAILABLE:
+            raise ValueError("Parquet export needs pyarrow")
+        self.table = table
+        self.output_dir = output_dir
+        self.total_segments = total_segments
+        self.workers = workers or total_segments
+        self.page_size = page_size
+        self.items_per_shard = items_per_shard
+        self.file_format = file_format
+        self.limiter = CapacityLimiter(max_rcu)
+
+        self.consumed_rcu = 0.0
+        self.throttled = 0
+        self.items_exported = 0
+        self._lock = threading.Lock()
+        self._manifest = None
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.output_dir, MANIFEST_NAME)
+
+    def run(self) -> dict:
+        """
+        Export every segment that isn't finished yet.
+
+        Returns:
+            dict: items and shards in the export, seconds, items_per_second
+            for this run, consumed_rcu, throttled and how many segments were
+            already finished
+
+        Raises:
+            ValueError: If the output directory holds an export with other settings
+        """
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        self._manifest = self._load_manifest()
+        pending = [
+            segment
+            for segment in range(self.total_segments)
+            if not self._manifest["segments"][str(segment)]["done"]
+        ]
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            # list() re-raises the first worker error
+            list(executor.map(self._export_segment, pending))
+        seconds = time.monotonic() - start
+
+        self._manifest["finished_at"] = time.time()
+        self._save_manifest()
+        segments = self._manifest["segments"].values()
+        items = sum(segment["items"] for segment in segments)
+        return {
+            "items": items,
+            "shards": sum(len(segment["shards"]) for segment in segments),
+            "seconds": round(seconds, 3),
+            "items_per_second": (
+                round(self.items_exported / seconds, 1) if seconds else 0.0
+            ),
+            "consumed_rcu": round(self.consumed_rcu, 1),
+            "throttled": self.throttled,
+            "resumed_segments": self.total_segments - len(pending),
+        }
+
+    def _export_segment(self, segment: int):
+        with self._lock:
+            state = self._manifest["segments"][str(segment)]
+            start_key = (
+                decode_cursor(state["resume_cursor"])
+                if state["resume_cursor"]
+                else None
+            )
+            part = len(state["shards"])
+        writer = None
+
+        while True:
+            kwargs = {
+                "Segment": segment,
+                "TotalSegments": self.total_segments,
+                "ReturnConsumedCapacity": "TOTAL",
+            }
+            if self.page_size:
+                kwargs["Limit"] = self.page_size
+            if start_key:
+                kwargs["ExclusiveStartKey"] = start_key
+
+            self.limiter.wait()
+            response = retry_with_backoff(
+                lambda: self.table.scan(**kwargs),
+                max_retries=8,
+                base_delay=0.05,
+                max_delay=5.0,
+                retryable=self._is_throttle,
+            )
+            items = response.get("Items", [])
+            consumed = self._consumed_capacity(response, items)
+            self.limiter.consume(consumed)
+            with self._lock:
+                self.consumed_rcu += consumed
+
+            if items:
+                if writer is None:
+                    writer = _ShardWriter(
+                        self._shard_path(segment, part), self.file_format
+                    )
+                writer.write(items)
+            start_key = response.get("LastEvaluatedKey")
+
+            if writer is not None and (
+                writer.items >= self.items_per_shard or not start_key
+            ):
+                writer.close()
+                self._commit(segment, writer, start_key)
+                writer, part = None, part + 1
+            if not start_key:
+                break
+
+        with self._lock:
+            self._manifest["segments"][str(segment)]["done"] = True
+            self._save_manifest()
+
+    def _commit(self, segment: int, writer: _ShardWriter, resume_key: Optional[dict]):
+        with self._lock:
+            state = self._manifest["segments"][str(segment)]
+            state["shards"].append(
+                {"file": os.path.basename(writer.path), "items": writer.items}
+            )
+            state["items"] += writer.items
+            state["resume_cursor"] = encode_cursor(resume_key)
+            state["done"] = resume_key is None
+            self.items_exported += writer.items
+            self._save_manifest()
+
+    def _shard_path(self, segment: int, part: int) -> str:
+        extension = "jsonl.gz" if self.file_format == "jsonl" else "parquet"
+        return os.path.join(
+            self.output_dir, f"segment-{segment:04d}-part-{part:04d}.{extension}"
+        )
+
+    def _consumed_capacity(self, response: dict, items: List[dict]) -> float:
+        capacity = response.get("ConsumedCapacity", {}).get("CapacityUnits")
+        if capacity is not None:
+            return float(capacity)
+        # Estimate from the page size when the table doesn't report capacity
+        size = len(json.dumps(items, cls=DecimalEncoder))
+        return max(1, math.ceil(size / 4096)) * RCU_PER_4KB
+
+    def _is_throttle(self, error: Exception) -> bool:
+        if not is_throttle(error):
+            return False
+        with self._lock:
+            self.throttled += 1
+        return True
+
+    def _load_manifest(self) -> dict:
+        settings = {
+            "table": self.table.name,
+            "total_segments": self.total_segments,
+            "format": self.file_format,
+        }
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            existing = {key: manifest.get(key) for key in settings}
+            if existing != settings:
+                raise ValueError(
+                    f"{self.output_dir} holds an export with different settings: "
+                    f"{existing}"
+                )
+            logger.info(f"Resuming export into {self.output_dir}")
+            return manifest
+        return {
+            **settings,
+            "started_at": time.time(),
+            "segments": {
+                str(segment): {
+                    "done": False,
+                    "resume_cursor": None,
+                    "shards": [],
+                    "items": 0,
+                }
+                for segment in range(self.total_segments)
+            },
+        }
+
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export every recipe with a parallel DynamoDB scan"
+    )
+    parser.add_argument("output_dir")
+    parser.add_argument("--table-name", default="recipes")
+    parser.add_argument("--region", default="us-east-1")
+    parser.add_argument("--endpoint-url")
+    parser.add_argument("--segments", type=int, default=8)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--max-rcu", type=float, help="Read capacity units per second")
+    parser.add_argument("--page-size", type=int)
+    parser.add_argument("--items-per-shard", type=int, default=50_000)
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    dynamodb = boto3.resource(
+        "dynamodb", region_name=args.region, endpoint_url=args.endpoint_url
+    )
+    exporter = SegmentedExporter(
+        dynamodb.Table(args.table_name),
+        args.output_dir,
+        total_segments=args.segments,
+        workers=args.workers,
+        max_rcu=args.max_rcu,
+        page_size=args.page_size,
+        items_per_shard=args.items_per_shard,
+        file_format=args.format,
+    )
+    print(json.dumps(exporter.run()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import re
+from decimal import Decimal
+from typing import List, Optional
+
+from ingredient_parser import parse_ingredient_line
+from models import BaseRecipe
+
+# Section headings, matched against whole (short) lines of compacted content
+_INGREDIENTS_HEADING = re.compile(r"^(?:#+\s*)?ingredients?\b.{0,30}$", re.IGNORECASE)
+_INSTRUCTIONS_HEADING = re.compile(
+    r"^(?:#+\s*)?(?:instructions|directions|method|preparation|steps)\b.{0,30}$",
+    re.IGNORECASE,
+)
+_END_HEADING = re.compile(
+    r"^(?:#+\s*)?(?:notes?|recipe notes|tips|nutrition|nutrition facts|"
+    r"nutrition information|storage|video)\b.{0,30}$",
+    re.IGNORECASE,
+)
+# "- ", "1. ", "- Step 2: " and the like at the start of list items
+_LIST_MARKER = re.compile(
+    r"^(?:[-*•]\s+)?(?:step\s*\d+[.):]?\s+|\d+[.):]\s+)?", re.IGNORECASE
+)
+# A "# " title line, as compact_content writes an <h1>
+_TITLE = re.compile(r"^#\s+(.+)$")
+_STEP_NUMBER = re.compile(r"^(?:step\s*)?(\d+)[.):]\s", re.IGNORECASE)
+
+# A number with an optional decimal part and thousands separators ("1,200.5")
+_AMOUNT = r"\d+(?:,\d{3}(?!\d))*(?:\.\d+)?"
+
+_SERVINGS = re.compile(
+    r"\b(?:serves|servings|yields?|makes)\b\s*:?\s*(\d+)", re.IGNORECASE
+)
+_CALORIES = re.compile(
+    rf"\bcalories\b\s*:?\s*({_AMOUNT})|({_AMOUNT})\s*(?:kcal|calories)\b",
+    re.IGNORECASE,
+)
+_MACROS = {
+    "fat": re.compile(
+        rf"\b(?:total\s+)?fat\b\s*:?\s*({_AMOUNT})\s*(g|mg)\b", re.IGNORECASE
+    ),
+    "carbs": re.compile(
+        rf"\b(?:total\s+)?carb(?:ohydrate)?s?\b\s*:?\s*({_AMOUNT})\s*(g|mg)\b",
+        re.IGNORECASE,
+    ),
+    "protein": re.compile(rf"\bprotein\b\s*:?\s*({_AMOUNT})\s*(g|mg)\b", re.IGNORECASE),
+}
+
+# kcal per gram of each macro, for checking macros against calories
+KCAL_PER_GRAM = {"fat": 9, "carbs": 4, "protein": 4}
+# Relative difference allowed between calories and the macros' energy
+MACRO_TOLERANCE = 0.35
+MAX_CALORIES_PER_SERVING = 5000
+MAX_SERVINGS = 100
+
+
+def extract_heuristic_recipe(text: str) -> dict:
+    """
+    Read recipe fields from compacted page text with regexes, without the LLM.
+
+    The name is the first "# " title before the ingredients, if any.
+    Ingredients are the lines between an "Ingredients" heading and an
+    "Instructions" (or "Directions", "Method"...) heading, instructions
+    the lines after it up to a "Notes" or "Nutrition" heading. Servings,
+    calories and macros are found anywhere in the text.
+
+    Args:
+        text: Recipe content, one block per line (see compact_content)
+
+    Returns:
+        dict: The BaseRecipe fields that were found, which may be none
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    fields = {}
+
+    ingredients_at = _find(lines, _INGREDIENTS_HEADING)
+    instructions_at = _find(lines, _INSTRUCTIONS_HEADING, start=ingredients_at + 1)
+    if ingredients_at >= 0 and instructions_at > ingredients_at:
+        # Only a title heading is taken as the name: the first line may be a
+        # banner or breadcrumb, and with no name the model reads the page
+        title_at = _find(lines[:ingredients_at], _TITLE)
+        if title_at >= 0:
+            fields["name"] = _TITLE.match(lines[title_at]).group(1)
+        ingredients = [
+            parse_ingredient_line(_LIST_MARKER.sub("", line))
+            for line in lines[ingredients_at + 1 : instructions_at]
+            # Sub-headings like "For the sauce:"
+            if not line.endswith(":")
+        ]
+        ingredients = [ingredient for ingredient in ingredients if ingredient]
+        # Most lines of a real ingredient list start with a quantity
+        quantified = sum(1 for ingredient in ingredients if ingredient.quantity != "")
+        if ingredients and quantified * 2 >= len(ingredients):
+            fields["ingredients"] = ingredients
+
+        end = _find(lines, _END_HEADING, start=instructions_at + 1)
+        instructions = [
+            _LIST_MARKER.sub("", line)
+            for line in lines[instructions_at + 1 : end if end >= 0 else len(lines)]
+        ]
+        instructions = [line for line in instructions if len(line.split()) >= 2]
+        if instructions:
+            fields["instructions"] = instructions
+
+    match = _SERVINGS.search(text)
+    if match:
+        fields["servings"] = int(match.group(1))
+    match = _CALORIES.search(text)
+    if match:
+        fields["calories"] = _decimal(match.group(1) or match.group(2))
+    for macro, pattern in _MACROS.items():
+        match = pattern.search(text)
+        fields[macro] = (
+            {"amount": _decimal(match.group(1)), "unit": match.group(2).lower()}
+            if match
+            else None
+        )
+    return fields
+
+
+def check_recipe(recipe: BaseRecipe) -> List[str]:
+    """
+    Check a parsed recipe for signs it was read incompletely or wrongly.
+
+    Args:
+        recipe: Recipe from any parsing tier
+
+    Returns:
+        Descriptions of the problems found; empty if the recipe looks right
+    """
+    problems = []
+    if not recipe.name.strip():
+        problems.append("no name")
+    if not recipe.ingredients:
+        problems.append("no ingredients")
+    elif any(not ingredient.name.strip() for ingredient in recipe.ingredients):
+        problems.append("unnamed ingredients")
+    if not recipe.instructions:
+        problems.append("no instructions")
+    else:
+        steps = [_step_number(instruction) for instruction in recipe.instructions]
+        steps = [step for step in steps if step is not None]
+        if any(later <= earlier for earlier, later in zip(steps, steps[1:])):
+            problems.append("instructions out of order")
+    if not 0 < recipe.servings <= MAX_SERVINGS:
+        problems.append(f"implausible servings: {recipe.servings}")
+    if not 0 < recipe.calories <= MAX_CALORIES_PER_SERVING:
+        problems.append(f"implausible calories: {recipe.calories}")
+    else:
+        energy = _macro_energy(recipe)
+        if energy is not None and (
+            abs(energy - float(recipe.calories))
+            > MACRO_TOLERANCE * float(recipe.calories)
+        ):
+            problems.append(
+                f"macros ({energy:.0f} kcal) don't match calories ({recipe.calories})"
+            )
+    return problems
+
+
+def _find(lines: List[str], pattern: re.Pattern, start: int = 0) -> int:
+    for i in range(max(start, 0), len(lines)):
+        if pattern.match(lines[i]):
+            return i
+    return -1
+
+
+def _decimal(amount: str) -> Decimal:
+    return Decimal(amount.replace(",", ""))
+
+
+def _step_number(instruction: str) -> Optional[int]:
+    match = _STEP_NUMBER.match(instruction.strip())
+    return int(match.group(1)) if match else None
+
+
+def _macro_energy(recipe: BaseRecipe) -> Optional[float]:
+    """kcal from fat, carbs and protein, or None unless all three are in g or mg."""
+    energy = 0.0
+    for macro, kcal in KCAL_PER_GRAM.items():
+        value = getattr(recipe, macro)
+        if value is None or value.unit.lower() not in ("g", "mg"):
+            return None
+        grams = float(value.amount) / (1000 if value.unit.lower() == "mg" else 1)
+        energy += grams * kcal
+    return energy
@@ -2,25 +2,63 @@ import hashlib
 import json
 import os
 import time
-from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Literal, Optional
+from typing import List, Literal, Optional, Set, Tuple
 
 import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 from dotenv import load_dotenv
 from openai import OpenAI
+from pydantic import ValidationError
+
+from content_compactor import DEFAULT_MAX_TOKENS, compact_content
+from dynamodb_store import BatchWriteError, DynamoDBRecipeWriter
+from ingredient_index import IngredientIndex
+from ingredient_units import normalize_ingredients
+from jsonl_store import JsonlRecipeStore
+from llm_cache import LLMCache
+from metrics import BYTES_BUCKETS, Metrics
+from models import (
+    BaseRecipe,
+    DecimalEncoder,
+    ParseResult,
+    Recipe,
+    StructuredRecipe,
+)
+from nutrition_index import NutritionIndex
+from rate_limiter import RateLimiter, retry_with_backoff
+from recipe_heuristics import check_recipe, extract_heuristic_recipe
+from search_index import SearchIndex
+
+DEFAULT_MODEL = "gpt-4o-mini-2024-07-18"
+
+# Cascade tier that reads the recipe with regexes instead of a model
+HEURISTIC_TIER = "heuristic"
+
+SYSTEM_PROMPT = """You are a recipe parser that converts recipe descriptions into structured data.
+                        Extract the recipe name, servings, nutritional information, ingredients, and instructions.
+                        Format numbers as decimals where appropriate.
+                        For ingredients, separate quantity, unit, and name.
+                        For nutritional macros, separate amount and unit.
+                        Give calories and macros per serving; if the recipe only states totals for the whole recipe, divide them by the servings.
+                        If you can't find the information, return None.
+                        Make sure to include all ingredients and instructions.
+                        Make sure all instructions are in the same order as the recipe."""
 
-from models import BaseRecipe, Recipe
 
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the tokens a request uses, for rate limiting.
 
-class DecimalEncoder(json.JSONEncoder):
-    """Custom JSON encoder to handle Decimal values."""
+    Args:
+        text: Prompt text sent to OpenAI
 
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return str(obj)
-        return super().default(obj)
+    Returns:
+        int: Estimated prompt tokens plus an allowance for the response
+    """
+    return len(text) // 4 + 1000
 
 
 class RecipeParser:
@@ -28,47 +66,142 @@ class RecipeParser:
 
     def __init__(
         self,
-        storage_type: Literal["file", "dynamodb"] = "file",
+        storage_type: Literal["file", "jsonl", "dynamodb"] = "file",
         output_file: str = "recipes.json",
         table_name: str = "recipes",
         region: str = "us-east-1",
         client: Optional[OpenAI] = None,
+        cache: Optional[LLMCache] = None,
+        model: str = DEFAULT_MODEL,
+        max_concurrency: int = 4,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 3,
+        dynamodb=None,
+        indexes: Optional[List] = None,
+        metrics: Optional[Metrics] = None,
+        max_input_tokens: Optional[int] = DEFAULT_MAX_TOKENS,
+        escalation_models: Optional[List[str]] = None,
+        heuristics: bool = True,
     ):
         """
         Initialize the RecipeParser with OpenAI client and load environment variables.
 
         Args:
-            storage_type: Type of storage to use ("file" or "dynamodb")
-            output_file: Path to the output JSON file (only used if storage_type is "file")
+            storage_type: Type of storage to use ("file", "jsonl" or "dynamodb")
+            output_file: Path to the output JSON or JSON Lines file (only used if storage_type is "file" or "jsonl")
             table_name: Name of the DynamoDB table (only used if storage_type is "dynamodb")
             region: AWS region for DynamoDB (only used if storage_type is "dynamodb")
             client: Optional OpenAI client instance (if not provided, one will be created)
+            cache: Optional LLM response cache consulted before calling OpenAI
+            model: OpenAI model used for parsing
+            max_concurrency: Maximum OpenAI requests in flight during batch parsing
+            rate_limiter: Optional limiter shared by every OpenAI request
+            max_retries: Retries for OpenAI rate limit and server errors
+            dynamodb: Optional boto3 DynamoDB resource (if not provided, one will be created)
+            indexes: Indexes (e.g. a SearchIndex) told about every JSON Lines or
+                DynamoDB recipe that is stored, through add(recipes)
+            metrics: Optional metrics recording OpenAI call time and token usage
+            max_input_tokens: Token budget the recipe content is compacted to
+                before it is sent to OpenAI (None sends it as is)
+            escalation_models: Stronger models tried in order when the
+                recipe `model` parsed fails check_recipe
+            heuristics: Try reading the recipe with regexes before any model
         """
         load_dotenv()
 
-        # Only create a new OpenAI client if none is provided and we're not in a testing environment
-        if client is not None:
-            self.client = client
-        else:
-            # Check if we're in a testing environment
-            testing = os.environ.get("PYTEST_CURRENT_TEST") is not None
-            if testing:
-                raise ValueError("OpenAI client must be provided in test environment")
-            self.client = OpenAI()
+        # The OpenAI client is created on first use so storage-only work
+        # (like checking whether a recipe already exists) doesn't need one
+        self._client = client
 
+        self.cache = cache
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
         self.storage_type = storage_type
         self.output_file = output_file
-
+        self.indexes = indexes or []
+        self.metrics = metrics
+        self.max_input_tokens = max_input_tokens
+        self.escalation_models = escalation_models or []
+        self.heuristics = heuristics
+
+        if storage_type == "jsonl":
+            self.store = JsonlRecipeStore(output_file)
+        self._writer = None
         if storage_type == "dynamodb":
-            self.dynamodb = boto3.resource("dynamodb", region_name=region)
+            self.dynamodb = dynamodb or boto3.resource("dynamodb", region_name=region)
             self.table = self.dynamodb.Table(table_name)
 
+    @classmethod
+    def from_config(cls, app_config, **kwargs) -> "RecipeParser":
+        """
+        Build the parser described by a Flask config.
+
+        The LLM cache, rate limiter, indexes and metrics are created from
+        the config unless they are passed in, e.g. to share them with routes.
+
+        Args:
+            app_config: Mapping with the AWS_REGION, OPENAI_*, LLM_*,
+                HEURISTIC_PARSING, *_INDEX_PATH and METRICS_* settings
+            **kwargs: Other __init__ arguments, e.g. storage_type or dynamodb
+
+        Returns:
+            RecipeParser: A parser using the config's settings
+        """
+        if "cache" not in kwargs:
+            kwargs["cache"] = LLMCache.from_config(app_config)
+        if "rate_limiter" not in kwargs:
+            kwargs["rate_limiter"] = RateLimiter.from_config(app_config)
+        if "indexes" not in kwargs:
+            kwargs["indexes"] = [
+                SearchIndex(app_config["SEARCH_INDEX_PATH"]),
+                IngredientIndex(app_config["INGREDIENT_INDEX_PATH"]),
+                NutritionIndex(app_config["NUTRITION_INDEX_PATH"]),
+            ]
+        if "metrics" not in kwargs:
+            kwargs["metrics"] = Metrics(
+                app_config["METRICS_DB_PATH"], app_config["METRICS_FLUSH_INTERVAL"]
+            )
+        kwargs.setdefault("region", app_config["AWS_REGION"])
+        return cls(
+            max_concurrency=app_config["OPENAI_MAX_CONCURRENCY"],
+            max_retries=app_config["OPENAI_MAX_RETRIES"],
+            max_input_tokens=app_config["LLM_INPUT_MAX_TOKENS"],
+            model=app_config["OPENAI_MODEL"],
+            escalation_models=app_config["OPENAI_ESCALATION_MODELS"],
+            heuristics=app_config["HEURISTIC_PARSING"],
+            **kwargs,
+        )
+
+    @property
+    def client(self) -> OpenAI:
+        """OpenAI client, created on first use if none was provided."""
+        # Only create a new OpenAI client if none is provided and we're not in a testing environment
+        if self._client is None:
+            # Check if we're in a testing environment
+            testing = os.environ.get("PYTEST_CURRENT_TEST") is not None
+            if testing:
+                raise ValueError("OpenAI client must be provided in test environment")
+            # retry_with_backoff is the only retry layer, so the SDK's own
+            # retries don't multiply attempts or bypass the rate limiter
+            self._client = OpenAI(max_retries=0)
+        return self._client
+
+    @property
+    def writer(self) -> DynamoDBRecipeWriter:
+        """DynamoDB writer for the current table (only used if storage_type is "dynamodb")."""
+        if self._writer is None or self._writer.table is not self.table:
+            self._writer = DynamoDBRecipeWriter(self.table)
+        return self._writer
+
     def parse_recipe(
         self,
         description: str,
         url: str,
         user_email: str,
         image_url: Optional[str] = None,
+        structured: Optional[StructuredRecipe] = None,
     ) -> Optional[Recipe]:
         """
         Parse a recipe from a text description using OpenAI.
@@ -78,101 +211,492 @@ class RecipeParser:
             url: URL where the recipe was found
             user_email: Email of the user who owns the recipe
             image_url: URL of the recipe's image (optional)
+            structured: Recipe fields from the page's structured data (optional)
         Returns:
             Recipe object if successful, None otherwise
         """
         try:
-            # Create OpenAI API request
-            response = self.client.beta.chat.completions.parse(
-                model="gpt-4o-mini-2024-07-18",
-                response_format=BaseRecipe,  # Use BaseRecipe for parsing
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are a recipe parser that converts recipe descriptions into structured data.
-                        Extract the recipe name, servings, nutritional information, ingredients, and instructions.
-                        Format numbers as decimals where appropriate.
-                        For ingredients, separate quantity, unit, and name.
-                        For nutritional macros, separate amount and unit.
-                        If you can't find the information, return None.
-                        Make sure to include all ingredients and instructions.
-                        Make sure all instructions are in the same order as the recipe.""",
-                    },
-                    {"role": "user", "content": description},
-                ],
-                temperature=0.1,  # Lower temperature for more consistent parsing
+            base_recipe, parse_method = self.resolve_base_recipe(
+                description, structured
             )
-
-            # Parse the response into a BaseRecipe object first
-            base_recipe_dict = json.loads(response.choices[0].message.content)
-            base_recipe = BaseRecipe.model_validate(base_recipe_dict)
-
-            # Convert BaseRecipe to Recipe by adding metadata
-            recipe_dict = base_recipe.model_dump()
-            recipe_dict.update(
-                {
-                    "url": url,
-                    "image_url": image_url,
-                    "created_at": int(time.time()),
-                    "updated_at": int(time.time()),
-                    "user_email": user_email,
-                }
+            return self._build_recipe(
+                base_recipe, url, user_email, image_url, parse_method
             )
-            recipe = Recipe.model_validate(recipe_dict)
-            return recipe
 
         except Exception as e:
             print(f"Error parsing recipe: {str(e)}")
             return None
 
+    def _build_recipe(
+        self,
+        base_recipe: BaseRecipe,
+        url: str,
+        user_email: str,
+        image_url: Optional[str] = None,
+        parse_method: Optional[str] = None,
+    ) -> Recipe:
+        """
+        Convert a BaseRecipe to a Recipe by adding metadata.
+
+        Args:
+            base_recipe: Parsed recipe content
+            url: URL where the recipe was found
+            user_email: Email of the user who owns the recipe
+            image_url: URL of the recipe's image (optional)
+            parse_method: How the recipe content was parsed (optional)
+
+        Returns:
+            Recipe object with metadata fields set
+
+        Raises:
+            ValueError: If url or user_email isn't a string
+        """
+        # base_recipe is already validated, so its fields are reused as they
+        # are rather than dumped to a dict and validated again; only the
+        # metadata fields that come from the caller are checked
+        if not isinstance(url, str) or not isinstance(user_email, str):
+            raise ValueError("url and user_email must be strings")
+        now = int(time.time())
+        return Recipe.model_construct(
+            **dict(base_recipe),
+            url=url,
+            image_url=image_url,
+            created_at=now,
+            updated_at=now,
+            user_email=user_email,
+            parse_method=parse_method,
+            normalized_ingredients=normalize_ingredients(base_recipe.ingredients),
+        )
+
+    def save_base_recipe(
+        self,
+        base_recipe: BaseRecipe,
+        url: str,
+        user_email: str,
+        image_url: Optional[str] = None,
+        parse_method: Optional[str] = None,
+        overwrite: bool = False,
+    ) -> Recipe:
+        """
+        Store an already parsed recipe for a user.
+
+        Args:
+            base_recipe: Parsed recipe content
+            url: URL where the recipe was found
+            user_email: Email of the user who owns the recipe
+            image_url: URL of the recipe's image (optional)
+            parse_method: How the recipe content was parsed (optional)
+            overwrite: Replace the user's existing recipe for this URL
+
+        Returns:
+            The stored Recipe
+        """
+        recipe = self._build_recipe(
+            base_recipe, url, user_email, image_url, parse_method
+        )
+        self._save_recipe(recipe, overwrite=overwrite)
+        if self.storage_type == "jsonl":
+            self.store.flush()
+        return recipe
+
+    def resolve_base_recipe(
+        self,
+        description,
+        structured: Optional[StructuredRecipe] = None,
+        use_cache: bool = True,
+    ) -> Tuple[BaseRecipe, str]:
+        """
+        Build a BaseRecipe from structured data, calling the LLM only for missing fields.
+
+        Fields missing from the structured data are read by a cascade of
+        tiers, cheapest first: regex heuristics, then `model`, then each of
+        the escalation models. A tier's recipe is accepted if check_recipe
+        finds no problems with it; the last tier's is accepted regardless.
+
+        Args:
+            description: Text description of the recipe (may be None with complete structured data)
+            structured: Recipe fields from the page's structured data (optional)
+            use_cache: Read LLM responses from the cache; when False every
+                model is called again, and its response still cached
+
+        Returns:
+            Tuple of the BaseRecipe and how it was parsed (e.g. "json-ld",
+            "heuristic" or "json-ld+llm")
+        """
+        if structured is not None and not structured.missing_fields():
+            return structured.base_recipe(), structured.source
+
+        if description is None and structured is not None:
+            description = json.dumps(structured.fields, default=str)
+        description = str(description)
+        if self.max_input_tokens is not None:
+            with self.metrics.stage("compact") if self.metrics else nullcontext():
+                description = compact_content(description, self.max_input_tokens)
+            if self.metrics:
+                self.metrics.observe(
+                    "recime_stage_bytes",
+                    len(description.encode()),
+                    BYTES_BUCKETS,
+                    stage="compact",
+                )
+
+        # Fields found in the structured data win over every tier's reading
+        fields = structured.fields if structured is not None else {}
+        prefix = f"{structured.source}+" if fields else ""
+
+        tiers = [self.model, *self.escalation_models]
+        if self.heuristics:
+            tiers.insert(0, HEURISTIC_TIER)
+        for i, tier in enumerate(tiers):
+            start = time.perf_counter()
+            if tier == HEURISTIC_TIER:
+                try:
+                    base_recipe = BaseRecipe.model_validate(
+                        {**extract_heuristic_recipe(description), **fields}
+                    )
+                    problems = check_recipe(base_recipe)
+                except ValidationError:
+                    problems = ["incomplete"]
+            else:
+                base_recipe = self._parse_base_recipe(description, tier, use_cache)
+                if fields:
+                    base_recipe = BaseRecipe.model_validate(
+                        {**base_recipe.model_dump(), **fields}
+                    )
+                problems = check_recipe(base_recipe)
+
+            accepted = not problems or i == len(tiers) - 1
+            self._record_tier(tier, accepted, time.perf_counter() - start)
+            if accepted:
+                method = HEURISTIC_TIER if tier == HEURISTIC_TIER else "llm"
+                return base_recipe, prefix + method
+            print(f"Escalating recipe past {tier}: {', '.join(problems)}")
+
+    def _record_tier(self, tier: str, accepted: bool, seconds: float):
+        """
+        Count a cascade tier's outcome and time, for its hit rate and latency.
+
+        Args:
+            tier: HEURISTIC_TIER or a model name
+            accepted: Whether the tier's recipe was used
+            seconds: Time the tier took, including any LLM call
+        """
+        if self.metrics is None:
+            return
+        result = "accepted" if accepted else "escalated"
+        self.metrics.inc("recime_cascade_tier_total", tier=tier, result=result)
+        self.metrics.observe("recime_cascade_tier_duration_seconds", seconds, tier=tier)
+
+    def _parse_base_recipe(
+        self, description: str, model: Optional[str] = None, use_cache: bool = True
+    ) -> BaseRecipe:
+        """
+        Parse a description into a BaseRecipe, consulting the LLM cache first.
+
+        Args:
+            description: Text description of the recipe, already compacted
+            model: OpenAI model to use (defaults to self.model)
+            use_cache: Read the response from the cache if present (the new
+                response is cached either way)
+
+        Returns:
+            BaseRecipe parsed from the description
+        """
+        model = model or self.model
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(model, SYSTEM_PROMPT, description)
+            cached = self.cache.get(cache_key) if use_cache else None
+            if cached is not None:
+                return BaseRecipe.model_validate_json(cached)
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(estimate_tokens(SYSTEM_PROMPT + description))
+
+        # Create OpenAI API request, retrying rate limits and server errors
+        with self.metrics.stage("llm") if self.metrics else nullcontext():
+            response = retry_with_backoff(
+                lambda: self.client.beta.chat.completions.parse(
+                    model=model,
+                    response_format=BaseRecipe,  # Use BaseRecipe for parsing
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": description},
+                    ],
+                    temperature=0.1,  # Lower temperature for more consistent parsing
+                ),
+                max_retries=self.max_retries,
+            )
+        self._record_usage(response, model)
+
+        # The SDK has already validated the response into a BaseRecipe; fall
+        # back to validating the raw JSON if it didn't
+        message = response.choices[0].message
+        base_recipe = getattr(message, "parsed", None)
+        if not isinstance(base_recipe, BaseRecipe):
+            base_recipe = BaseRecipe.model_validate_json(message.content)
+
+        if cache_key is not None:
+            self.cache.set(cache_key, base_recipe.model_dump_json())
+        return base_recipe
+
+    def _record_usage(self, response, model: str):
+        """
+        Count the tokens an OpenAI response reports using.
+
+        Args:
+            response: Chat completion response
+            model: Model the response came from
+        """
+        usage = getattr(response, "usage", None)
+        if self.metrics is None or usage is None:
+            return
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", None)
+            if isinstance(tokens, int):
+                self.metrics.inc(
+                    "recime_llm_tokens_total", tokens, kind=kind, model=model
+                )
+
     def parse_recipes(
         self,
         descriptions: List[str],
         urls: List[str],
         user_emails: List[str],
         image_urls: Optional[List[str]] = None,
+        force: bool = False,
+        structured: Optional[List[Optional[StructuredRecipe]]] = None,
     ) -> List[Recipe]:
         """
         Process multiple recipe descriptions.
 
+        Recipes already stored in DynamoDB are skipped before calling OpenAI
+        unless force is set, in which case they are re-parsed and overwritten.
+
         Args:
             descriptions: List of recipe descriptions to parse
             urls: List of URLs where the recipes were found
             user_emails: List of user emails for the recipes
             image_urls: List of image URLs for the recipes (optional)
+            force: Re-parse and overwrite recipes that already exist
+            structured: Structured data found for each recipe (optional)
 
         Returns:
             List of successfully parsed Recipe objects
         """
-        recipes = []
+        results = self.parse_recipes_detailed(
+            descriptions, urls, user_emails, image_urls, force, structured
+        )
+        for result in results:
+            if result.status == "failed":
+                print(f"Error parsing recipe from {result.url}: {result.error}")
+        return [result.recipe for result in results if result.status == "parsed"]
+
+    def parse_recipes_detailed(
+        self,
+        descriptions: List[str],
+        urls: List[str],
+        user_emails: List[str],
+        image_urls: Optional[List[str]] = None,
+        force: bool = False,
+        structured: Optional[List[Optional[StructuredRecipe]]] = None,
+    ) -> List[ParseResult]:
+        """
+        Process multiple recipe descriptions concurrently, reporting every outcome.
+
+        Up to max_concurrency OpenAI requests are in flight at once. Storage
+        reads and writes stay on the calling thread.
+
+        Args:
+            descriptions: List of recipe descriptions to parse
+            urls: List of URLs where the recipes were found
+            user_emails: List of user emails for the recipes
+            image_urls: List of image URLs for the recipes (optional)
+            force: Re-parse and overwrite recipes that already exist
+            structured: Structured data found for each recipe (optional)
 
+        Returns:
+            One ParseResult per description, in input order
+        """
         # If no image URLs provided, use None for each recipe
         if image_urls is None:
             image_urls = [None] * len(descriptions)
+        if structured is None:
+            structured = [None] * len(descriptions)
+
+        items = list(zip(descriptions, urls, user_emails, image_urls, structured))
+        results: List[Optional[ParseResult]] = [None] * len(items)
+
+        # The IDs found here are handed to the batch write, so it needn't
+        # look them up again
+        stored = None if force else self._stored_ids(urls, user_emails)
+        pending = []
+        for i, (description, url, user_email, image_url, _) in enumerate(items):
+            if stored and self._generate_recipe_id(url, user_email) in stored:
+                print(f"Recipe with URL {url} already exists, skipping...")
+                results[i] = ParseResult(index=i, url=url, status="skipped")
+            else:
+                pending.append(i)
+
+        # DynamoDB recipes are written in batches once parsing is done
+        batched = []
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrency)) as executor:
+            futures = {}
+            for i in pending:
+                description, url, user_email, image_url, structured_data = items[i]
+                print(f"Processing recipe {i + 1}...")
+                # Forced re-parses call the model again instead of the cache
+                future = executor.submit(
+                    self.resolve_base_recipe,
+                    description,
+                    structured_data,
+                    use_cache=not force,
+                )
+                futures[future] = i
+
+            for future in as_completed(futures):
+                i = futures[future]
+                _, url, user_email, image_url, _ = items[i]
+                try:
+                    base_recipe, parse_method = future.result()
+                    recipe = self._build_recipe(
+                        base_recipe, url, user_email, image_url, parse_method
+                    )
+                except Exception as e:
+                    results[i] = ParseResult(
+                        index=i, url=url, status="failed", error=str(e)
+                    )
+                    continue
+                if self.storage_type == "dynamodb":
+                    batched.append((i, recipe))
+                else:
+                    self._save_recipe(recipe, overwrite=force)
+                results[i] = ParseResult(
+                    index=i, url=url, status="parsed", recipe=recipe
+                )
+
+        if batched:
+            written, errors = self._save_recipes_to_dynamodb(
+                [recipe for _, recipe in batched], overwrite=force, existing=stored
+            )
+            for (i, recipe), was_written, error in zip(batched, written, errors):
+                if error is not None:
+                    results[i] = ParseResult(
+                        index=i, url=recipe.url, status="failed", error=error
+                    )
+                elif not was_written:
+                    # Stored meanwhile, or superseded by a later duplicate
+                    results[i] = ParseResult(index=i, url=recipe.url, status="skipped")
+        if self.storage_type == "jsonl":
+            self.store.flush()
+        return results
+
+    def recipes_exist(self, urls: List[str], user_emails: List[str]) -> List[bool]:
+        """
+        Check which recipes are already stored, with batched reads for DynamoDB.
 
-        for i, (description, url, user_email, image_url) in enumerate(
-            zip(descriptions, urls, user_emails, image_urls), 1
-        ):
-            print(f"Processing recipe {i}...")
-            recipe = self.parse_recipe(description, url, user_email, image_url)
+        Args:
+            urls: URLs where the recipes were found
+            user_emails: Email of the user who owns each recipe
 
-            if recipe:
-                recipes.append(recipe)
-                self._save_recipe(recipe)
+        Returns:
+            One flag per URL, True if the recipe is already stored
+        """
+        existing = self._stored_ids(urls, user_emails) or set()
+        return [
+            self._generate_recipe_id(url, user_email) in existing
+            for url, user_email in zip(urls, user_emails)
+        ]
+
+    def _stored_ids(
+        self, urls: List[str], user_emails: List[str]
+    ) -> Optional[Set[str]]:
+        """
+        Find the IDs of the recipes that are already stored.
 
-        return recipes
+        Args:
+            urls: URLs where the recipes were found
+            user_emails: Email of the user who owns each recipe
+
+        Returns:
+            The stored recipe IDs, or None if the DynamoDB lookup failed
+        """
+        ids = [
+            self._generate_recipe_id(url, user_email)
+            for url, user_email in zip(urls, user_emails)
+        ]
+        if self.storage_type == "dynamodb":
+            try:
+                return self.writer.existing_ids(ids)
+            except (BotoCoreError, ClientError, RuntimeError) as e:
+                print(f"Error looking up recipes in DynamoDB: {str(e)}")
+                return None
+        if self.storage_type == "jsonl":
+            return {recipe_id for recipe_id in ids if recipe_id in self.store}
+        return set()
+
+    def find_recipe(self, url: str, user_email: str) -> Optional[dict]:
+        """
+        Look up a stored recipe by URL and user email.
+
+        Args:
+            url: URL where the recipe was found
+            user_email: Email of the user who owns the recipe
+
+        Returns:
+            The stored recipe item if it exists, None otherwise
+        """
+        if self.storage_type == "jsonl":
+            return self.store.get(self._generate_recipe_id(url, user_email))
+        if self.storage_type != "dynamodb":
+            return None
+        try:
+            recipe_id = self._generate_recipe_id(url, user_email)
+            return self.table.get_item(Key={"id": recipe_id}).get("Item")
+        except (BotoCoreError, ClientError) as e:
+            print(f"Error looking up recipe in DynamoDB: {str(e)}")
+            return None
 
-    def _save_recipe(self, recipe: Recipe):
+    def recipe_exists(self, url: str, user_email: str) -> bool:
         """
-        Save a recipe to the configured storage (file or DynamoDB).
+        Check whether a recipe is already stored, reading only its ID.
+
+        Args:
+            url: URL where the recipe was found
+            user_email: Email of the user who owns the recipe
+
+        Returns:
+            bool: True if the recipe is already stored
+        """
+        if self.storage_type == "jsonl":
+            return self._generate_recipe_id(url, user_email) in self.store
+        if self.storage_type != "dynamodb":
+            return False
+        try:
+            recipe_id = self._generate_recipe_id(url, user_email)
+            response = self.table.get_item(
+                Key={"id": recipe_id}, ProjectionExpression="id"
+            )
+            return "Item" in response
+        except (BotoCoreError, ClientError) as e:
+            print(f"Error looking up recipe in DynamoDB: {str(e)}")
+            return False
+
+    def _save_recipe(self, recipe: Recipe, overwrite: bool = False):
+        """
+        Save a recipe to the configured storage (file, JSON Lines or DynamoDB).
 
         Args:
             recipe: Recipe object to save
+            overwrite: Replace an existing JSON Lines or DynamoDB recipe instead of skipping it
         """
         if self.storage_type == "file":
             self._save_recipe_to_file(recipe)
+        elif self.storage_type == "jsonl":
+            self._save_recipe_to_jsonl(recipe, overwrite=overwrite)
         else:
-            self._save_recipe_to_dynamodb(recipe)
+            self._save_recipe_to_dynamodb(recipe, overwrite=overwrite)
 
     def _save_recipe_to_file(self, recipe: Recipe):
         """
@@ -200,6 +724,25 @@ class RecipeParser:
         except Exception as e:
             print(f"Error saving recipe to file: {str(e)}")
 
+    def _save_recipe_to_jsonl(self, recipe: Recipe, overwrite: bool = False):
+        """
+        Append a recipe to the JSON Lines store, skipping duplicates.
+
+        Args:
+            recipe: Recipe object to save
+            overwrite: Replace an existing recipe instead of skipping it
+        """
+        try:
+            recipe_dict = recipe.model_dump()
+            recipe_dict["id"] = self._generate_recipe_id(recipe.url, recipe.user_email)
+            if not overwrite and recipe_dict["id"] in self.store:
+                print(f"Recipe with URL {recipe.url} already exists, skipping...")
+                return
+            self.store.append(recipe_dict)
+            self._update_indexes([recipe_dict])
+        except Exception as e:
+            print(f"Error saving recipe to JSON Lines file: {str(e)}")
+
     def _generate_recipe_id(self, url: str, user_email: str) -> str:
         """
         Generate a consistent hash ID from a URL and user email.
@@ -213,30 +756,84 @@ class RecipeParser:
         """
         return hashlib.sha256(f"{url}:{user_email}".encode()).hexdigest()
 
-    def _save_recipe_to_dynamodb(self, recipe: Recipe):
+    def _save_recipe_to_dynamodb(self, recipe: Recipe, overwrite: bool = False):
         """
-        Save a recipe to DynamoDB, checking for duplicates using the URL hash.
+        Save a recipe to DynamoDB with one conditional put, skipping duplicates.
 
         Args:
             recipe: Recipe object to save
+            overwrite: Replace an existing recipe instead of skipping it
         """
         try:
             recipe_dict = recipe.model_dump()
             # Generate hash ID from URL
-            recipe_id = self._generate_recipe_id(recipe.url, recipe.user_email)
-            recipe_dict["id"] = recipe_id
-
-            # Check if recipe already exists
-            existing_recipe = self.table.get_item(Key={"id": recipe_id}).get("Item")
+            recipe_dict["id"] = self._generate_recipe_id(recipe.url, recipe.user_email)
 
-            if existing_recipe:
+            if self.writer.put(recipe_dict, overwrite=overwrite):
+                print(f"Successfully saved recipe {recipe.name} to DynamoDB")
+                self._update_indexes([recipe_dict])
+            else:
                 print(f"Recipe with URL {recipe.url} already exists, skipping...")
-                return
-
-            self.table.put_item(Item=recipe_dict)
-            print(f"Successfully saved recipe {recipe.name} to DynamoDB")
 
         except ClientError as e:
             print(f"Error saving recipe to DynamoDB: {str(e)}")
         except Exception as e:
             print(f"Unexpected error saving recipe to DynamoDB: {str(e)}")
+
+    def _save_recipes_to_dynamodb(
+        self,
+        recipes: List[Recipe],
+        overwrite: bool = False,
+        existing: Optional[Set[str]] = None,
+    ) -> Tuple[List[bool], List[Optional[str]]]:
+        """
+        Save recipes to DynamoDB in batches, skipping duplicates.
+
+        Recipes that were written are indexed even if a later batch failed.
+
+        Args:
+            recipes: Recipe objects to save
+            overwrite: Replace existing recipes instead of skipping them
+            existing: IDs already found stored (looked up again if None)
+
+        Returns:
+            One flag per recipe, True if it was written, and one error per
+            recipe, set if it was due to be written but wasn't
+        """
+        items = []
+        for recipe in recipes:
+            recipe_dict = recipe.model_dump()
+            recipe_dict["id"] = self._generate_recipe_id(recipe.url, recipe.user_email)
+            items.append(recipe_dict)
+        errors: List[Optional[str]] = [None] * len(items)
+        try:
+            written = self.writer.put_many(
+                items, overwrite=overwrite, existing=existing
+            )
+        except BatchWriteError as e:
+            print(f"Error saving recipes to DynamoDB: {str(e)}")
+            written = e.written
+            errors = [str(e) if failed else None for failed in e.failed]
+        self._update_indexes(
+            [item for item, was_written in zip(items, written) if was_written]
+        )
+        stats = self.writer.stats()
+        print(
+            f"Saved {sum(written)} of {len(items)} recipes to DynamoDB "
+            f"({stats['items_per_second']:.1f} items/s, "
+            f"{stats['throttled']} throttled calls so far)"
+        )
+        return written, errors
+
+    def _update_indexes(self, recipe_dicts: List[dict]):
+        """
+        Add stored recipes to every index, without failing the save.
+
+        Args:
+            recipe_dicts: Stored recipe items, each with an "id"
+        """
+        for index in self.indexes:
+            try:
+                index.add(recipe_dicts)
+            except Exception as e:
+                print(f"Error updating {type(index).__name__}: {str(e)}")
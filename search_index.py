@@ -0,0 +1,251 @@
+import argparse
+import hashlib
+import json
+import re
+from typing import Iterable, List, Optional
+
+import boto3
+
+from dynamodb_store import iter_recipes
+from index_store import normalize_email
+from sqlite_db import SQLiteDatabase
+
+# BM25 weights of the indexed columns: a match in the name counts most
+NAME_WEIGHT = 10.0
+INGREDIENTS_WEIGHT = 4.0
+INSTRUCTIONS_WEIGHT = 1.0
+
+# Query terms beyond this are ignored
+MAX_QUERY_TERMS = 16
+
+_TERM = re.compile(r"[^\W_]+")
+
+
+def _rowid(recipe_id: str) -> int:
+    # FTS5 finds rows quickly only by rowid, so each recipe gets a stable
+    # 60-bit rowid derived from its ID
+    return int(hashlib.sha256(recipe_id.encode()).hexdigest()[:15], 16)
+
+
+def _owner_token(user_email: str) -> str:
+    # Owners are indexed as one opaque token, so a user filter is a posting
+    # list intersection rather than a post-filter over every match
+    return "u" + hashlib.sha256(normalize_email(user_email).encode()).hexdigest()[:32]
+
+
+def build_query(text: str, prefix: bool = True) -> Optional[str]:
+    """
+    Turn user input into an FTS5 query matching every term.
+
+    Terms are quoted, so FTS5 operators in the input are searched as text.
+    With prefix, the last term also matches longer words, unless the input
+    ends in whitespace (the user finished typing it).
+
+    Args:
+        text: Search box input
+        prefix: Treat the last term as a prefix, for type-ahead
+
+    Returns:
+        str: FTS5 query over the searchable columns, or None if there are no terms
+    """
+    terms = _TERM.findall(text.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    phrases = [f'"{term}"' for term in terms]
+    if prefix and not text[-1:].isspace():
+        phrases[-1] += "*"
+    return "{name ingredients instructions}: (" + " ".join(phrases) + ")"
+
+
+class SearchIndex:
+    """Full-text recipe index with BM25 ranking, kept in a local SQLite FTS5 table.
+
+    The index is updated as recipes are saved and deleted, and lives on disk,
+    so a restart doesn't need a scan of the recipes table. Every gunicorn
+    worker opens the same file, so an update made by one worker is visible to
+    the others. Recipe names, ingredient names and instructions are indexed;
+    search results carry the summary fields, so no storage read is needed to
+    show them.
+    """
+
+    def __init__(self, path: Optional[str] = "search_index.sqlite3"):
+        """
+        Initialize the index, creating the database if needed.
+
+        Args:
+            path: Path to the SQLite database file (None keeps the index in memory)
+        """
+        self._db = SQLiteDatabase(path, "search")
+
+        with self._db.connect() as conn:
+            # prefix builds extra indexes so short type-ahead prefixes stay fast
+            conn.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS recipe_search USING fts5(
+                    owner,
+                    name,
+                    ingredients,
+                    instructions,
+                    recipe_id UNINDEXED,
+                    image_url UNINDEXED,
+                    calories UNINDEXED,
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3'
+                )""")
+
+    def add(self, recipes: Iterable[dict]):
+        """
+        Index recipes, replacing earlier versions of the same IDs.
+
+        Args:
+            recipes: Stored recipe items, each with an "id"
+        """
+        rows = [
+            (
+                _rowid(recipe["id"]),
+                _owner_token(recipe.get("user_email") or ""),
+                recipe.get("name") or "",
+                " ".join(
+                    str(ingredient.get("name", ""))
+                    for ingredient in recipe.get("ingredients") or []
+                ),
+                "\n".join(str(step) for step in recipe.get("instructions") or []),
+                recipe["id"],
+                recipe.get("image_url"),
+                None if recipe.get("calories") is None else str(recipe["calories"]),
+            )
+            for recipe in recipes
+        ]
+        if not rows:
+            return
+        with self._db.connect() as conn:
+            conn.executemany(
+                "DELETE FROM recipe_search WHERE rowid = ?", [(row[0],) for row in rows]
+            )
+            conn.executemany(
+                "INSERT INTO recipe_search (rowid, owner, name, ingredients, "
+                "instructions, recipe_id, image_url, calories) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def remove(self, recipe_id: str):
+        """
+        Drop a recipe from the index.
+
+        Args:
+            recipe_id: ID of the deleted recipe
+        """
+        with self._db.connect() as conn:
+            conn.execute(
+                "DELETE FROM recipe_search WHERE rowid = ?", (_rowid(recipe_id),)
+            )
+
+    def search(
+        self,
+        text: str,
+        user_email: Optional[str] = None,
+        limit: int = 20,
+        prefix: bool = True,
+    ) -> List[dict]:
+        """
+        Find the recipes best matching every term of a query.
+
+        Args:
+            text: Search box input
+            user_email: Only search this user's recipes (optional)
+            limit: Maximum number of results
+            prefix: Treat the last term as a prefix, for type-ahead
+
+        Returns:
+            Summaries (id, name, image_url, calories) with their score, best first
+        """
+        query = build_query(text, prefix)
+        if query is None:
+            return []
+        if user_email:
+            query = f'owner: "{_owner_token(user_email)}" AND {query}'
+
+        # bm25() is lower for better matches
+        rank = (
+            f"bm25(recipe_search, 0, {NAME_WEIGHT}, {INGREDIENTS_WEIGHT}, "
+            f"{INSTRUCTIONS_WEIGHT})"
+        )
+        with self._db.connect() as conn:
+            rows = conn.execute(
+                f"SELECT recipe_id, name, image_url, calories, {rank} AS rank "
+                "FROM recipe_search WHERE recipe_search MATCH ? "
+                "ORDER BY rank LIMIT ?",
+                (query, limit),
+            ).fetchall()
+        return [
+            {
+                "id": recipe_id,
+                "name": name,
+                "image_url": image_url,
+                "calories": calories,
+                "score": -rank,
+            }
+            for recipe_id, name, image_url, calories, rank in rows
+        ]
+
+    def __len__(self):
+        with self._db.connect() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM recipe_search").fetchone()
+        return count
+
+    def rebuild(self, recipes: Iterable[dict], batch_size: int = 500) -> int:
+        """
+        Replace the whole index with the given recipes.
+
+        Args:
+            recipes: Every stored recipe
+            batch_size: Recipes indexed per transaction
+
+        Returns:
+            int: Number of recipes indexed
+        """
+        with self._db.connect() as conn:
+            conn.execute("DELETE FROM recipe_search")
+        count, batch = 0, []
+        for recipe in recipes:
+            batch.append(recipe)
+            if len(batch) >= batch_size:
+                self.add(batch)
+                count, batch = count + len(batch), []
+        self.add(batch)
+        count += len(batch)
+        with self._db.connect() as conn:
+            conn.execute(
+                "INSERT INTO recipe_search (recipe_search) VALUES ('optimize')"
+            )
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the recipe search index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild = subparsers.add_parser(
+        "rebuild", help="Index every recipe in the DynamoDB table"
+    )
+    rebuild.add_argument("--index-path", default="search_index.sqlite3")
+    rebuild.add_argument("--table-name", default="recipes")
+    rebuild.add_argument("--region", default="us-east-1")
+    search = subparsers.add_parser("search", help="Run a query against the index")
+    search.add_argument("query")
+    search.add_argument("--index-path", default="search_index.sqlite3")
+    search.add_argument("--user-email")
+    search.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    index = SearchIndex(args.index_path)
+    if args.command == "rebuild":
+        table = boto3.resource("dynamodb", region_name=args.region).Table(
+            args.table_name
+        )
+        print(json.dumps({"indexed": index.rebuild(iter_recipes(table))}))
+    else:
+        for result in index.search(args.query, args.user_email, args.limit):
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import fcntl
+import hashlib
+import logging
+import os
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import IO, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Query parameters that only track where a link was shared
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "igshid", "ref"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Reduce a URL to a canonical form so links to the same page share one key.
+
+    The scheme and host are lowercased, default ports, fragments and
+    tracking parameters (utm_*, fbclid, ...) are dropped, and the remaining
+    query parameters are sorted.
+
+    Args:
+        url: URL as submitted
+
+    Returns:
+        str: Normalized URL
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (name, value)
+        for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urllib.parse.urlunsplit(
+        (scheme, host, path, urllib.parse.urlencode(query), "")
+    )
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[T]):
+    """Runs at most one call per key at a time and hands its result to every caller.
+
+    Within a process, callers of a key that is already in flight wait for
+    that call instead of starting their own. With a lock_dir, processes
+    (e.g. gunicorn workers) coordinate through a lease: an flock on a per-key
+    file, released by the kernel if its holder dies. The lease holder writes
+    its result next to the lock and unlinks the lock file before releasing
+    it, and processes that waited on the lease read the result instead of
+    repeating the call.
+    """
+
+    def __init__(
+        self,
+        lock_dir: Optional[str] = None,
+        encode: Optional[Callable[[T], str]] = None,
+        decode: Optional[Callable[[str], T]] = None,
+        lease_timeout: float = 60,
+        result_ttl: float = 30,
+    ):
+        """
+        Initialize the group.
+
+        Args:
+            lock_dir: Directory for lease and result files shared between
+                processes (None coordinates within this process only)
+            encode: Serializes a result for other processes (required with lock_dir)
+            decode: Reverses encode (required with lock_dir)
+            lease_timeout: Maximum seconds to wait for another process's lease
+                before making the call anyway
+            result_ttl: Seconds a shared result stays usable by other processes
+        """
+        if lock_dir and (encode is None or decode is None):
+            raise ValueError("encode and decode are required with lock_dir")
+        self.lock_dir = lock_dir
+        self.encode = encode
+        self.decode = decode
+        self.lease_timeout = lease_timeout
+        self.result_ttl = result_ttl
+        if lock_dir:
+            Path(lock_dir).mkdir(parents=True, exist_ok=True)
+
+        self.calls = 0
+        self.shared = 0
+        self._in_flight: Dict[str, _Call] = {}
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], T]) -> T:
+        """
+        Run func for key, or wait for the call already running for key.
+
+        Args:
+            key: Key identifying the work (e.g. a normalized URL)
+            func: Zero-argument callable doing the work
+
+        Returns:
+            The result of func, possibly from another caller's call
+
+        Raises:
+            Whatever func raised, for every caller waiting on that call
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if self.lock_dir:
+                call.result = self._do_leased(key, func)
+            else:
+                with self._lock:
+                    self.calls += 1
+                call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        """Return how many calls ran and how many callers shared another's result."""
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared}
+
+    def _do_leased(self, key: str, func: Callable[[], T]) -> T:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        lock_path = os.path.join(self.lock_dir, f"{digest}.lock")
+        result_path = os.path.join(self.lock_dir, f"{digest}.result")
+
+        lease, state = self._acquire(lock_path)
+        try:
+            if state == "waited":
+                result = self._read_result(result_path)
+                if result is not None:
+                    with self._lock:
+                        self.shared += 1
+                    return result
+            with self._lock:
+                self.calls += 1
+            result = func()
+            self._write_result(result_path, result)
+            return result
+        finally:
+            if state != "timeout":
+                # Unlinked while still locked, so lock files don't pile up;
+                # processes queued on this file see it's gone and re-open it
+                try:
+                    os.unlink(lock_path)
+                except OSError:
+                    pass
+                fcntl.flock(lease, fcntl.LOCK_UN)
+            lease.close()
+
+    def _acquire(self, lock_path: str) -> Tuple[IO, str]:
+        """
+        Take the lease on lock_path.
+
+        Returns:
+            The open lease file, and "held" if the lease was free, "waited" if
+            another process held it first, or "timeout" if it couldn't be
+            taken within lease_timeout
+        """
+        waited = False
+        deadline = time.monotonic() + self.lease_timeout
+        while True:
+            lease = open(lock_path, "a")
+            while True:
+                try:
+                    fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    waited = True
+                if time.monotonic() >= deadline:
+                    logger.warning(
+                        f"Timed out waiting for lease {lock_path}, running anyway"
+                    )
+                    return lease, "timeout"
+                time.sleep(0.05)
+            if self._is_current(lease, lock_path):
+                return lease, "waited" if waited else "held"
+            # The previous holder finished and unlinked the file we locked
+            waited = True
+            fcntl.flock(lease, fcntl.LOCK_UN)
+            lease.close()
+
+    @staticmethod
+    def _is_current(lease: IO, lock_path: str) -> bool:
+        """Check that lease is still the file at lock_path, not an unlinked one."""
+        try:
+            path_stat = os.stat(lock_path)
+        except FileNotFoundError:
+            return False
+        lease_stat = os.fstat(lease.fileno())
+        return (lease_stat.st_dev, lease_stat.st_ino) == (
+            path_stat.st_dev,
+            path_stat.st_ino,
+        )
+
+    def _read_result(self, path: str) -> Optional[T]:
+        try:
+            if time.time() - os.path.getmtime(path) > self.result_ttl:
+                return None
+            with open(path) as f:
+                return self.decode(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_result(self, path: str, result: T):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(self.encode(result))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Error sharing result at {path}: {str(e)}")
+        self._prune_results()
+
+    def _prune_results(self):
+        """Delete expired result files, at most once per result_ttl."""
+        now = time.time()
+        with self._lock:
+            if now - self._last_prune < self.result_ttl:
+                return
+            self._last_prune = now
+        for entry in os.scandir(self.lock_dir):
+            if not entry.name.endswith(".result"):
+                continue
+            try:
+                if now - entry.stat().st_mtime > self.result_ttl:
+                    os.unlink(entry.path)
+            except OSError:
+                continue
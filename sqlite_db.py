@@ -0,0 +1,50 @@
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+class SQLiteDatabase:
+    """A SQLite database file, or a private in-memory database, opened per call.
+
+    Each connect() opens a short-lived connection, which keeps the database
+    safe to use across threads and forked gunicorn workers.
+    """
+
+    def __init__(self, path: Optional[str], name: str):
+        """
+        Initialize the database, creating the file's directory if needed.
+
+        Args:
+            path: Path to the SQLite database file (None keeps it in memory)
+            name: Prefix for the in-memory database's name
+        """
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._database = path
+            self._keepalive = None
+            self._memory_lock = None
+        else:
+            # A named shared-cache database lives as long as one connection is open
+            self._database = f"file:{name}-{uuid.uuid4().hex}?mode=memory&cache=shared"
+            self._keepalive = sqlite3.connect(
+                self._database, uri=True, check_same_thread=False
+            )
+            # Shared-cache tables are locked as a whole and don't honor the busy
+            # timeout, so connections to them take turns within the process
+            self._memory_lock = threading.Lock()
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success and is closed afterwards."""
+        with self._memory_lock or nullcontext():
+            conn = sqlite3.connect(
+                self._database, timeout=5, uri=self._keepalive is not None
+            )
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
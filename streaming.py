@@ -0,0 +1,81 @@
+import json
+import zlib
+from typing import Iterable, Iterator
+
+from models import DecimalEncoder
+
+# Bytes of output collected before a chunk is sent
+CHUNK_SIZE = 32 * 1024
+
+
+def ndjson_lines(items: Iterable) -> Iterator[str]:
+    """
+    Encode items as newline-delimited JSON, one line per item.
+
+    Args:
+        items: JSON-serializable items (Decimals are written as strings)
+
+    Yields:
+        Lines ending in a newline
+    """
+    for item in items:
+        yield json.dumps(item, cls=DecimalEncoder) + "\n"
+
+
+def json_array_chunks(items: Iterable) -> Iterator[str]:
+    """
+    Encode items as one JSON array, piece by piece.
+
+    Args:
+        items: JSON-serializable items (Decimals are written as strings)
+
+    Yields:
+        Pieces that concatenate to a JSON array
+    """
+    yield "["
+    for i, item in enumerate(items):
+        yield ("," if i else "") + json.dumps(item, cls=DecimalEncoder)
+    yield "]\n"
+
+
+def buffered(pieces: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Join small pieces into chunks of about chunk_size bytes.
+
+    Args:
+        pieces: Text pieces
+        chunk_size: Bytes to collect before yielding
+
+    Yields:
+        UTF-8 encoded chunks
+    """
+    buffer, size = [], 0
+    for piece in pieces:
+        data = piece.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def gzip_chunks(pieces: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Gzip a stream of text pieces incrementally.
+
+    The compressor is flushed every chunk_size bytes of input, so the client
+    can decode each chunk as it arrives instead of waiting for the end.
+
+    Args:
+        pieces: Text pieces
+        chunk_size: Bytes of input between flushes
+
+    Yields:
+        Gzip-encoded chunks
+    """
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for data in buffered(pieces, chunk_size):
+        yield compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
@@ -0,0 +1,256 @@
+import json
+import logging
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Any, List, Optional
+
+from bs4 import BeautifulSoup
+
+from html_extractor import BS4_PARSER, slice_element
+from ingredient_parser import parse_ingredient_line
+from models import Macro, StructuredRecipe
+
+logger = logging.getLogger(__name__)
+
+_JSON_LD_SCRIPT = re.compile(
+    r"""<script[^>]*type\s*=\s*["']?application/ld\+json["']?[^>]*>(.*?)</script>""",
+    re.IGNORECASE | re.DOTALL,
+)
+_MICRODATA_RECIPE = re.compile(
+    r"""itemtype\s*=\s*["']?https?://schema\.org/Recipe["'\s>]""", re.IGNORECASE
+)
+_NUMBER = re.compile(r"\d+(?:,\d{3}(?!\d))*(?:[.,]\d+)?")
+# A comma followed by exactly three digits separates thousands ("1,200");
+# any other comma is a decimal point ("4,5 g")
+_THOUSANDS = re.compile(r",(?=\d{3}(?!\d))")
+
+# schema.org NutritionInformation properties for each BaseRecipe macro
+MACRO_PROPERTIES = {
+    "fat": "fatContent",
+    "carbs": "carbohydrateContent",
+    "protein": "proteinContent",
+}
+
+
+def extract_structured_recipe(html: str) -> Optional[StructuredRecipe]:
+    """
+    Map a page's schema.org Recipe (JSON-LD, then microdata) onto BaseRecipe fields.
+
+    Args:
+        html: HTML document
+
+    Returns:
+        StructuredRecipe with whatever fields were found, or None if the
+        page has no Recipe structured data
+    """
+    try:
+        node = find_json_ld_recipe(html)
+        if node is not None:
+            return _to_structured_recipe("json-ld", node)
+        node = find_microdata_recipe(html)
+        if node is not None:
+            return _to_structured_recipe("microdata", node)
+    except Exception as e:
+        logger.error(f"Error extracting structured recipe data: {str(e)}")
+    return None
+
+
+def find_json_ld_recipe(html: str) -> Optional[dict]:
+    """
+    Find the first schema.org Recipe node in the page's JSON-LD blocks.
+
+    Args:
+        html: HTML document
+
+    Returns:
+        The Recipe node, or None if there isn't one
+    """
+    for match in _JSON_LD_SCRIPT.finditer(html):
+        try:
+            data = json.loads(match.group(1).strip())
+        except ValueError:
+            continue
+        node = _find_recipe_node(data)
+        if node is not None:
+            return node
+    return None
+
+
+def _find_recipe_node(data: Any) -> Optional[dict]:
+    if isinstance(data, list):
+        for item in data:
+            node = _find_recipe_node(item)
+            if node is not None:
+                return node
+    elif isinstance(data, dict):
+        types = data.get("@type", [])
+        if "Recipe" in (types if isinstance(types, list) else [types]):
+            return data
+        if "@graph" in data:
+            return _find_recipe_node(data["@graph"])
+    return None
+
+
+def find_microdata_recipe(html: str) -> Optional[dict]:
+    """
+    Read a schema.org Recipe marked up with microdata into a JSON-LD-shaped dict.
+
+    Only the element carrying itemtype="https://schema.org/Recipe" is parsed.
+
+    Args:
+        html: HTML document
+
+    Returns:
+        Dict of the recipe's itemprop values, or None if there isn't one
+    """
+    match = _MICRODATA_RECIPE.search(html)
+    if match is None:
+        return None
+    start = html.rfind("<", 0, match.start())
+    tag = re.match(r"<(\w+)", html[start:])
+    if tag is None:
+        return None
+    markup = slice_element(html, tag.group(1), start)
+    root = BeautifulSoup(markup, BS4_PARSER).find(tag.group(1))
+    if root is None:
+        return None
+
+    node = {}
+    for element in root.find_all(attrs={"itemprop": True}):
+        # Properties of nested items (like the nutrition block) are read below
+        if element.find_parent(attrs={"itemscope": True}) is not root:
+            continue
+        for prop in element["itemprop"].split():
+            if prop == "nutrition":
+                value = {
+                    child["itemprop"]: _microdata_value(child)
+                    for child in element.find_all(attrs={"itemprop": True})
+                }
+            elif prop == "recipeInstructions" and element.find("li"):
+                value = [li.get_text(" ", strip=True) for li in element.find_all("li")]
+            else:
+                value = _microdata_value(element)
+            if prop in ("recipeIngredient", "ingredients", "recipeInstructions"):
+                values = node.setdefault(prop, [])
+                values.extend(value if isinstance(value, list) else [value])
+            else:
+                node.setdefault(prop, value)
+    return node
+
+
+def _microdata_value(element) -> str:
+    for attribute in ("content", "datetime", "src", "href"):
+        if element.get(attribute):
+            return element[attribute]
+    return element.get_text(" ", strip=True)
+
+
+def _to_structured_recipe(source: str, node: dict) -> StructuredRecipe:
+    fields = {}
+
+    name = _text(node.get("name"))
+    if name:
+        fields["name"] = name
+
+    servings = _servings(node.get("recipeYield"))
+    if servings:
+        fields["servings"] = servings
+
+    ingredients = [
+        parse_ingredient_line(line)
+        for line in _as_list(node.get("recipeIngredient") or node.get("ingredients"))
+        if isinstance(line, str)
+    ]
+    ingredients = [ingredient for ingredient in ingredients if ingredient]
+    if ingredients:
+        fields["ingredients"] = ingredients
+
+    instructions = _instructions(node.get("recipeInstructions"))
+    if instructions:
+        fields["instructions"] = instructions
+
+    nutrition = node.get("nutrition")
+    if isinstance(nutrition, dict):
+        calories = _number(nutrition.get("calories"))
+        if calories is not None:
+            fields["calories"] = calories
+        # Macros the block leaves out stay missing: None on the fast path, or
+        # the LLM's reading if it is called for other fields
+        for field, prop in MACRO_PROPERTIES.items():
+            macro = _macro(nutrition.get(prop))
+            if macro is not None:
+                fields[field] = macro
+
+    return StructuredRecipe(
+        source=source, fields=fields, image_url=_image_url(node.get("image"))
+    )
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _text(value) -> Optional[str]:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, str):
+        return " ".join(value.split()) or None
+    return None
+
+
+def _number(value) -> Optional[Decimal]:
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    if not isinstance(value, str):
+        return None
+    match = _NUMBER.search(value)
+    if match is None:
+        return None
+    try:
+        return Decimal(_THOUSANDS.sub("", match.group()).replace(",", "."))
+    except InvalidOperation:
+        return None
+
+
+def _servings(value) -> Optional[int]:
+    for item in _as_list(value):
+        number = _number(item)
+        if number:
+            return int(number)
+    return None
+
+
+def _macro(value) -> Optional[Macro]:
+    amount = _number(value)
+    if amount is None:
+        return None
+    unit = "g"
+    if isinstance(value, str):
+        unit = _NUMBER.sub("", value, count=1).strip() or unit
+    return Macro(amount=amount, unit=unit)
+
+
+def _instructions(value) -> List[str]:
+    steps = []
+    for item in _as_list(value):
+        if isinstance(item, str):
+            steps.extend(line.strip() for line in item.splitlines() if line.strip())
+        elif isinstance(item, dict):
+            if "itemListElement" in item:
+                steps.extend(_instructions(item["itemListElement"]))
+            elif _text(item.get("text")):
+                steps.append(_text(item["text"]))
+            elif _text(item.get("name")):
+                steps.append(_text(item["name"]))
+    return steps
+
+
+def _image_url(value) -> Optional[str]:
+    for item in _as_list(value):
+        if isinstance(item, str):
+            return item
+        if isinstance(item, dict) and isinstance(item.get("url"), str):
+            return item["url"]
+    return None
@@ -4,9 +4,11 @@ import time
 
 import boto3
 import pytest
+import requests
 from moto import mock_aws
 from openai import OpenAI
 
+from dynamodb_store import create_recipes_table
 from recipe_parser import RecipeParser
 from web_scraper import create_app
 
@@ -33,13 +35,8 @@ def mock_dynamodb_table():
     """Create a mock DynamoDB table for testing."""
     dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
 
-    # Create the mock table
-    table = dynamodb.create_table(
-        TableName="recipes",
-        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
-        AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
-        ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
-    )
+    # Create the mock table, with the same indexes as production
+    table = create_recipes_table(dynamodb, "recipes")
 
     return table
 
@@ -57,6 +54,24 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture
+def make_http_response():
+    """Factory for requests.Response objects with a fixed body."""
+
+    def _make(body, status_code=200, headers=None):
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers.update({"Content-Type": "text/html; charset=utf-8"})
+        response.headers.update(headers or {})
+        response._content = body.encode()
+        response._content_consumed = True
+        response.encoding = "utf-8"
+        response.url = "https://example.com/recipe"
+        return response
+
+    return _make
+
+
 @pytest.fixture
 def mock_openai_client(mocker):
     """Mock OpenAI client for testing."""
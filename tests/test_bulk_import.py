@@ -0,0 +1,219 @@
+import json
+import time
+
+import pytest
+
+from bulk_import import (
+    BulkImporter,
+    Checkpoint,
+    HostPacer,
+    format_sse,
+    main,
+    read_urls,
+)
+from config import Config
+from fetcher import FetchError
+from ingredient_index import IngredientIndex
+from metrics import Metrics
+from nutrition_index import NutritionIndex
+from recipe_parser import RecipeParser
+from search_index import SearchIndex
+
+PAGE = '<html><head><meta name="description" content="{}"></head></html>'
+
+
+@pytest.fixture
+def fake_fetcher(mocker):
+    """Fetcher serving a recipe page for every URL except ones containing 'broken'."""
+
+    def fetch(url, use_cache=True):
+        if "broken" in url:
+            raise FetchError(f"Error fetching {url}")
+        return PAGE.format(f"Recipe at {url}")
+
+    fetcher = mocker.Mock()
+    fetcher.fetch.side_effect = fetch
+    return fetcher
+
+
+@pytest.fixture
+def jsonl_parser(mock_openai_client, tmp_path):
+    """RecipeParser storing recipes in a JSON Lines file."""
+    return RecipeParser(
+        storage_type="jsonl",
+        output_file=str(tmp_path / "recipes.jsonl"),
+        client=mock_openai_client,
+    )
+
+
+def test_read_urls_from_list_and_bookmarks():
+    """
+    GIVEN: A plain URL list and a browser bookmarks export
+    WHEN: Reading URLs from them
+    THEN: Only unique http(s) URLs should be returned, in order
+    """
+    text = """
+    # weeknight dinners
+    https://example.com/soup
+    https://example.com/stew
+
+    https://example.com/soup
+    ftp://example.com/file
+    """
+    bookmarks = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+    <DL><p>
+        <DT><A HREF="https://example.com/soup" ADD_DATE="1">Soup</A>
+        <DT><A HREF="javascript:void(0)">Bookmarklet</A>
+        <DT><A HREF='https://example.com/pie'>Pie</A>
+    </DL><p>"""
+
+    assert read_urls(text) == ["https://example.com/soup", "https://example.com/stew"]
+    assert read_urls(bookmarks) == [
+        "https://example.com/soup",
+        "https://example.com/pie",
+    ]
+
+
+def test_host_pacer_spaces_requests_per_host():
+    """
+    GIVEN: A pacer with a 0.1 second interval
+    WHEN: Requesting two URLs on one host and one on another
+    THEN: Only the second request to the same host should wait
+    """
+    pacer = HostPacer(min_interval=0.1)
+
+    start = time.monotonic()
+    pacer.wait("https://a.example.com/1")
+    pacer.wait("https://b.example.com/1")
+    assert time.monotonic() - start < 0.05
+    pacer.wait("https://a.example.com/2")
+    assert time.monotonic() - start >= 0.09
+
+
+def test_run_reports_every_url(fake_fetcher, jsonl_parser):
+    """
+    GIVEN: Three URLs, one of which can't be fetched
+    WHEN: Running a bulk import
+    THEN: Each URL should get a result event and the summary should count them
+    """
+    importer = BulkImporter(fake_fetcher, jsonl_parser, host_delay=0, batch_size=2)
+    urls = [
+        "https://example.com/soup",
+        "https://example.com/broken",
+        "https://example.com/stew",
+    ]
+
+    events = list(importer.run(urls, "test@example.com"))
+
+    assert events[0] == {"event": "start", "total": 3, "resumed": 0}
+    results = {event["url"]: event for event in events if event["event"] == "result"}
+    assert results["https://example.com/soup"]["status"] == "parsed"
+    assert results["https://example.com/soup"]["name"] == "Test Recipe"
+    assert results["https://example.com/broken"]["status"] == "failed"
+    assert results["https://example.com/stew"]["index"] == 2
+    assert events[-1] == {"event": "done", "parsed": 2, "skipped": 0, "failed": 1}
+    assert len(jsonl_parser.store) == 2
+
+    # Recipes already stored are skipped without being fetched again
+    fake_fetcher.fetch.reset_mock()
+    events = list(importer.run(urls[:1], "test@example.com"))
+    assert events[1]["status"] == "skipped"
+    fake_fetcher.fetch.assert_not_called()
+
+
+def test_run_resumes_from_checkpoint(fake_fetcher, jsonl_parser, tmp_path):
+    """
+    GIVEN: An earlier import whose checkpoint holds one parsed and one failed URL
+    WHEN: Running it again with the same checkpoint
+    THEN: Only the unfinished URLs should be fetched
+    """
+    checkpoint = Checkpoint(str(tmp_path / "import.jsonl"))
+    importer = BulkImporter(fake_fetcher, jsonl_parser, host_delay=0, batch_size=1)
+    urls = ["https://example.com/soup", "https://example.com/broken"]
+    list(importer.run(urls, "test@example.com", force=True, checkpoint=checkpoint))
+    # A crash can leave a partly written last line
+    with open(checkpoint.path, "a") as f:
+        f.write('{"event": "result", "url": "https://exa')
+    checkpoint = Checkpoint(checkpoint.path)
+
+    fake_fetcher.fetch.reset_mock()
+    events = list(
+        importer.run(
+            urls + ["https://example.com/pie"],
+            "test@example.com",
+            force=True,
+            checkpoint=checkpoint,
+        )
+    )
+
+    assert events[0]["resumed"] == 1
+    fetched = {call.args[0] for call in fake_fetcher.fetch.call_args_list}
+    assert fetched == {"https://example.com/broken", "https://example.com/pie"}
+    # Failed URLs are retried on the next run
+    assert set(checkpoint.finished()) == {
+        "https://example.com/soup",
+        "https://example.com/pie",
+    }
+    with open(checkpoint.path) as f:
+        assert len(f.readlines()) == 5
+
+
+def test_format_sse():
+    """
+    GIVEN: A progress event
+    WHEN: Formatting it as a server-sent event
+    THEN: The event name and JSON data should be on their own lines
+    """
+    message = format_sse({"event": "start", "total": 1, "resumed": 0})
+
+    assert message.startswith("event: start\ndata: {")
+    assert message.endswith("\n\n")
+    assert json.loads(message.split("data: ")[1]) == {
+        "event": "start",
+        "total": 1,
+        "resumed": 0,
+    }
+
+
+def test_main_builds_parser_like_the_server(mocker, tmp_path):
+    """
+    GIVEN: The bulk import command line
+    WHEN: Running an import
+    THEN: The parser should update the same indexes and metrics as the server
+    """
+    # Keep every cache, index and checkpoint the real config creates out of the cwd
+    for name in dir(Config):
+        if name.endswith(("_PATH", "_DIR")):
+            mocker.patch.object(Config, name, str(tmp_path / name.lower()))
+    source = tmp_path / "urls.txt"
+    source.write_text("https://example.com/soup\n")
+    mocker.patch(
+        "sys.argv",
+        [
+            "bulk_import.py",
+            str(source),
+            "--user-email",
+            "test@example.com",
+            "--storage",
+            "jsonl",
+            "--output-file",
+            str(tmp_path / "recipes.jsonl"),
+        ],
+    )
+    importer = mocker.patch("bulk_import.BulkImporter")
+    importer.return_value.run.return_value = []
+
+    main()
+
+    parser = importer.call_args.args[1]
+    assert parser.storage_type == "jsonl"
+    assert [type(index) for index in parser.indexes] == [
+        SearchIndex,
+        IngredientIndex,
+        NutritionIndex,
+    ]
+    assert isinstance(parser.metrics, Metrics)
+    assert parser.model == Config.OPENAI_MODEL
+    assert parser.escalation_models == Config.OPENAI_ESCALATION_MODELS
+    assert parser.heuristics == Config.HEURISTIC_PARSING
+    assert parser.max_input_tokens == Config.LLM_INPUT_MAX_TOKENS
@@ -0,0 +1,40 @@
+from clients import ProcessLocal
+
+
+def test_process_local_creates_once(mocker):
+    """
+    GIVEN: A ProcessLocal holder
+    WHEN: get is called repeatedly in the same process
+    THEN: The factory should only run once
+    """
+    factory = mocker.Mock(side_effect=lambda: object())
+    holder = ProcessLocal(factory)
+
+    assert holder.get() is holder.get()
+    assert factory.call_count == 1
+
+
+def test_process_local_recreates_after_fork(mocker):
+    """
+    GIVEN: A ProcessLocal holder created in a parent process
+    WHEN: get is called from a forked child (different PID)
+    THEN: A new value should be created for the child
+    """
+    holder = ProcessLocal(object)
+    parent_value = holder.get()
+    mocker.patch("clients.os.getpid", return_value=-1)
+
+    assert holder.get() is not parent_value
+
+
+def test_process_local_reset():
+    """
+    GIVEN: A ProcessLocal holder with a created value
+    WHEN: reset is called
+    THEN: The next get should create a new value
+    """
+    holder = ProcessLocal(object)
+    value = holder.get()
+    holder.reset()
+
+    assert holder.get() is not value
@@ -0,0 +1,154 @@
+from content_compactor import compact_content, count_tokens, score_line
+
+ARTICLE = """
+<article>
+  <!-- recipe card v2 -->
+  <nav><a href="/">Home</a> &gt; <a href="/cookies">Cookies</a></nav>
+  <div class="social-share">Share on Pinterest</div>
+  <h1>Oatmeal   Cookies</h1>
+  <div class="ad-slot">Buy our cookbook!</div>
+  <h2>Ingredients</h2>
+  <ul>
+    <li>1 <b>cup</b> rolled oats</li>
+    <li>2 eggs</li>
+  </ul>
+  <h2>Instructions</h2>
+  <ol><li>Preheat the oven to 350°F.</li><li>Bake for 12 minutes.</li></ol>
+  <div class="ad-slot">Buy our cookbook!</div>
+  <p>Jump to recipe</p>
+  <p>Jump to recipe</p>
+  <script>track("view")</script>
+  <section id="comments">Great recipe, 5 stars!</section>
+</article>
+"""
+
+
+def test_markup_and_boilerplate_are_stripped():
+    """
+    GIVEN: An article with navigation, ads, sharing links, comments and scripts
+    WHEN: Compacting it
+    THEN: Only the recipe text should remain, one block per line, each once
+    """
+    assert compact_content(ARTICLE).splitlines() == [
+        "# Oatmeal Cookies",
+        "Ingredients",
+        "- 1 cup rolled oats",
+        "- 2 eggs",
+        "Instructions",
+        "- Preheat the oven to 350°F.",
+        "- Bake for 12 minutes.",
+        "Jump to recipe",
+    ]
+
+
+def test_recipe_content_is_kept_with_the_boilerplate():
+    """
+    GIVEN: A page whose title is in the article's header, whose content sits in
+        a wrapper named like a sidebar, and whose ingredients and steps repeat
+    WHEN: Compacting it
+    THEN: The title, wrapper and repeated ingredients and steps should be kept
+    """
+    page = """
+    <header><a href="/">Home</a></header>
+    <main><article>
+      <header><h1>Layer Cake</h1></header>
+      <div class="content-sidebar-wrap">
+        <h2>For the cake</h2><ul><li>2 eggs</li><li>1 cup sugar</li></ul>
+        <h2>For the frosting</h2><ul><li>1 cup sugar</li></ul>
+        <ol><li>Whisk until smooth.</li><li>Bake.</li><li>Whisk until smooth.</li></ol>
+      </div>
+      <div class="sidebar"><p>Popular posts</p></div>
+    </article></main>
+    """
+    assert compact_content(page).splitlines() == [
+        "# Layer Cake",
+        "For the cake",
+        "- 2 eggs",
+        "- 1 cup sugar",
+        "For the frosting",
+        "- 1 cup sugar",
+        "- Whisk until smooth.",
+        "- Bake.",
+        "- Whisk until smooth.",
+    ]
+
+
+def test_boilerplate_named_wrapper_holding_the_recipe_is_kept():
+    """
+    GIVEN: A recipe inside a wrapper whose class starts with "sponsored-"
+    WHEN: Compacting it
+    THEN: The wrapper should be kept, and only the ad inside it dropped
+    """
+    page = """
+    <div class="sponsored-recipe-card">
+      <h2>Ingredients</h2><ul><li>2 eggs</li></ul>
+      <div class="ad-slot">Buy our cookbook!</div>
+      <h2>Instructions</h2><ol><li>Whisk the eggs.</li></ol>
+    </div>
+    <div class="sponsored-links"><p>Try our meal kits</p></div>
+    """
+    assert compact_content(page).splitlines() == [
+        "Ingredients",
+        "- 2 eggs",
+        "Instructions",
+        "- Whisk the eggs.",
+    ]
+
+
+def test_plain_text_is_only_tidied():
+    """
+    GIVEN: A plain text recipe within the budget
+    WHEN: Compacting it
+    THEN: Whitespace should be collapsed and nothing else changed
+    """
+    text = "Pancakes\n\n  2 cups   flour\n1 egg\n"
+    assert compact_content(text) == "Pancakes\n2 cups flour\n1 egg"
+
+
+def test_budget_keeps_the_recipe_dense_region():
+    """
+    GIVEN: A recipe surrounded by a long story and unrelated text
+    WHEN: Compacting it to a budget smaller than the whole text
+    THEN: The result should fit the budget and keep the ingredients and steps
+    """
+    story = [
+        f"Paragraph {i} about my trip to the coast that summer." for i in range(200)
+    ]
+    recipe = [
+        "Ingredients",
+        "2 cups flour",
+        "1 tsp salt",
+        "Instructions",
+        "Mix the flour and salt.",
+        "Bake for 20 minutes.",
+    ]
+    text = "\n".join(story[:100] + recipe + story[100:])
+
+    compacted = compact_content(text, max_tokens=120)
+
+    assert count_tokens(compacted) <= 120
+    assert "\n".join(recipe) in compacted
+    assert count_tokens(compacted) < count_tokens(text) / 10
+
+
+def test_oversized_line_is_cut_to_the_budget():
+    """
+    GIVEN: A single line longer than the budget
+    WHEN: Compacting it
+    THEN: It should be cut at a word boundary to fit
+    """
+    compacted = compact_content("word " * 500, max_tokens=50)
+    assert 0 < count_tokens(compacted) <= 50
+    assert set(compacted.split()) == {"word"}
+
+
+def test_score_line():
+    """
+    GIVEN: Lines of page text
+    WHEN: Scoring them
+    THEN: Ingredients, headings and steps should score above unrelated text
+    """
+    assert score_line("- 1 1/2 cups flour") > 0
+    assert score_line("Ingredients") > 0
+    assert score_line("Whisk the eggs") > 0
+    assert score_line("Thanks for reading my blog!") == 0
@@ -0,0 +1,254 @@
+from decimal import Decimal
+
+import pytest
+from botocore.exceptions import ClientError
+
+from dynamodb_store import (
+    SUMMARY_FIELDS,
+    BatchWriteError,
+    DynamoDBRecipeWriter,
+    decode_cursor,
+    encode_cursor,
+    iter_recipes,
+    iter_recipes_by_id,
+    query_recipes,
+)
+
+
+@pytest.fixture
+def populated_table(mock_dynamodb_table):
+    """Recipes table holding five recipes for two users."""
+    for i in range(5):
+        mock_dynamodb_table.put_item(
+            Item={
+                "id": f"recipe-{i}",
+                "name": f"Recipe {i}",
+                "user_email": "a@example.com" if i % 2 == 0 else "b@example.com",
+                "created_at": 1000 + i,
+                "calories": Decimal("100"),
+                "image_url": None,
+                "ingredients": [{"name": "flour", "quantity": "1", "unit": "cup"}],
+                "instructions": ["Mix"],
+            }
+        )
+    return mock_dynamodb_table
+
+
+def test_cursor_round_trip():
+    """
+    GIVEN: A LastEvaluatedKey with a Decimal value
+    WHEN: Encoding and decoding it as a cursor
+    THEN: It should come back unchanged
+    """
+    key = {"id": "recipe-1", "user_email": "a@example.com", "created_at": Decimal(5)}
+
+    cursor = encode_cursor(key)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == key
+    assert encode_cursor(None) is None
+
+
+def test_decode_cursor_rejects_garbage():
+    """
+    GIVEN: A token that isn't a cursor
+    WHEN: Decoding it
+    THEN: It should raise ValueError
+    """
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_query_recipes_pages_through_the_table(populated_table):
+    """
+    GIVEN: A table with five recipes
+    WHEN: Reading pages of two with the returned cursors
+    THEN: Every recipe should be returned exactly once
+    """
+    ids, cursor = [], None
+    while True:
+        items, cursor = query_recipes(populated_table, limit=2, cursor=cursor)
+        assert len(items) <= 2
+        ids.extend(item["id"] for item in items)
+        if cursor is None:
+            break
+
+    assert sorted(ids) == [f"recipe-{i}" for i in range(5)]
+
+
+def test_query_recipes_by_user_newest_first(populated_table):
+    """
+    GIVEN: A table with recipes for two users
+    WHEN: Querying one user's recipes through the index
+    THEN: Only that user's recipes should be returned, newest first
+    """
+    items, cursor = query_recipes(populated_table, user_email="a@example.com")
+
+    assert [item["id"] for item in items] == ["recipe-4", "recipe-2", "recipe-0"]
+    assert cursor is None
+
+
+def test_query_recipes_summary_projection(populated_table):
+    """
+    GIVEN: A table with full recipes
+    WHEN: Querying with the summary fields
+    THEN: Only the summary attributes should be returned
+    """
+    items, _ = query_recipes(populated_table, fields=SUMMARY_FIELDS)
+
+    assert items
+    for item in items:
+        assert set(item) <= set(SUMMARY_FIELDS)
+        assert "ingredients" not in item
+
+
+def test_iter_recipes_follows_pages(mocker):
+    """
+    GIVEN: A table whose scan returns two pages
+    WHEN: Iterating over every recipe
+    THEN: Both pages should be read
+    """
+    table = mocker.Mock()
+    table.scan.side_effect = [
+        {"Items": [{"id": "1"}], "LastEvaluatedKey": {"id": "1"}},
+        {"Items": [{"id": "2"}]},
+    ]
+
+    assert [item["id"] for item in iter_recipes(table)] == ["1", "2"]
+    assert table.scan.call_args.kwargs["ExclusiveStartKey"] == {"id": "1"}
+
+
+def test_iter_recipes_by_id_keeps_order(populated_table):
+    """
+    GIVEN: A table with five recipes
+    WHEN: Reading some of them by ID with a projection
+    THEN: They should come back in the requested order, skipping unknown IDs
+    """
+    items = list(
+        iter_recipes_by_id(
+            populated_table, ["recipe-3", "missing", "recipe-0"], fields=["name"]
+        )
+    )
+
+    assert items == [{"name": "Recipe 3"}, {"name": "Recipe 0"}]
+
+
+def test_put_is_conditional(mock_dynamodb_table):
+    """
+    GIVEN: A recipe that is already stored
+    WHEN: Writing it again with and without overwrite
+    THEN: Only the overwrite should replace it
+    """
+    writer = DynamoDBRecipeWriter(mock_dynamodb_table)
+
+    assert writer.put({"id": "recipe-1", "name": "First"})
+    assert not writer.put({"id": "recipe-1", "name": "Second"})
+    assert mock_dynamodb_table.get_item(Key={"id": "recipe-1"})["Item"]["name"] == (
+        "First"
+    )
+
+    assert writer.put({"id": "recipe-1", "name": "Second"}, overwrite=True)
+    assert mock_dynamodb_table.get_item(Key={"id": "recipe-1"})["Item"]["name"] == (
+        "Second"
+    )
+    stats = writer.stats()
+    assert stats["items_written"] == 2
+    assert stats["items_skipped"] == 1
+
+
+def test_put_many_batches_and_skips_existing(mock_dynamodb_table):
+    """
+    GIVEN: 60 new recipes, one duplicate in the input and one already stored
+    WHEN: Writing them with put_many
+    THEN: Every new recipe should be written in batches of at most 25
+    """
+    mock_dynamodb_table.put_item(Item={"id": "recipe-0", "name": "Stored"})
+    writer = DynamoDBRecipeWriter(mock_dynamodb_table)
+    items = [{"id": f"recipe-{i}", "name": f"Recipe {i}"} for i in range(61)]
+    items.append({"id": "recipe-60", "name": "Recipe 60 again"})
+
+    written = writer.put_many(items)
+
+    assert written[0] is False
+    assert written[60] is False and written[61] is True
+    assert sum(written) == 60
+    assert mock_dynamodb_table.scan(Select="COUNT")["Count"] == 61
+    assert mock_dynamodb_table.get_item(Key={"id": "recipe-0"})["Item"]["name"] == (
+        "Stored"
+    )
+    assert writer.stats()["write_calls"] == 3
+
+
+def test_put_many_retries_unprocessed_items(mock_dynamodb_table, mocker):
+    """
+    GIVEN: A BatchWriteItem call that leaves an item unprocessed
+    WHEN: Writing recipes with put_many
+    THEN: The unprocessed item should be retried
+    """
+    writer = DynamoDBRecipeWriter(mock_dynamodb_table, base_delay=0)
+    batch_write = writer._client.batch_write_item
+    leftover = {"recipes": [{"PutRequest": {"Item": {"id": "recipe-1"}}}]}
+    calls = []
+
+    def flaky_batch_write(RequestItems):
+        calls.append(RequestItems)
+        response = batch_write(RequestItems=RequestItems)
+        if len(calls) == 1:
+            response["UnprocessedItems"] = leftover
+        return response
+
+    mocker.patch.object(writer, "_client")
+    writer._client.batch_get_item.return_value = {"Responses": {"recipes": []}}
+    writer._client.batch_write_item.side_effect = flaky_batch_write
+
+    writer.put_many([{"id": "recipe-1"}, {"id": "recipe-2"}])
+
+    assert len(calls) == 2
+    assert calls[1] == leftover
+    assert writer.stats()["unprocessed_retries"] == 1
+
+
+def test_put_many_failure_records_written_items(mock_dynamodb_table, mocker):
+    """
+    GIVEN: A BatchWriteItem call that fails for the second batch
+    WHEN: Writing 30 recipes with put_many
+    THEN: BatchWriteError should say which items were written and which failed
+    """
+    writer = DynamoDBRecipeWriter(mock_dynamodb_table)
+    mocker.patch.object(
+        writer, "_batch_write", side_effect=[None, RuntimeError("unprocessed")]
+    )
+    items = [{"id": f"recipe-{i}"} for i in range(30)]
+
+    with pytest.raises(BatchWriteError) as error:
+        writer.put_many(items)
+
+    assert error.value.written == [True] * 25 + [False] * 5
+    assert error.value.failed == [False] * 25 + [True] * 5
+    assert writer.stats()["items_written"] == 25
+
+
+def test_put_retries_throttling(mock_dynamodb_table, mocker):
+    """
+    GIVEN: A table that throttles the first write
+    WHEN: Writing a recipe
+    THEN: The write should be retried and the throttle counted
+    """
+    writer = DynamoDBRecipeWriter(mock_dynamodb_table, base_delay=0)
+    put_item = mock_dynamodb_table.put_item
+    throttle = ClientError(
+        {"Error": {"Code": "ProvisionedThroughputExceededException"}}, "PutItem"
+    )
+    attempts = []
+
+    def throttled_put_item(**kwargs):
+        attempts.append(kwargs)
+        if len(attempts) == 1:
+            raise throttle
+        return put_item(**kwargs)
+
+    mocker.patch.object(mock_dynamodb_table, "put_item", side_effect=throttled_put_item)
+
+    assert writer.put({"id": "recipe-1"})
+    assert len(attempts) == 2
+    assert writer.stats()["throttled"] == 1
@@ -0,0 +1,186 @@
+import gzip
+import io
+
+import pytest
+import requests
+import urllib3
+
+from config import TestingConfig
+from fetcher import FetchError, HTTPCache, PageFetcher
+from llm_cache import MemoryCache, SQLiteCache
+
+
+@pytest.fixture
+def fetcher():
+    """Create a PageFetcher with an in-memory HTTP cache."""
+    return PageFetcher(cache=HTTPCache([MemoryCache()]))
+
+
+def test_freshness_lifetime():
+    """
+    GIVEN: Responses with different caching headers
+    WHEN: freshness_lifetime is called
+    THEN: It should honor no-store, no-cache, max-age and Expires
+    """
+    assert HTTPCache.freshness_lifetime({"Cache-Control": "no-store"}) is None
+    assert HTTPCache.freshness_lifetime({"Cache-Control": "no-cache"}) == 0
+    assert HTTPCache.freshness_lifetime({"Cache-Control": "public, max-age=60"}) == 60
+    assert (
+        HTTPCache.freshness_lifetime({"Expires": "Thu, 01 Jan 1970 00:00:00 GMT"}) == 0
+    )
+    assert HTTPCache.freshness_lifetime({}) == 0
+
+
+def test_fetch_serves_fresh_responses_from_cache(fetcher, mocker, make_http_response):
+    """
+    GIVEN: A page served with Cache-Control max-age
+    WHEN: It is fetched twice
+    THEN: The second fetch should come from the cache without a request
+    """
+    response = make_http_response(
+        "<html>page</html>", headers={"Cache-Control": "max-age=60"}
+    )
+    get = mocker.patch.object(fetcher.session, "get", return_value=response)
+
+    assert fetcher.fetch("https://example.com/recipe") == "<html>page</html>"
+    assert fetcher.fetch("https://example.com/recipe") == "<html>page</html>"
+
+    assert get.call_count == 1
+    stats = fetcher.stats()
+    assert stats["cache_hits"] == 1
+    assert stats["bytes_saved"] == len("<html>page</html>")
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_fetch_revalidates_with_etag(fetcher, mocker, make_http_response):
+    """
+    GIVEN: A cached page with an ETag that is no longer fresh
+    WHEN: It is fetched again and the server answers 304
+    THEN: A conditional request should be sent and the cached body returned
+    """
+    first = make_http_response("<html>page</html>", headers={"ETag": '"v1"'})
+    not_modified = make_http_response("", status_code=304)
+    get = mocker.patch.object(fetcher.session, "get", side_effect=[first, not_modified])
+
+    fetcher.fetch("https://example.com/recipe")
+    body = fetcher.fetch("https://example.com/recipe")
+
+    assert body == "<html>page</html>"
+    assert get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert fetcher.stats()["revalidated"] == 1
+
+
+def test_fetch_does_not_store_no_store(fetcher, mocker, make_http_response):
+    """
+    GIVEN: A page served with Cache-Control no-store
+    WHEN: It is fetched twice
+    THEN: Both fetches should hit the network
+    """
+    response = make_http_response(
+        "<html>page</html>", headers={"Cache-Control": "no-store", "ETag": '"v1"'}
+    )
+    get = mocker.patch.object(fetcher.session, "get", return_value=response)
+
+    fetcher.fetch("https://example.com/recipe")
+    fetcher.fetch("https://example.com/recipe")
+
+    assert get.call_count == 2
+    assert get.call_args.kwargs["headers"] == {}
+
+
+def test_fetch_truncates_large_bodies(mocker, make_http_response):
+    """
+    GIVEN: A fetcher with a small size cap
+    WHEN: A larger page is fetched
+    THEN: The body should be truncated at the cap
+    """
+    fetcher = PageFetcher(max_bytes=10)
+    mocker.patch.object(
+        fetcher.session, "get", return_value=make_http_response("x" * 100)
+    )
+
+    assert fetcher.fetch("https://example.com/recipe") == "x" * 10
+    assert fetcher.stats()["truncated"] == 1
+
+
+def test_bytes_downloaded_counts_compressed_bytes(fetcher, mocker):
+    """
+    GIVEN: A gzip-encoded response
+    WHEN: The page is fetched
+    THEN: bytes_downloaded should count the bytes on the wire, not the decoded page
+    """
+    page = b"<html>" + b"soup " * 1000 + b"</html>"
+    compressed = gzip.compress(page)
+    response = requests.Response()
+    response.status_code = 200
+    response.headers.update(
+        {"Content-Type": "text/html; charset=utf-8", "Content-Encoding": "gzip"}
+    )
+    response.raw = urllib3.HTTPResponse(
+        body=io.BytesIO(compressed),
+        headers={"Content-Encoding": "gzip"},
+        preload_content=False,
+    )
+    mocker.patch.object(fetcher.session, "get", return_value=response)
+
+    assert fetcher.fetch("https://example.com/recipe") == page.decode()
+    assert fetcher.stats()["bytes_downloaded"] == len(compressed)
+
+
+def test_disk_cache_is_bounded(mocker, make_http_response, tmp_path):
+    """
+    GIVEN: A fetcher built from a config with a small on-disk cache
+    WHEN: More cacheable pages are fetched than the disk cache may hold
+    THEN: The oldest pages should be evicted from the disk cache
+    """
+    app_config = {
+        name: getattr(TestingConfig, name)
+        for name in dir(TestingConfig)
+        if name.isupper()
+    }
+    app_config["HTTP_CACHE_PATH"] = str(tmp_path / "http_cache.sqlite3")
+    app_config["HTTP_CACHE_DISK_MAX_ENTRIES"] = 2
+    fetcher = PageFetcher.from_config(app_config)
+    mocker.patch.object(
+        fetcher.session,
+        "get",
+        side_effect=lambda *args, **kwargs: make_http_response(
+            "<html></html>", headers={"Cache-Control": "max-age=60"}
+        ),
+    )
+
+    for i in range(3):
+        fetcher.fetch(f"https://example.com/{i}")
+
+    disk = fetcher.cache.tiers[-1]
+    assert isinstance(disk, SQLiteCache)
+    assert len(disk) == 2
+    assert disk.get("https://example.com/0") is None
+
+
+def test_fetch_raises_fetch_error(fetcher, mocker, make_http_response):
+    """
+    GIVEN: A server that errors or is unreachable
+    WHEN: fetch is called
+    THEN: It should raise FetchError
+    """
+    mocker.patch.object(
+        fetcher.session, "get", return_value=make_http_response("", status_code=500)
+    )
+    with pytest.raises(FetchError):
+        fetcher.fetch("https://example.com/recipe")
+
+    mocker.patch.object(
+        fetcher.session, "get", side_effect=requests.ConnectionError("refused")
+    )
+    with pytest.raises(FetchError):
+        fetcher.fetch("https://example.com/other")
+
+
+def test_fetch_negotiates_compression(fetcher):
+    """
+    GIVEN: A new PageFetcher
+    WHEN: Its session headers are inspected
+    THEN: It should ask for compressed responses
+    """
+    assert "gzip" in fetcher.session.headers["Accept-Encoding"]
@@ -0,0 +1,122 @@
+import pytest
+
+from html_extractor import (
+    HeadMetadataParser,
+    extract_recipe_content,
+    find_main_content,
+    scan_head,
+)
+
+
+def test_extract_recipe_content_from_head():
+    """
+    GIVEN: A page with a meta description and an encoded og:image
+    WHEN: extract_recipe_content is called
+    THEN: It should return the description and the decoded image URL
+    """
+    html = """
+        <html><head>
+            <meta name="description" content="Tasty soup">
+            <meta property="og:image" content="https://example.com/soup%20bowl.jpg">
+        </head><body><article>Full article</article></body></html>
+    """
+
+    content, image_url = extract_recipe_content(html)
+
+    assert content == "Tasty soup"
+    assert image_url == "https://example.com/soup bowl.jpg"
+
+
+def test_scan_head_stops_at_body(mocker):
+    """
+    GIVEN: A page whose head ends early in a large document
+    WHEN: scan_head is called
+    THEN: It should stop feeding the parser once the head is finished
+    """
+    html = (
+        '<html><head><meta name="description" content="Soup"></head><body>'
+        + "<div>ad</div>" * 100_000
+        + "</body></html>"
+    )
+    feed = mocker.spy(HeadMetadataParser, "feed")
+
+    head = scan_head(html)
+
+    assert head.description == "Soup"
+    assert feed.call_count == 1
+
+
+def test_extract_recipe_content_falls_back_to_body():
+    """
+    GIVEN: Pages without a meta description
+    WHEN: extract_recipe_content is called
+    THEN: It should return the article, main or content div markup
+    """
+    article = "<html><body><div>nav</div><article><p>Steps</p></article></body></html>"
+    main = "<html><body><main>Main</main></body></html>"
+    content_div = '<html><body><div class="content wide">Div</div></body></html>'
+
+    assert extract_recipe_content(article)[0] == "<article><p>Steps</p></article>"
+    assert extract_recipe_content(main)[0] == "<main>Main</main>"
+    assert find_main_content(content_div) == '<div class="content wide">Div</div>'
+
+
+def test_extract_recipe_content_no_content():
+    """
+    GIVEN: A page with no recipe content
+    WHEN: extract_recipe_content is called
+    THEN: It should return no content and no image
+    """
+    assert extract_recipe_content("<html><body></body></html>") == (None, None)
+
+
+def test_find_main_content_keeps_nested_elements():
+    """
+    GIVEN: A content div containing nested divs, followed by more markup
+    WHEN: find_main_content is called
+    THEN: It should return the whole content div and nothing after it
+    """
+    html = (
+        '<body><div class="content"><div><div>Step 1</div></div><p>Step 2</p></div>'
+        "<div>Footer</div></body>"
+    )
+
+    assert find_main_content(html) == (
+        '<div class="content"><div><div>Step 1</div></div><p>Step 2</p></div>'
+    )
+
+
+@pytest.mark.parametrize(
+    "html, expected",
+    [
+        ('<div class="post-content">Ad</div>', None),
+        ('<div class="content-sidebar">Ad</div>', None),
+        (
+            '<div class="post-content">Ad</div><div class="wide content">Soup</div>',
+            '<div class="wide content">Soup</div>',
+        ),
+        ("<div class=content>Soup</div>", '<div class="content">Soup</div>'),
+    ],
+)
+def test_content_div_class_must_be_exact(html, expected):
+    """
+    GIVEN: Divs whose classes contain "content" as a token or as part of one
+    WHEN: find_main_content is called
+    THEN: Only a div with the exact "content" class should be returned
+    """
+    assert find_main_content(html) == expected
+
+
+def test_candidates_in_scripts_and_comments_are_ignored():
+    """
+    GIVEN: Article tags inside a script and a comment, before the real article
+    WHEN: find_main_content is called
+    THEN: The real article should be returned
+    """
+    html = (
+        "<script>var t = '<article>Template</article>';</script>"
+        "<!-- <article>Old</article> -->"
+        "<article>Soup</article>"
+    )
+
+    assert find_main_content(html) == "<article>Soup</article>"
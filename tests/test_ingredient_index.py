@@ -0,0 +1,100 @@
+import pytest
+
+from ingredient_index import IngredientIndex, normalize_ingredient
+
+
+def recipe(recipe_id, ingredients, user_email="a@example.com"):
+    return {
+        "id": recipe_id,
+        "name": recipe_id.title(),
+        "user_email": user_email,
+        "ingredients": [
+            {"name": name, "quantity": 1, "unit": ""} for name in ingredients
+        ],
+    }
+
+
+@pytest.fixture
+def index():
+    """In-memory ingredient index with a few recipes."""
+    index = IngredientIndex(path=None)
+    index.add(
+        [
+            recipe("omelette", ["eggs", "butter", "salt"]),
+            recipe("pancakes", ["all-purpose flour", "eggs", "milk", "butter"]),
+            recipe("bread", ["flour", "water", "yeast", "salt"]),
+            recipe("salad", ["tomatoes", "cucumber"], user_email="b@example.com"),
+        ]
+    )
+    return index
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("2 Large Eggs, beaten", "egg"),
+        ("All-Purpose Flour", "flour"),
+        ("fresh tomatoes (about 3)", "tomato"),
+        ("Scallions", "green onion"),
+        ("unsalted butter or margarine", "butter"),
+        ("Crème fraîche", "creme fraiche"),
+        ("chopped", ""),
+    ],
+)
+def test_normalize_ingredient(name, expected):
+    """
+    GIVEN: Ingredient names with quantities, notes, plurals and synonyms
+    WHEN: Normalizing them
+    THEN: They should reduce to their canonical names
+    """
+    assert normalize_ingredient(name) == expected
+
+
+def test_query_ranks_by_coverage_then_missing(index):
+    """
+    GIVEN: Recipes sharing some ingredients
+    WHEN: Querying with ingredients on hand
+    THEN: Fully covered recipes come first, staples count as on hand,
+          and recipes using none of the ingredients are left out
+    """
+    results = index.query(["Egg", "butter", "flour"])
+
+    assert [result["id"] for result in results] == ["omelette", "pancakes", "bread"]
+    assert results[0]["coverage"] == 1.0
+    assert results[1]["missing"] == ["milk"]
+    assert results[1]["missing_count"] == 1
+    assert results[2]["missing"] == ["yeast"]
+    assert results[2]["matched"] == 3
+
+
+def test_query_filters_by_user_and_max_missing(index):
+    """
+    GIVEN: Recipes owned by different users
+    WHEN: Querying as one user with a limit on missing ingredients
+    THEN: Only that user's recipes within the limit should be returned
+    """
+    assert index.query(["tomato"], user_email="a@example.com") == []
+    assert [r["id"] for r in index.query(["tomato"], "b@example.com")] == ["salad"]
+    assert [r["id"] for r in index.query(["eggs"], max_missing=1)] == ["omelette"]
+    assert index.query(["eggs"], user_email="nobody@example.com") == []
+
+
+def test_updates_are_seen_by_other_instances(tmp_path):
+    """
+    GIVEN: Two index instances sharing one database, like two gunicorn workers
+    WHEN: One adds, replaces and removes recipes
+    THEN: The other should see every change on its next query
+    """
+    path = str(tmp_path / "ingredients.sqlite3")
+    writer, reader = IngredientIndex(path), IngredientIndex(path)
+
+    writer.add([recipe("toast", ["bread", "butter"])])
+    assert [r["id"] for r in reader.query(["bread"])] == ["toast"]
+
+    writer.add([recipe("toast", ["bread", "jam"])])
+    assert reader.query(["butter"]) == []
+    assert reader.query(["bread", "jam"])[0]["coverage"] == 1.0
+
+    writer.remove("toast")
+    assert reader.query(["bread"]) == []
+    assert len(reader) == 0
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from ingredient_parser import normalize_fractions, parse_ingredient_line, parse_quantity
+
+
+def test_normalize_fractions():
+    """
+    GIVEN: Text with unicode vulgar fractions
+    WHEN: normalize_fractions is called
+    THEN: They should be spelled as ASCII fractions
+    """
+    assert normalize_fractions("1½ cups") == "1 1/2 cups"
+    assert normalize_fractions("¾ tsp") == "3/4 tsp"
+
+
+def test_parse_quantity():
+    """
+    GIVEN: Quantity strings in different formats
+    WHEN: parse_quantity is called
+    THEN: It should return their Decimal value or None
+    """
+    assert parse_quantity("2 1/4") == Decimal("2.25")
+    assert parse_quantity("1,5") == Decimal("1.5")
+    assert parse_quantity("1,000") == Decimal("1000")
+    assert parse_quantity("½") == Decimal("0.5")
+    assert parse_quantity("a pinch") is None
+
+
+def test_parse_ingredient_line():
+    """
+    GIVEN: Ingredient lines with and without quantities and units
+    WHEN: parse_ingredient_line is called
+    THEN: It should split them into quantity, unit and name
+    """
+    flour = parse_ingredient_line("2 1/4 cups all-purpose flour")
+    assert (flour.quantity, flour.unit, flour.name) == (
+        Decimal("2.25"),
+        "cups",
+        "all-purpose flour",
+    )
+
+    garlic = parse_ingredient_line("1 to 2 cloves garlic, minced")
+    assert (garlic.quantity, garlic.unit, garlic.name) == (
+        "1-2",
+        "cloves",
+        "garlic, minced",
+    )
+
+    butter = parse_ingredient_line("200g butter")
+    assert (butter.quantity, butter.unit, butter.name) == (
+        Decimal("200"),
+        "g",
+        "butter",
+    )
+
+    water = parse_ingredient_line("1,000 g water")
+    assert (water.quantity, water.unit, water.name) == (
+        Decimal("1000"),
+        "g",
+        "water",
+    )
+
+    salt = parse_ingredient_line("salt to taste")
+    assert (salt.quantity, salt.unit, salt.name) == ("", "", "salt to taste")
+
+    assert parse_ingredient_line("   ") is None
@@ -0,0 +1,123 @@
+from decimal import Decimal
+
+import pytest
+
+from ingredient_units import (
+    canonical_unit,
+    normalize_ingredients,
+    parse_amount,
+    scale_ingredients,
+    scale_recipe,
+)
+from models import Ingredient
+
+
+def recipe(ingredients, servings=4):
+    return {
+        "id": "r1",
+        "servings": servings,
+        "calories": Decimal("350"),
+        "ingredients": [
+            {"name": name, "quantity": quantity, "unit": unit}
+            for name, quantity, unit in ingredients
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "quantity, expected",
+    [
+        (Decimal("2"), (Decimal("2"), None)),
+        ("1 1/2", (Decimal("1.5"), None)),
+        ("1½", (Decimal("1.5"), None)),
+        ("¾", (Decimal("0.75"), None)),
+        ("1-2", (Decimal("1"), Decimal("2"))),
+        ("2 to 3", (Decimal("2"), Decimal("3"))),
+        ("about 200", (Decimal("200"), None)),
+        ("to taste", (None, None)),
+        ("", (None, None)),
+    ],
+)
+def test_parse_amount(quantity, expected):
+    """
+    GIVEN: Quantities as numbers, fractions, vulgar fractions and ranges
+    WHEN: Parsing them
+    THEN: They should become numeric bounds, or None if not numeric
+    """
+    assert parse_amount(quantity) == expected
+
+
+def test_normalize_ingredients_canonicalizes_units():
+    """
+    GIVEN: Ingredients with differently spelled units
+    WHEN: Normalizing them
+    THEN: Units should be canonical and unknown ones kept in lower case
+    """
+    normalized = normalize_ingredients(
+        [
+            Ingredient(name="oil", quantity="2", unit="Tablespoons"),
+            Ingredient(name="milk", quantity="1", unit="fl. oz."),
+            Ingredient(name="basil", quantity="1", unit="Handful"),
+        ]
+    )
+
+    assert [item.unit for item in normalized] == ["tbsp", "fl oz", "handful"]
+    assert canonical_unit("Lbs.") == "lb"
+
+
+def test_scale_ingredients_rounds_and_changes_units():
+    """
+    GIVEN: Ingredients in units with larger and smaller siblings
+    WHEN: Scaling them up and down
+    THEN: Amounts should move to the most readable unit and be rounded for cooking
+    """
+    stored = recipe(
+        [
+            ("salt", "3/4", "teaspoons"),
+            ("flour", Decimal("800"), "g"),
+            ("garlic", "1-2", "cloves"),
+            ("pepper", "to taste", ""),
+        ]
+    )["ingredients"]
+    normalized = [
+        item.model_dump()
+        for item in normalize_ingredients(Ingredient(**item) for item in stored)
+    ]
+
+    scaled, scaled_normalized = scale_ingredients(stored, normalized, 4)
+
+    assert [(item["quantity"], item["unit"]) for item in scaled] == [
+        (Decimal("1"), "tbsp"),
+        (Decimal("3.2"), "kg"),
+        ("4-8", "cloves"),
+        ("to taste", ""),
+    ]
+    assert scaled_normalized[2] == {
+        "quantity": Decimal("4"),
+        "quantity_max": Decimal("8"),
+        "unit": "clove",
+    }
+
+    scaled, _ = scale_ingredients(stored, normalized, 1 / 3)
+    assert [item["quantity"] for item in scaled[:2]] == [
+        Decimal("0.25"),
+        Decimal("267"),
+    ]
+
+
+def test_scale_recipe_normalizes_older_recipes():
+    """
+    GIVEN: A stored recipe without normalized ingredients
+    WHEN: Scaling it to more servings
+    THEN: It should be normalized on the fly and keep per-serving nutrition
+    """
+    scaled = scale_recipe(recipe([("butter", "1/2", "cup")], servings=2), 6)
+
+    assert scaled["servings"] == 6
+    assert scaled["original_servings"] == 2
+    assert scaled["ingredients"][0]["quantity"] == Decimal("1.5")
+    assert scaled["ingredients"][0]["unit"] == "cup"
+    assert scaled["calories"] == Decimal("350")
+
+    with pytest.raises(ValueError):
+        scale_recipe(recipe([], servings=0), 2)
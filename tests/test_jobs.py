@@ -0,0 +1,230 @@
+import threading
+
+import pytest
+
+from jobs import JobQueue, QueueFull
+
+
+@pytest.fixture
+def make_queue():
+    """Factory for in-memory job queues that are closed after the test."""
+    queues = []
+
+    def _make(handler, **kwargs):
+        queue = JobQueue(handler, path=None, poll_interval=0.05, **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield _make
+    for queue in queues:
+        queue.close()
+
+
+def test_job_runs_and_stores_result(make_queue):
+    """
+    GIVEN: A queue with a handler that succeeds
+    WHEN: Submitting a job and waiting for it
+    THEN: The job should succeed with the handler's return value
+    """
+    queue = make_queue(lambda payload: {"doubled": payload["n"] * 2})
+
+    job = queue.submit({"n": 21})
+    assert job["status"] in ("queued", "running")
+
+    job = queue.wait(job["id"], timeout=5)
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"doubled": 42}
+    assert job["error"] is None
+
+
+def test_job_failure_is_recorded(make_queue):
+    """
+    GIVEN: A queue with a handler that raises
+    WHEN: Submitting a job
+    THEN: The job should fail with the exception message
+    """
+
+    def handler(payload):
+        raise RuntimeError("boom")
+
+    queue = make_queue(handler)
+
+    job = queue.wait(queue.submit({})["id"], timeout=5)
+
+    assert job["status"] == "failed"
+    assert job["error"] == "boom"
+
+
+def test_active_jobs_with_same_key_are_deduplicated(make_queue):
+    """
+    GIVEN: A job that is still running
+    WHEN: Submitting another job with the same key
+    THEN: The running job should be returned instead of a new one
+    """
+    release = threading.Event()
+    calls = []
+
+    def handler(payload):
+        calls.append(payload)
+        release.wait(5)
+        return "done"
+
+    queue = make_queue(handler, workers=1)
+
+    first = queue.submit({"url": "https://example.com"}, key="https://example.com")
+    second = queue.submit({"url": "https://example.com"}, key="https://example.com")
+    release.set()
+
+    assert second["id"] == first["id"]
+    assert queue.wait(first["id"], timeout=5)["status"] == "succeeded"
+    assert len(calls) == 1
+
+    # Once the first job finished, the same key queues a new job
+    third = queue.submit({"url": "https://example.com"}, key="https://example.com")
+    assert third["id"] != first["id"]
+
+
+def test_full_queue_rejects_jobs(make_queue):
+    """
+    GIVEN: A queue whose single worker is busy and whose depth limit is reached
+    WHEN: Submitting another job
+    THEN: It should raise QueueFull
+    """
+    release = threading.Event()
+    started = threading.Event()
+
+    def handler(payload):
+        started.set()
+        release.wait(5)
+
+    queue = make_queue(handler, workers=1, max_depth=1)
+    queue.submit({"n": 1})
+    started.wait(5)
+    queue.submit({"n": 2})
+
+    with pytest.raises(QueueFull):
+        queue.submit({"n": 3})
+    assert queue.depth() == 1
+    release.set()
+
+
+def test_webhook_receives_finished_job(make_queue, mocker):
+    """
+    GIVEN: A job submitted with a callback URL
+    WHEN: The job finishes
+    THEN: The finished job should be POSTed to the callback URL
+    """
+    post = mocker.patch("jobs.requests.post")
+    mocker.patch(
+        "jobs.socket.getaddrinfo",
+        return_value=[(2, 1, 6, "", ("93.184.215.14", 443))],
+    )
+    queue = make_queue(lambda payload: ["ok"])
+
+    job = queue.submit({}, callback_url="https://hooks.example.com/done")
+    queue.wait(job["id"], timeout=5)
+    queue.close()
+
+    post.assert_called_once()
+    assert post.call_args.args[0] == "https://hooks.example.com/done"
+    assert '"status": "succeeded"' in post.call_args.kwargs["data"]
+
+
+def test_webhooks_of_every_submitter_of_a_shared_job(make_queue, mocker):
+    """
+    GIVEN: A running job and a second submit with the same key and its own callback
+    WHEN: The job finishes
+    THEN: Both callback URLs should receive the finished job
+    """
+    post = mocker.patch("jobs.requests.post")
+    mocker.patch(
+        "jobs.socket.getaddrinfo",
+        return_value=[(2, 1, 6, "", ("93.184.215.14", 443))],
+    )
+    release = threading.Event()
+    queue = make_queue(lambda payload: release.wait(5), workers=1)
+
+    first = queue.submit(
+        {}, key="https://example.com", callback_url="https://a.example.com/done"
+    )
+    second = queue.submit(
+        {}, key="https://example.com", callback_url="https://b.example.com/done"
+    )
+    release.set()
+    queue.wait(first["id"], timeout=5)
+    queue.close()
+
+    assert second["id"] == first["id"]
+    assert [call.args[0] for call in post.call_args_list] == [
+        "https://a.example.com/done",
+        "https://b.example.com/done",
+    ]
+
+
+@pytest.mark.parametrize(
+    "callback_url",
+    [
+        "ftp://hooks.example.com/done",
+        "http://127.0.0.1:8080/hook",
+        "http://10.0.0.5/hook",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://[::1]/hook",
+        "http://[::ffff:192.168.0.1]/hook",
+    ],
+)
+def test_callback_urls_must_be_public(make_queue, callback_url):
+    """
+    GIVEN: A callback URL that isn't http(s) or points at a non-public host
+    WHEN: Submitting a job with it
+    THEN: submit should raise ValueError and queue nothing
+    """
+    queue = make_queue(lambda payload: "unused")
+
+    with pytest.raises(ValueError):
+        queue.submit({}, callback_url=callback_url)
+
+    assert queue.depth() == 0
+
+
+def test_jobs_are_shared_through_the_database(tmp_path):
+    """
+    GIVEN: Two queues using the same database file, as in two gunicorn workers
+    WHEN: One of them runs a job
+    THEN: The other should see its result
+    """
+    path = str(tmp_path / "jobs.sqlite3")
+    worker = JobQueue(lambda payload: "done", path=path, poll_interval=0.05)
+    other = JobQueue(lambda payload: "unused", path=path, poll_interval=0.05)
+    try:
+        job = worker.submit({})
+        worker.wait(job["id"], timeout=5)
+
+        assert other.get(job["id"])["result"] == "done"
+        assert other.get("missing") is None
+    finally:
+        worker.close()
+
+
+def test_job_with_expired_lease_is_claimed_again(tmp_path):
+    """
+    GIVEN: A job left running by a worker that died, its lease expired
+    WHEN: The same job is submitted again
+    THEN: The stale job should be claimed and run to completion
+    """
+    path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(lambda payload: "done", path=path, poll_interval=0.05, lease=60)
+    with queue._db.connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, key, status, payload, created_at, updated_at, "
+            "claimed_at, lease_expires_at) "
+            "VALUES ('stale', 'k', 'running', '{}', 0, 0, 0, 60)"
+        )
+    try:
+        job = queue.submit({}, key="k")
+        assert job["id"] == "stale"
+
+        job = queue.wait("stale", timeout=5)
+        assert job["status"] == "succeeded"
+        assert job["result"] == "done"
+    finally:
+        queue.close()
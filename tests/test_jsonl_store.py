@@ -0,0 +1,160 @@
+import fcntl
+import json
+from decimal import Decimal
+
+import pytest
+
+from jsonl_store import JsonlRecipeStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create an empty JSON Lines store."""
+    return JsonlRecipeStore(str(tmp_path / "recipes.jsonl"))
+
+
+def test_append_and_get(store):
+    """
+    GIVEN: A JSON Lines store
+    WHEN: Records are appended, one of them twice
+    THEN: get should return the latest version of each record
+    """
+    store.append({"id": "a", "name": "Soup"})
+    store.append({"id": "b", "name": "Salad", "calories": Decimal("100")})
+    store.append({"id": "a", "name": "Better Soup"})
+
+    assert store.get("a")["name"] == "Better Soup"
+    assert store.get("b")["calories"] == "100"
+    assert store.get("missing") is None
+    assert len(store) == 2
+
+
+def test_delete_and_scan(store):
+    """
+    GIVEN: A store with updated and deleted records
+    WHEN: scan is called
+    THEN: It should yield only the latest version of live records
+    """
+    store.append({"id": "a", "name": "Soup"})
+    store.append({"id": "b", "name": "Salad"})
+    store.append({"id": "a", "name": "Better Soup"})
+    store.delete("b")
+
+    assert [record["name"] for record in store.scan()] == ["Better Soup"]
+    assert "b" not in store
+
+
+def test_appends_from_other_instances_are_indexed(tmp_path):
+    """
+    GIVEN: Two stores sharing a file, like two gunicorn workers
+    WHEN: One appends a record
+    THEN: The other should see it
+    """
+    path = str(tmp_path / "recipes.jsonl")
+    first = JsonlRecipeStore(path)
+    second = JsonlRecipeStore(path)
+    first.append({"id": "a", "name": "Soup"})
+    second.append({"id": "b", "name": "Salad"})
+
+    assert second.get("a")["name"] == "Soup"
+    assert first.get("b")["name"] == "Salad"
+
+
+def test_partial_line_from_a_crashed_writer_is_dropped(tmp_path):
+    """
+    GIVEN: A store whose last line was only partly written before a crash
+    WHEN: Another store appends to it
+    THEN: The partial line should be dropped and every record stay readable
+    """
+    path = tmp_path / "recipes.jsonl"
+    JsonlRecipeStore(str(path)).append({"id": "a", "name": "Soup"})
+    with open(path, "ab") as f:
+        f.write(b'{"id": "b", "na')
+
+    JsonlRecipeStore(str(path)).append({"id": "c", "name": "Stew"})
+
+    records = list(JsonlRecipeStore(str(path)).scan())
+    assert [record["name"] for record in records] == ["Soup", "Stew"]
+
+
+def test_unreadable_lines_are_skipped(store):
+    """
+    GIVEN: A store with a complete line that isn't valid JSON
+    WHEN: Reading it
+    THEN: The line should be skipped and the other records returned
+    """
+    store.append({"id": "a", "name": "Soup"})
+    with open(store.path, "ab") as f:
+        f.write(b"not json\n")
+    store.append({"id": "b", "name": "Salad"})
+
+    assert [record["name"] for record in store.scan()] == ["Soup", "Salad"]
+
+
+def test_store_can_be_written_while_scanning(store):
+    """
+    GIVEN: A store being scanned
+    WHEN: Records are appended and deleted during the scan
+    THEN: The scan should neither deadlock nor see the changes
+    """
+    store.append({"id": "a", "name": "Soup"})
+    store.append({"id": "b", "name": "Salad"})
+
+    names = []
+    for record in store.scan():
+        names.append(record["name"])
+        store.append({"id": record["id"] + "2", "name": "Copy"})
+        store.delete(record["id"])
+
+    assert names == ["Soup", "Salad"]
+    assert sorted(record["id"] for record in store.scan()) == ["a2", "b2"]
+
+
+def test_append_polls_while_another_process_holds_the_lock(store, mocker):
+    """
+    GIVEN: A store file locked by another process
+    WHEN: A record is appended
+    THEN: The append should sleep between attempts rather than block, and
+        go through once the lock is released
+    """
+    holder = open(store.path, "rb")
+    fcntl.flock(holder, fcntl.LOCK_EX)
+    sleep = mocker.patch(
+        "jsonl_store.time.sleep", side_effect=lambda seconds: holder.close()
+    )
+
+    store.append({"id": "a", "name": "Soup"})
+
+    sleep.assert_called_once()
+    assert store.get("a")["name"] == "Soup"
+
+
+def test_compact(store, tmp_path):
+    """
+    GIVEN: A store with superseded and deleted lines
+    WHEN: compact is called
+    THEN: Only live records should remain in the file
+    """
+    store.append({"id": "a", "name": "Soup"})
+    store.append({"id": "a", "name": "Better Soup"})
+    store.append({"id": "b", "name": "Salad"})
+    store.delete("b")
+
+    assert store.compact() == {"lines_before": 4, "lines_after": 1}
+    with open(store.path) as f:
+        assert [json.loads(line)["name"] for line in f] == ["Better Soup"]
+    assert store.get("a")["name"] == "Better Soup"
+
+
+def test_export_json(store, tmp_path):
+    """
+    GIVEN: A store with records
+    WHEN: export_json is called
+    THEN: It should write the legacy JSON array format
+    """
+    store.append({"id": "a", "name": "Soup"})
+    output_file = tmp_path / "recipes.json"
+
+    store.export_json(str(output_file))
+
+    assert json.loads(output_file.read_text()) == [{"id": "a", "name": "Soup"}]
@@ -0,0 +1,108 @@
+import time
+
+from llm_cache import LLMCache, MemoryCache, SQLiteCache
+
+
+def test_make_key_is_content_addressed():
+    """
+    GIVEN: A model, system prompt and description
+    WHEN: make_key is called with the same and with different inputs
+    THEN: Equal inputs should share a key and any change should produce a new one
+    """
+    key = LLMCache.make_key("model", "prompt", "description")
+
+    assert key == LLMCache.make_key("model", "prompt", "description")
+    assert key != LLMCache.make_key("other-model", "prompt", "description")
+    assert key != LLMCache.make_key("model", "other prompt", "description")
+    assert key != LLMCache.make_key("model", "prompt", "other description")
+
+
+def test_memory_cache_evicts_least_recently_used():
+    """
+    GIVEN: A memory tier that holds two entries
+    WHEN: A third entry is added after reading the first
+    THEN: The least recently used entry should be evicted
+    """
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_memory_cache_evicts_by_size():
+    """
+    GIVEN: A memory tier with a small byte budget
+    WHEN: Entries exceeding the budget are added
+    THEN: Older entries should be evicted and oversized values skipped
+    """
+    cache = MemoryCache(max_bytes=10)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+    cache.set("c", "z" * 11)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 6
+    assert cache.get("c") is None
+
+
+def test_memory_cache_expires_entries(mocker):
+    """
+    GIVEN: A memory tier with a TTL
+    WHEN: An entry is read after the TTL has passed
+    THEN: It should be treated as a miss
+    """
+    cache = MemoryCache(ttl=10)
+    cache.set("a", "1")
+    mocker.patch("llm_cache.time.time", return_value=time.time() + 11)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    """
+    GIVEN: A SQLite tier with a stored entry
+    WHEN: A new tier is opened on the same file
+    THEN: The entry should still be available
+    """
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path=path).set("a", "1")
+
+    assert SQLiteCache(path=path).get("a") == "1"
+
+
+def test_sqlite_cache_prunes_oldest_entries(tmp_path):
+    """
+    GIVEN: A SQLite tier that holds two entries
+    WHEN: A third entry is added
+    THEN: The least recently accessed entry should be pruned
+    """
+    cache = SQLiteCache(path=str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.set("c", "3")
+
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+
+def test_llm_cache_promotes_hits_and_counts(tmp_path):
+    """
+    GIVEN: A two-tier cache where only the disk tier has an entry
+    WHEN: The entry and a missing key are looked up
+    THEN: The hit should be promoted to memory and counters updated
+    """
+    memory = MemoryCache()
+    disk = SQLiteCache(path=str(tmp_path / "cache.sqlite3"))
+    disk.set("a", "1")
+    cache = LLMCache([memory, disk])
+
+    assert cache.get("a") == "1"
+    assert cache.get("missing") is None
+    assert memory.get("a") == "1"
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
@@ -0,0 +1,123 @@
+import sqlite3
+
+from metrics import Metrics, counter, server_timing, start_timing
+
+
+def test_histogram_and_counter_rendering():
+    """
+    GIVEN: Metrics with a counter and histogram observations
+    WHEN: Rendering them
+    THEN: They should be in the Prometheus text format, with cumulative buckets
+    """
+    metrics = Metrics(path=None)
+    metrics.inc("recime_llm_tokens_total", 120, kind="prompt", model="m")
+    metrics.inc("recime_llm_tokens_total", 30, kind="prompt", model="m")
+    for seconds in (0.02, 0.3, 7):
+        metrics.observe("recime_stage_duration_seconds", seconds, stage="fetch")
+
+    text = metrics.render()
+
+    assert "# TYPE recime_llm_tokens_total counter" in text
+    assert 'recime_llm_tokens_total{kind="prompt",model="m"} 150' in text
+    assert "# TYPE recime_stage_duration_seconds histogram" in text
+    assert 'recime_stage_duration_seconds_bucket{stage="fetch",le="0.025"} 1' in text
+    assert 'recime_stage_duration_seconds_bucket{stage="fetch",le="0.5"} 2' in text
+    assert 'recime_stage_duration_seconds_bucket{stage="fetch",le="+Inf"} 3' in text
+    assert 'recime_stage_duration_seconds_count{stage="fetch"} 3' in text
+    assert 'recime_stage_duration_seconds_sum{stage="fetch"} 7.32' in text
+
+
+def test_processes_are_summed(tmp_path):
+    """
+    GIVEN: Two Metrics instances sharing a database, like two gunicorn workers
+    WHEN: Each records counts and one renders
+    THEN: The rendered totals should include both, plus collected counters
+    """
+    path = str(tmp_path / "metrics.sqlite3")
+    worker_1, worker_2 = Metrics(path), Metrics(path)
+    worker_1.inc("recime_scrapes_total", outcome="parsed")
+    worker_2.inc("recime_scrapes_total", 2, outcome="parsed")
+    worker_2.add_collector(
+        lambda: counter("recime_llm_cache_lookups_total", 4, result="hit")
+    )
+    worker_1.flush()
+    worker_2.flush()
+    worker_1.inc("recime_scrapes_total", outcome="parsed")
+
+    text = worker_1.render()
+
+    assert 'recime_scrapes_total{outcome="parsed"} 4' in text
+    assert 'recime_llm_cache_lookups_total{result="hit"} 4' in text
+
+
+def test_exited_processes_are_merged(tmp_path):
+    """
+    GIVEN: Workers that exited cleanly or stopped flushing without exiting cleanly
+    WHEN: A new worker starts and renders
+    THEN: Their rows should be merged into one per series, keeping the totals
+    """
+    path = str(tmp_path / "metrics.sqlite3")
+    exited, killed = Metrics(path), Metrics(path)
+    exited.inc("recime_scrapes_total", outcome="parsed")
+    exited.close()
+    killed.inc("recime_scrapes_total", 2, outcome="parsed")
+    killed.flush()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE metrics SET updated_at = 0 WHERE process != 'exited'")
+
+    worker = Metrics(path)
+    worker.inc("recime_scrapes_total", outcome="parsed")
+    text = worker.render()
+
+    assert 'recime_scrapes_total{outcome="parsed"} 4' in text
+    with sqlite3.connect(path) as conn:
+        processes = conn.execute("SELECT DISTINCT process FROM metrics").fetchall()
+    assert sorted(process for (process,) in processes) == sorted(
+        ["exited", worker._process]
+    )
+
+
+def test_idle_process_merged_as_stale_is_not_counted_twice(tmp_path):
+    """
+    GIVEN: A live worker whose rows were merged because it hadn't flushed lately
+    WHEN: It counts more and flushes again
+    THEN: Only what it counted after the merge should be added
+    """
+    path = str(tmp_path / "metrics.sqlite3")
+    idle = Metrics(path)
+    idle.inc("recime_scrapes_total", 2, outcome="parsed")
+    idle.flush()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE metrics SET updated_at = 0")
+    worker = Metrics(path)
+
+    idle.inc("recime_scrapes_total", outcome="parsed")
+    idle.flush()
+
+    assert 'recime_scrapes_total{outcome="parsed"} 3' in worker.render()
+
+
+def test_stages_are_reported_in_server_timing():
+    """
+    GIVEN: Timing started for a request
+    WHEN: Stages run, one of them twice
+    THEN: The Server-Timing value should list each stage once, and the total
+    """
+    metrics = Metrics(path=None)
+    timings = start_timing()
+    with metrics.stage("fetch"):
+        pass
+    with metrics.stage("llm"):
+        pass
+    with metrics.stage("llm"):
+        pass
+
+    header = server_timing(timings, 1.5)
+
+    assert [part.split(";")[0] for part in header.split(", ")] == [
+        "fetch",
+        "llm",
+        "total",
+    ]
+    assert header.endswith("total;dur=1500.0")
+    assert 'recime_stage_duration_seconds_count{stage="llm"} 2' in metrics.render()
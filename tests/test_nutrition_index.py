@@ -0,0 +1,108 @@
+from decimal import Decimal
+
+import pytest
+
+from nutrition_index import NutritionIndex, macro_grams, parse_filters
+
+
+def recipe(recipe_id, calories, protein=None, created_at=0, user_email="a@x.com"):
+    return {
+        "id": recipe_id,
+        "user_email": user_email,
+        "created_at": created_at,
+        "calories": Decimal(str(calories)) if calories is not None else None,
+        "protein": protein,
+        "fat": None,
+        "carbs": {"amount": Decimal("30"), "unit": "g"},
+    }
+
+
+@pytest.fixture
+def index():
+    """In-memory nutrition index with a few recipes."""
+    index = NutritionIndex(path=None)
+    index.add(
+        [
+            recipe("salad", 250, {"amount": Decimal("12"), "unit": "g"}, 1),
+            recipe("steak", 650, {"amount": Decimal("0.05"), "unit": "kg"}, 2),
+            recipe("soup", 300, {"amount": Decimal("9000"), "unit": "mg"}, 3),
+            recipe("mystery", None, None, 4),
+            recipe("toast", 200, None, 5, user_email="b@x.com"),
+        ]
+    )
+    return index
+
+
+@pytest.mark.parametrize(
+    "macro, grams",
+    [
+        ({"amount": Decimal("12"), "unit": "g"}, 12.0),
+        ({"amount": "1500", "unit": "mg"}, 1.5),
+        ({"amount": 1, "unit": "Oz."}, 28.349523125),
+        ({"amount": 5, "unit": "cups"}, None),
+        (None, None),
+    ],
+)
+def test_macro_grams(macro, grams):
+    """
+    GIVEN: Macros in various units
+    WHEN: Converting them to grams
+    THEN: Known units should convert and unknown ones should be None
+    """
+    assert macro_grams(macro) == grams
+
+
+def test_parse_filters():
+    """
+    GIVEN: Request parameters with nutrition filters
+    WHEN: Parsing them
+    THEN: Each should become a bound, and non-numbers should be rejected
+    """
+    assert parse_filters(
+        {"max_calories_per_serving": "500", "min_protein_g": "10"}
+    ) == [
+        ("calories", "max", 500.0),
+        ("protein_g", "min", 10.0),
+    ]
+    with pytest.raises(ValueError):
+        parse_filters({"min_fat_g": "nan"})
+
+
+def test_query_combines_filters_and_sorts(index):
+    """
+    GIVEN: Recipes with known and unknown nutrition values
+    WHEN: Filtering on several columns and sorting
+    THEN: Only recipes within every range should match, in order
+    """
+    ids, total = index.query([("calories", "max", 600), ("protein_g", "min", 9)])
+    assert (ids, total) == (["soup", "salad"], 2)
+
+    ids, _ = index.query(sort="-protein_g", user_email="a@x.com")
+    # Unknown values sort last
+    assert ids == ["steak", "salad", "soup", "mystery"]
+    # Emails match in any casing, as in the search index
+    assert index.query(sort="-protein_g", user_email=" A@X.com")[0] == ids
+
+    ids, total = index.query(
+        [("carbs_g", "min", 30)], sort="calories", offset=1, limit=2
+    )
+    assert (ids, total) == (["salad", "soup"], 5)
+
+
+def test_updates_and_removals_are_applied(index):
+    """
+    GIVEN: An indexed recipe
+    WHEN: It is re-indexed with new values and then removed
+    THEN: Queries should reflect each change
+    """
+    index.add([recipe("steak", 450, None, 2)])
+    assert index.query([("calories", "max", 500)], sort="calories")[0] == [
+        "toast",
+        "salad",
+        "soup",
+        "steak",
+    ]
+
+    index.remove("steak")
+    assert "steak" not in index.query()[0]
+    assert len(index) == 4
@@ -0,0 +1,92 @@
+import httpx
+import openai
+import pytest
+
+from rate_limiter import RateLimiter, is_retryable, retry_with_backoff
+
+
+def _status_error(status_code):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status_code, request=request)
+    if status_code == 429:
+        return openai.RateLimitError("rate limited", response=response, body=None)
+    return openai.APIStatusError("error", response=response, body=None)
+
+
+def test_is_retryable():
+    """
+    GIVEN: Errors raised by the OpenAI client
+    WHEN: is_retryable is called
+    THEN: Only 429, 5xx and connection errors should be retried
+    """
+    assert is_retryable(_status_error(429))
+    assert is_retryable(_status_error(503))
+    assert not is_retryable(_status_error(400))
+    assert not is_retryable(ValueError("bad response"))
+
+
+def test_retry_with_backoff_retries_until_success(mocker):
+    """
+    GIVEN: A call that is rate limited twice before succeeding
+    WHEN: retry_with_backoff is called
+    THEN: It should sleep between attempts and return the result
+    """
+    sleep = mocker.patch("rate_limiter.time.sleep")
+    func = mocker.Mock(side_effect=[_status_error(429), _status_error(500), "ok"])
+
+    assert retry_with_backoff(func, max_retries=3) == "ok"
+    assert func.call_count == 3
+    assert sleep.call_count == 2
+
+
+def test_retry_with_backoff_gives_up(mocker):
+    """
+    GIVEN: A call that fails with a non-retryable error or keeps being rate limited
+    WHEN: retry_with_backoff is called
+    THEN: It should raise without retrying forever
+    """
+    mocker.patch("rate_limiter.time.sleep")
+    bad_request = mocker.Mock(side_effect=_status_error(400))
+    with pytest.raises(openai.APIStatusError):
+        retry_with_backoff(bad_request, max_retries=3)
+    assert bad_request.call_count == 1
+
+    rate_limited = mocker.Mock(side_effect=_status_error(429))
+    with pytest.raises(openai.RateLimitError):
+        retry_with_backoff(rate_limited, max_retries=2)
+    assert rate_limited.call_count == 3
+
+
+def test_rate_limiter_waits_when_budget_exhausted(mocker):
+    """
+    GIVEN: A limiter allowing 60 requests per minute with its budget used up
+    WHEN: Another request is acquired
+    THEN: It should wait for the bucket to refill
+    """
+    limiter = RateLimiter(requests_per_minute=60)
+    limiter._requests = 0
+    sleep = mocker.patch("rate_limiter.time.sleep", side_effect=lambda s: None)
+    mocker.patch(
+        "rate_limiter.time.monotonic",
+        side_effect=[limiter._updated_at, limiter._updated_at + 1],
+    )
+
+    limiter.acquire()
+
+    sleep.assert_called_once()
+    assert sleep.call_args.args[0] == pytest.approx(1)
+
+
+def test_rate_limiter_from_config_splits_limits_between_processes():
+    """
+    GIVEN: Account-wide OpenAI limits
+    WHEN: Building the limiter of one of three worker processes
+    THEN: It should get a third of each limit
+    """
+    app_config = {"OPENAI_REQUESTS_PER_MINUTE": 500, "OPENAI_TOKENS_PER_MINUTE": 0}
+
+    limiter = RateLimiter.from_config(app_config, processes=3)
+
+    assert limiter.requests_per_minute == 166
+    assert limiter.tokens_per_minute == 0
+    assert RateLimiter.from_config(app_config).requests_per_minute == 500
@@ -0,0 +1,132 @@
+import gzip
+import json
+import os
+import time
+
+import pytest
+
+from recipe_export import CapacityLimiter, SegmentedExporter
+
+
+@pytest.fixture
+def filled_table(mock_dynamodb_table):
+    """Recipes table holding 250 recipes."""
+    with mock_dynamodb_table.batch_writer() as batch:
+        for i in range(250):
+            batch.put_item(
+                Item={
+                    "id": f"recipe-{i:03d}",
+                    "name": f"Recipe {i}",
+                    "user_email": "test@example.com",
+                    "created_at": 1000 + i,
+                }
+            )
+    return mock_dynamodb_table
+
+
+class CrashingTable:
+    """Table proxy whose scan fails after a number of calls."""
+
+    def __init__(self, table, fail_after):
+        self.table = table
+        self.name = table.name
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def scan(self, **kwargs):
+        self.calls += 1
+        if self.calls > self.fail_after:
+            raise RuntimeError("Simulated crash")
+        return self.table.scan(**kwargs)
+
+
+def read_export(output_dir):
+    with open(os.path.join(output_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    ids = []
+    for segment in manifest["segments"].values():
+        for shard in segment["shards"]:
+            with gzip.open(os.path.join(output_dir, shard["file"]), "rt") as f:
+                ids.extend(json.loads(line)["id"] for line in f)
+    return manifest, ids
+
+
+def test_export_writes_every_item_once(filled_table, tmp_path):
+    """
+    GIVEN: A table with 250 recipes
+    WHEN: Exporting it with 4 parallel segments and small shards
+    THEN: Every recipe should be in exactly one gzipped shard
+    """
+    output_dir = str(tmp_path / "export")
+    exporter = SegmentedExporter(
+        filled_table, output_dir, total_segments=4, page_size=20, items_per_shard=50
+    )
+
+    summary = exporter.run()
+    manifest, ids = read_export(output_dir)
+
+    assert summary["items"] == 250
+    assert summary["consumed_rcu"] > 0
+    assert sorted(ids) == [f"recipe-{i:03d}" for i in range(250)]
+    assert all(segment["done"] for segment in manifest["segments"].values())
+    assert summary["shards"] == sum(
+        len(segment["shards"]) for segment in manifest["segments"].values()
+    )
+
+
+def test_export_resumes_after_crash(filled_table, tmp_path):
+    """
+    GIVEN: An export that crashed part way through
+    WHEN: Running it again into the same directory
+    THEN: It should finish without losing or duplicating recipes
+    """
+    output_dir = str(tmp_path / "export")
+    crashing = CrashingTable(filled_table, fail_after=6)
+    with pytest.raises(RuntimeError):
+        SegmentedExporter(
+            crashing,
+            output_dir,
+            total_segments=2,
+            workers=1,
+            page_size=20,
+            items_per_shard=40,
+        ).run()
+    manifest, ids = read_export(output_dir)
+    assert 0 < len(ids) < 250
+
+    resumed = SegmentedExporter(
+        filled_table, output_dir, total_segments=2, page_size=20, items_per_shard=40
+    )
+    resumed.run()
+    _, ids = read_export(output_dir)
+
+    assert sorted(ids) == [f"recipe-{i:03d}" for i in range(250)]
+
+
+def test_export_rejects_different_settings(filled_table, tmp_path):
+    """
+    GIVEN: A directory holding an export with 2 segments
+    WHEN: Resuming it with 4 segments
+    THEN: It should raise ValueError instead of mixing the exports
+    """
+    output_dir = str(tmp_path / "export")
+    SegmentedExporter(filled_table, output_dir, total_segments=2).run()
+
+    with pytest.raises(ValueError):
+        SegmentedExporter(filled_table, output_dir, total_segments=4).run()
+
+
+def test_capacity_limiter_paces_calls():
+    """
+    GIVEN: A limiter allowing 100 capacity units per second
+    WHEN: A call consumes 10 units
+    THEN: The next call should wait about 0.1 seconds
+    """
+    limiter = CapacityLimiter(100)
+    limiter.wait()
+    limiter.consume(10)
+
+    start = time.monotonic()
+    limiter.wait()
+
+    assert time.monotonic() - start >= 0.08
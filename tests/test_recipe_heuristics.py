@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+from models import BaseRecipe
+from recipe_heuristics import check_recipe, extract_heuristic_recipe
+
+LEMON_CHICKEN = """# Lemon Chicken
+Serves 4
+Ingredients
+For the chicken:
+- 2 chicken breasts
+- 1 tbsp olive oil
+- 1 lemon
+- salt to taste
+Instructions
+- 1. Heat the oil in a pan.
+- 2. Cook the chicken for 8 minutes.
+Nutrition
+Calories: 320 kcal | Fat: 12g | Carbohydrates: 4g | Protein: 45g
+"""
+
+
+def recipe(**overrides):
+    fields = {
+        "name": "Lemon Chicken",
+        "servings": 4,
+        "calories": Decimal("320"),
+        "fat": {"amount": Decimal("12"), "unit": "g"},
+        "carbs": {"amount": Decimal("4"), "unit": "g"},
+        "protein": {"amount": Decimal("45"), "unit": "g"},
+        "ingredients": [{"name": "chicken", "quantity": Decimal("2"), "unit": ""}],
+        "instructions": ["Step 1: Heat the oil.", "Step 2: Cook the chicken."],
+    }
+    return BaseRecipe.model_validate({**fields, **overrides})
+
+
+def test_extract_heuristic_recipe():
+    """
+    GIVEN: Compacted recipe text with headings, a list and nutrition facts
+    WHEN: Extracting the recipe with heuristics
+    THEN: Every field should be read, without headings or list markers
+    """
+    base_recipe = BaseRecipe.model_validate(extract_heuristic_recipe(LEMON_CHICKEN))
+
+    assert base_recipe.name == "Lemon Chicken"
+    assert base_recipe.servings == 4
+    assert base_recipe.calories == Decimal("320")
+    assert base_recipe.protein.amount == Decimal("45")
+    assert [ingredient.name for ingredient in base_recipe.ingredients] == [
+        "chicken breasts",
+        "olive oil",
+        "lemon",
+        "salt to taste",
+    ]
+    assert base_recipe.instructions == [
+        "Heat the oil in a pan.",
+        "Cook the chicken for 8 minutes.",
+    ]
+    assert check_recipe(base_recipe) == []
+
+
+def test_extract_heuristic_recipe_without_sections():
+    """
+    GIVEN: Text without ingredient and instruction headings
+    WHEN: Extracting the recipe with heuristics
+    THEN: No ingredients, instructions or name should be guessed
+    """
+    fields = extract_heuristic_recipe("My favourite soup, serves 2.\nIt's great.")
+    assert fields == {"servings": 2, "fat": None, "carbs": None, "protein": None}
+
+
+def test_extract_heuristic_recipe_needs_a_title_for_the_name():
+    """
+    GIVEN: Recipe text starting with a breadcrumb and without a "# " title
+    WHEN: Extracting the recipe with heuristics
+    THEN: No name should be guessed, so the recipe goes to the model
+    """
+    text = "Home > Dinners > Chicken\n" + LEMON_CHICKEN.replace("# Lemon Chicken\n", "")
+
+    fields = extract_heuristic_recipe(text)
+
+    assert "name" not in fields
+    assert fields["ingredients"]
+
+
+def test_extract_heuristic_recipe_reads_thousands_separators():
+    """
+    GIVEN: Nutrition figures written with thousands separators
+    WHEN: Extracting the recipe with heuristics
+    THEN: The separators should not cut the numbers short
+    """
+    fields = extract_heuristic_recipe("Serves 8\n1,200 kcal\nProtein: 1,050.5 g")
+    assert fields["calories"] == Decimal("1200")
+    assert fields["protein"] == {"amount": Decimal("1050.5"), "unit": "g"}
+
+
+def test_check_recipe_finds_problems():
+    """
+    GIVEN: Recipes read incompletely or inconsistently
+    WHEN: Checking them
+    THEN: Each problem should be reported
+    """
+    assert check_recipe(recipe()) == []
+    assert check_recipe(recipe(ingredients=[])) == ["no ingredients"]
+    assert check_recipe(
+        recipe(instructions=["2. Cook the chicken.", "1. Heat the oil."])
+    ) == ["instructions out of order"]
+    assert check_recipe(recipe(calories=Decimal("900"))) == [
+        "macros (304 kcal) don't match calories (900)"
+    ]
+    assert check_recipe(recipe(servings=0, calories=Decimal("0"))) == [
+        "implausible servings: 0",
+        "implausible calories: 0",
+    ]
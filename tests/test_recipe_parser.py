@@ -1,8 +1,13 @@
 import json
+from decimal import Decimal
 from pathlib import Path
 from unittest.mock import Mock
 
-from models import BaseRecipe, Recipe
+from llm_cache import LLMCache, MemoryCache
+from metrics import Metrics
+from models import BaseRecipe, Recipe, StructuredRecipe
+from recipe_parser import RecipeParser
+from search_index import SearchIndex
 
 
 def test_recipe_parser_initialization(recipe_parser):
@@ -74,6 +79,16 @@ def test_parse_recipe_failure(recipe_parser, mocker):
     assert result is None
 
 
+def test_parse_recipe_without_user_email(recipe_parser):
+    """
+    GIVEN: A recipe with no user email
+    WHEN: parse_recipe is called
+    THEN: It should return None rather than a recipe missing its owner
+    """
+    result = recipe_parser.parse_recipe("Test recipe", "https://example.com", None)
+    assert result is None
+
+
 def test_parse_recipes_batch(recipe_parser):
     """
     GIVEN: Multiple recipe descriptions and URLs
@@ -129,6 +144,9 @@ def test_save_recipe_to_dynamodb(recipe_parser_dynamodb):
 
     assert "Item" in saved_item
     assert saved_item["Item"]["url"] == url
+    assert saved_item["Item"]["normalized_ingredients"] == [
+        {"quantity": Decimal("1"), "quantity_max": None, "unit": "cup"}
+    ]
 
 
 def test_generate_recipe_id(recipe_parser):
@@ -200,3 +218,408 @@ def test_parse_recipe_base_fields(recipe_parser, mocker):
     assert recipe.fat.amount == base_recipe_data["fat"]["amount"]
     assert recipe.ingredients[0].name == base_recipe_data["ingredients"][0]["name"]
     assert recipe.instructions == base_recipe_data["instructions"]
+
+
+def test_parse_recipe_uses_llm_cache(mock_openai_client, tmp_path):
+    """
+    GIVEN: A RecipeParser with an LLM cache
+    WHEN: The same description is parsed twice for different users
+    THEN: OpenAI should only be called once and both recipes should be returned
+    """
+    cache = LLMCache([MemoryCache()])
+    parser = RecipeParser(
+        output_file=str(tmp_path / "recipes.json"),
+        client=mock_openai_client,
+        cache=cache,
+    )
+
+    first = parser.parse_recipe("Same text", "https://example.com", "a@example.com")
+    second = parser.parse_recipe("Same text", "https://example.com", "b@example.com")
+
+    assert mock_openai_client.beta.chat.completions.parse.call_count == 1
+    assert first.name == second.name
+    assert second.user_email == "b@example.com"
+    assert cache.stats()["hits"] == 1
+
+
+def test_forced_parse_calls_the_model_again(mock_openai_client, tmp_path):
+    """
+    GIVEN: A RecipeParser whose LLM cache already holds a recipe's response
+    WHEN: The recipe is parsed again with force set
+    THEN: OpenAI should be called again and the new response cached
+    """
+    cache = LLMCache([MemoryCache()])
+    parser = RecipeParser(
+        output_file=str(tmp_path / "recipes.json"),
+        client=mock_openai_client,
+        cache=cache,
+    )
+    parser.parse_recipes(["Same text"], ["https://example.com"], ["a@example.com"])
+
+    parser.parse_recipes(
+        ["Same text"], ["https://example.com"], ["a@example.com"], force=True
+    )
+
+    assert mock_openai_client.beta.chat.completions.parse.call_count == 2
+    assert cache.stats()["hits"] == 0
+    parser.parse_recipe("Same text", "https://example.com", "b@example.com")
+    assert cache.stats()["hits"] == 1
+
+
+def test_recipe_exists(recipe_parser_dynamodb):
+    """
+    GIVEN: A recipe saved to DynamoDB
+    WHEN: recipe_exists and find_recipe are called
+    THEN: They should find the saved recipe and nothing for other users
+    """
+    url = "https://example.com/recipe"
+    recipe = recipe_parser_dynamodb.parse_recipe("Test recipe", url, "a@example.com")
+    recipe_parser_dynamodb._save_recipe_to_dynamodb(recipe)
+
+    assert recipe_parser_dynamodb.recipe_exists(url, "a@example.com")
+    assert not recipe_parser_dynamodb.recipe_exists(url, "b@example.com")
+    assert recipe_parser_dynamodb.find_recipe(url, "a@example.com")["url"] == url
+    assert recipe_parser_dynamodb.find_recipe(url, "b@example.com") is None
+
+
+def test_parse_recipes_skips_existing(recipe_parser_dynamodb):
+    """
+    GIVEN: A recipe that is already stored in DynamoDB
+    WHEN: parse_recipes is called with and without force
+    THEN: It should skip OpenAI unless force is set
+    """
+    url = "https://example.com/recipe"
+    user_email = "test@example.com"
+    parse = recipe_parser_dynamodb.client.beta.chat.completions.parse
+    recipe_parser_dynamodb.parse_recipes(["Recipe"], [url], [user_email])
+    assert parse.call_count == 1
+
+    skipped = recipe_parser_dynamodb.parse_recipes(["Recipe"], [url], [user_email])
+    assert skipped == []
+    assert parse.call_count == 1
+
+    forced = recipe_parser_dynamodb.parse_recipes(
+        ["Recipe"], [url], [user_email], force=True
+    )
+    assert len(forced) == 1
+    assert parse.call_count == 2
+
+
+def test_parse_recipes_detailed_reports_failures(recipe_parser, mock_openai_client):
+    """
+    GIVEN: A batch where one OpenAI request fails
+    WHEN: parse_recipes_detailed is called concurrently
+    THEN: Results should come back in input order with the failure reported
+    """
+    good_response = mock_openai_client.beta.chat.completions.parse.return_value
+
+    def parse(**kwargs):
+        if kwargs["messages"][1]["content"] == "Bad recipe":
+            raise ValueError("Invalid response")
+        return good_response
+
+    mock_openai_client.beta.chat.completions.parse.side_effect = parse
+    recipe_parser.max_concurrency = 3
+
+    results = recipe_parser.parse_recipes_detailed(
+        ["Recipe 1", "Bad recipe", "Recipe 3"],
+        ["https://example.com/1", "https://example.com/2", "https://example.com/3"],
+        ["test@example.com"] * 3,
+    )
+
+    assert [result.index for result in results] == [0, 1, 2]
+    assert [result.status for result in results] == ["parsed", "failed", "parsed"]
+    assert results[1].error == "Invalid response"
+    assert results[2].recipe.url == "https://example.com/3"
+    assert len(recipe_parser.parse_recipes(["Recipe"], ["u"], ["e"])) == 1
+
+
+def test_parse_recipe_from_complete_structured_data(recipe_parser):
+    """
+    GIVEN: Structured recipe data with every field but the optional macros
+    WHEN: parse_recipe is called
+    THEN: It should build the recipe without calling OpenAI, macros unknown
+    """
+    structured = StructuredRecipe(
+        source="json-ld",
+        fields={
+            "name": "Soup",
+            "servings": 2,
+            "calories": 100,
+            "ingredients": [{"name": "stock", "quantity": 1, "unit": "cup"}],
+            "instructions": ["Boil"],
+        },
+    )
+
+    recipe = recipe_parser.parse_recipe(
+        None, "https://example.com", "test@example.com", structured=structured
+    )
+
+    assert recipe.name == "Soup"
+    assert recipe.parse_method == "json-ld"
+    assert recipe.fat is None and recipe.protein is None
+    recipe_parser.client.beta.chat.completions.parse.assert_not_called()
+
+
+def test_parse_recipe_fills_missing_fields_with_llm(recipe_parser):
+    """
+    GIVEN: Structured recipe data without nutrition
+    WHEN: parse_recipe is called
+    THEN: The LLM should fill the missing fields and structured fields should win
+    """
+    structured = StructuredRecipe(
+        source="json-ld",
+        fields={
+            "name": "Soup",
+            "servings": 2,
+            "ingredients": [{"name": "stock", "quantity": 1, "unit": "cup"}],
+            "instructions": ["Boil"],
+        },
+    )
+
+    recipe = recipe_parser.parse_recipe(
+        "Soup", "https://example.com", "test@example.com", structured=structured
+    )
+
+    assert recipe.parse_method == "json-ld+llm"
+    assert recipe.name == "Soup"
+    assert recipe.calories == 100
+    recipe_parser.client.beta.chat.completions.parse.assert_called_once()
+
+
+def test_save_recipes_to_jsonl(mock_openai_client, tmp_path):
+    """
+    GIVEN: A RecipeParser with JSON Lines storage
+    WHEN: A batch is parsed twice
+    THEN: Recipes should be appended once and found on the second run
+    """
+    parser = RecipeParser(
+        storage_type="jsonl",
+        output_file=str(tmp_path / "recipes.jsonl"),
+        client=mock_openai_client,
+    )
+    urls = ["https://example.com/1", "https://example.com/2"]
+    emails = ["test@example.com"] * 2
+
+    assert len(parser.parse_recipes(["Recipe 1", "Recipe 2"], urls, emails)) == 2
+    assert parser.parse_recipes(["Recipe 1", "Recipe 2"], urls, emails) == []
+
+    assert parser.recipe_exists(urls[0], emails[0])
+    assert parser.find_recipe(urls[1], emails[1])["url"] == urls[1]
+    assert len((tmp_path / "recipes.jsonl").read_text().splitlines()) == 2
+
+
+def test_parse_recipes_writes_dynamodb_in_batches(recipe_parser_dynamodb, mocker):
+    """
+    GIVEN: A parser with DynamoDB storage
+    WHEN: Parsing several recipes at once
+    THEN: They should be written with batched writes rather than one put each,
+        looking up existing recipes only once
+    """
+    urls = [f"https://example.com/recipe-{i}" for i in range(3)]
+    existing_ids = mocker.spy(recipe_parser_dynamodb.writer, "existing_ids")
+
+    recipes = recipe_parser_dynamodb.parse_recipes(
+        ["Recipe"] * 3, urls, ["test@example.com"] * 3
+    )
+
+    assert len(recipes) == 3
+    assert recipe_parser_dynamodb.table.scan(Select="COUNT")["Count"] == 3
+    stats = recipe_parser_dynamodb.writer.stats()
+    assert stats["items_written"] == 3
+    assert stats["write_calls"] == 1
+    assert existing_ids.call_count == 1
+
+
+def test_failed_batch_write_reports_unwritten_recipes(recipe_parser_dynamodb, mocker):
+    """
+    GIVEN: A DynamoDB batch write that fails after the first batch of 25
+    WHEN: Parsing 30 recipes at once
+    THEN: The written recipes should be parsed and indexed, the rest failed
+    """
+    urls = [f"https://example.com/recipe-{i}" for i in range(30)]
+    mocker.patch.object(
+        recipe_parser_dynamodb.writer,
+        "_batch_write",
+        side_effect=[
+            None,
+            RuntimeError("BatchWriteItem left items unprocessed after retries"),
+        ],
+    )
+    index = Mock()
+    recipe_parser_dynamodb.indexes = [index]
+
+    results = recipe_parser_dynamodb.parse_recipes_detailed(
+        ["Recipe"] * 30, urls, ["test@example.com"] * 30
+    )
+
+    statuses = [result.status for result in results]
+    assert statuses.count("parsed") == 25
+    assert statuses.count("failed") == 5
+    assert all(
+        "unprocessed" in result.error for result in results if result.status == "failed"
+    )
+    assert len(index.add.call_args.args[0]) == 25
+
+
+def test_saved_recipes_are_indexed(mock_openai_client, tmp_path):
+    """
+    GIVEN: A parser with JSON Lines storage and a search index
+    WHEN: Recipes are parsed and saved
+    THEN: They should be searchable by their stored IDs
+    """
+    index = SearchIndex(path=None)
+    parser = RecipeParser(
+        storage_type="jsonl",
+        output_file=str(tmp_path / "recipes.jsonl"),
+        client=mock_openai_client,
+        indexes=[index],
+    )
+    url = "https://example.com/1"
+
+    parser.parse_recipes(["Recipe 1"], [url], ["test@example.com"])
+
+    results = index.search("test recipe", "test@example.com")
+    assert [result["id"] for result in results] == [
+        parser._generate_recipe_id(url, "test@example.com")
+    ]
+
+
+def test_llm_usage_is_recorded(mock_openai_client, tmp_path):
+    """
+    GIVEN: An OpenAI response reporting its token usage
+    WHEN: A recipe is parsed
+    THEN: The call time and the prompt and completion tokens should be recorded
+    """
+    response = mock_openai_client.beta.chat.completions.parse.return_value
+    response.usage = Mock(prompt_tokens=812, completion_tokens=240)
+    metrics = Metrics(path=None)
+    parser = RecipeParser(
+        output_file=str(tmp_path / "recipes.json"),
+        client=mock_openai_client,
+        metrics=metrics,
+    )
+
+    parser.parse_recipe("Test recipe", "https://example.com/1", "test@example.com")
+
+    text = metrics.render()
+    assert 'recime_llm_tokens_total{kind="prompt",model="' in text
+    assert "} 812" in text and "} 240" in text
+    assert 'recime_stage_duration_seconds_count{stage="llm"} 1' in text
+
+
+def test_content_is_compacted_before_the_llm_call(mock_openai_client, tmp_path):
+    """
+    GIVEN: Recipe content with markup and boilerplate
+    WHEN: A recipe is parsed
+    THEN: OpenAI should be sent the compacted text only
+    """
+    parser = RecipeParser(
+        output_file=str(tmp_path / "recipes.json"),
+        client=mock_openai_client,
+        max_input_tokens=100,
+    )
+
+    parser.parse_recipe(
+        "<article><nav>Home</nav><h1>Toast</h1><p>1 slice bread</p>"
+        "<script>track()</script></article>",
+        "https://example.com/1",
+        "test@example.com",
+    )
+
+    messages = mock_openai_client.beta.chat.completions.parse.call_args.kwargs[
+        "messages"
+    ]
+    assert messages[1]["content"] == "# Toast\n1 slice bread"
+
+
+def test_sdk_parsed_recipe_is_used(mock_openai_client, tmp_path):
+    """
+    GIVEN: An OpenAI response the SDK has already parsed into a BaseRecipe
+    WHEN: A recipe is parsed
+    THEN: The parsed object should be used without decoding the content again,
+        and the Recipe built from it should be the same as a validated one
+    """
+    message = mock_openai_client.beta.chat.completions.parse.return_value.choices[
+        0
+    ].message
+    parsed = BaseRecipe.model_validate_json(message.content)
+    message.parsed = parsed
+    message.content = "not json"
+    parser = RecipeParser(
+        output_file=str(tmp_path / "recipes.json"), client=mock_openai_client
+    )
+
+    recipe = parser.parse_recipe(
+        "Test recipe", "https://example.com/1", "test@example.com"
+    )
+
+    assert recipe.ingredients == parsed.ingredients
+    assert Recipe.model_validate(recipe.model_dump()) == recipe
+    assert recipe.normalized_ingredients[0].quantity == Decimal("1")
+
+
+def test_heuristic_tier_skips_the_llm(mock_openai_client, tmp_path):
+    """
+    GIVEN: Recipe text whose every field the heuristics can read
+    WHEN: A recipe is parsed
+    THEN: OpenAI should not be called, and the heuristic tier's hit recorded
+    """
+    metrics = Metrics(path=None)
+    parser = RecipeParser(
+        output_file=str(tmp_path / "recipes.json"),
+        client=mock_openai_client,
+        metrics=metrics,
+    )
+
+    recipe = parser.parse_recipe(
+        "<article><h1>Toast</h1><p>Serves 1</p><h2>Ingredients</h2>"
+        "<ul><li>1 slice bread</li><li>1 tsp butter</li></ul>"
+        "<h2>Instructions</h2><ol><li>Toast the bread.</li><li>Spread the butter.</li>"
+        "</ol><p>Calories: 120 | Fat: 5g | Carbs: 15g | Protein: 3g</p></article>",
+        "https://example.com/1",
+        "test@example.com",
+    )
+
+    assert recipe.parse_method == "heuristic"
+    assert [ingredient.name for ingredient in recipe.ingredients] == [
+        "bread",
+        "butter",
+    ]
+    mock_openai_client.beta.chat.completions.parse.assert_not_called()
+    text = metrics.render()
+    assert 'recime_cascade_tier_total{result="accepted",tier="heuristic"} 1' in text
+
+
+def test_failed_checks_escalate_to_a_stronger_model(mock_openai_client, tmp_path):
+    """
+    GIVEN: A cheap model whose recipe has macros that don't add up to its calories
+    WHEN: A recipe is parsed with an escalation model configured
+    THEN: The stronger model should be asked next, and each tier's outcome recorded
+    """
+    message = mock_openai_client.beta.chat.completions.parse.return_value.choices[
+        0
+    ].message
+    message.content = json.dumps({**json.loads(message.content), "calories": "900"})
+    metrics = Metrics(path=None)
+    parser = RecipeParser(
+        output_file=str(tmp_path / "recipes.json"),
+        client=mock_openai_client,
+        metrics=metrics,
+        escalation_models=["gpt-4o-2024-08-06"],
+    )
+
+    recipe = parser.parse_recipe(
+        "Test recipe", "https://example.com/1", "test@example.com"
+    )
+
+    assert recipe.parse_method == "llm"
+    calls = mock_openai_client.beta.chat.completions.parse.call_args_list
+    assert [call.kwargs["model"] for call in calls] == [
+        "gpt-4o-mini-2024-07-18",
+        "gpt-4o-2024-08-06",
+    ]
+    text = metrics.render()
+    assert 'result="escalated",tier="heuristic"} 1' in text
+    assert 'result="escalated",tier="gpt-4o-mini-2024-07-18"} 1' in text
+    assert 'result="accepted",tier="gpt-4o-2024-08-06"} 1' in text
@@ -0,0 +1,118 @@
+import pytest
+
+from search_index import SearchIndex, build_query
+
+
+@pytest.fixture
+def index():
+    """In-memory search index with a few recipes from two users."""
+    index = SearchIndex(path=None)
+    index.add(
+        [
+            {
+                "id": "curry",
+                "name": "Chicken Curry",
+                "user_email": "alice@example.com",
+                "ingredients": [{"name": "chicken thighs"}, {"name": "coconut milk"}],
+                "instructions": ["Brown the chicken.", "Simmer in coconut milk."],
+                "calories": 550,
+            },
+            {
+                "id": "soup",
+                "name": "Tomato Soup",
+                "user_email": "alice@example.com",
+                "ingredients": [{"name": "tomatoes"}, {"name": "chicken stock"}],
+                "instructions": ["Simmer the tomatoes in stock."],
+                "calories": 200,
+            },
+            {
+                "id": "brulee",
+                "name": "Crème Brûlée",
+                "user_email": "bob@example.com",
+                "ingredients": [{"name": "cream"}, {"name": "sugar"}],
+                "instructions": ["Bake in a water bath."],
+                "calories": 400,
+            },
+        ]
+    )
+    return index
+
+
+def test_search_ranks_name_matches_first(index):
+    """
+    GIVEN: Recipes mentioning chicken in the name or only in an ingredient
+    WHEN: Searching for chicken
+    THEN: The recipe named after it should rank first
+    """
+    results = index.search("chicken", prefix=False)
+
+    assert [result["id"] for result in results] == ["curry", "soup"]
+    assert results[0]["score"] > results[1]["score"]
+    assert results[0]["name"] == "Chicken Curry"
+    assert results[0]["calories"] == "550"
+
+
+def test_search_requires_every_term_and_matches_prefixes(index):
+    """
+    GIVEN: An index of recipes
+    WHEN: Searching with several terms, the last one partly typed
+    THEN: Only recipes containing every term should match
+    """
+    assert [r["id"] for r in index.search("coconut chi")] == ["curry"]
+    assert [r["id"] for r in index.search("tom")] == ["soup"]
+    # A finished word is not expanded
+    assert index.search("tom ") == []
+
+
+def test_search_filters_by_user_and_folds_accents(index):
+    """
+    GIVEN: Recipes owned by different users
+    WHEN: Searching as one user
+    THEN: Only that user's recipes should match, ignoring accents
+    """
+    assert [r["id"] for r in index.search("creme", "bob@example.com")] == ["brulee"]
+    assert index.search("creme", "alice@example.com") == []
+    assert index.search("simmer", "ALICE@example.com", limit=1)[0]["id"] in (
+        "curry",
+        "soup",
+    )
+
+
+def test_add_replaces_and_remove_deletes(index):
+    """
+    GIVEN: An indexed recipe
+    WHEN: It is re-indexed with a new name and later removed
+    THEN: Searches should reflect each change
+    """
+    index.add([{"id": "soup", "name": "Gazpacho", "user_email": "alice@example.com"}])
+    assert index.search("tomato") == []
+    assert [r["id"] for r in index.search("gazpacho")] == ["soup"]
+    assert len(index) == 3
+
+    index.remove("soup")
+    assert index.search("gazpacho") == []
+    assert len(index) == 2
+
+
+def test_index_persists_on_disk(tmp_path):
+    """
+    GIVEN: A recipe indexed into a file
+    WHEN: Opening the same file again
+    THEN: The recipe should be searchable without re-indexing
+    """
+    path = str(tmp_path / "search.sqlite3")
+    SearchIndex(path).add([{"id": "r1", "name": "Banana Bread", "user_email": "a"}])
+
+    assert [r["id"] for r in SearchIndex(path).search("banana")] == ["r1"]
+
+
+def test_build_query_quotes_operators():
+    """
+    GIVEN: Input containing FTS5 syntax
+    WHEN: Building the query
+    THEN: Every term should be quoted and only letters and digits kept
+    """
+    assert build_query('NOT "x" OR y*') == (
+        '{name ingredients instructions}: ("not" "x" "or" "y"*)'
+    )
+    assert build_query("  ...  ") is None
@@ -0,0 +1,148 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import SingleFlight, normalize_url
+
+
+def test_normalize_url():
+    """
+    GIVEN: Links to the same page written differently
+    WHEN: Normalizing them
+    THEN: They should map to the same key
+    """
+    expected = "https://example.com/recipes/soup?page=2&print=1"
+
+    assert normalize_url("HTTPS://Example.com:443/recipes/soup/?print=1&page=2") == (
+        expected
+    )
+    assert (
+        normalize_url(
+            "https://example.com/recipes/soup?page=2&utm_source=x&print=1&fbclid=y#top"
+        )
+        == expected
+    )
+    assert normalize_url("http://example.com:8080") == "http://example.com:8080/"
+
+
+def test_concurrent_callers_share_one_call():
+    """
+    GIVEN: Several threads asking for the same key at once
+    WHEN: The first call is still running
+    THEN: The others should wait for it and get its result
+    """
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return {"value": 42}
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(flight.do, "key", work) for _ in range(5)]
+        # Give every thread time to join the call before releasing it
+        deadline = time.monotonic() + 5
+        while flight.stats()["shared"] < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"calls": 1, "shared": 4}
+
+
+def test_error_reaches_every_waiting_caller():
+    """
+    GIVEN: A call that fails while others wait on it
+    WHEN: The call raises
+    THEN: Every caller should see the exception, and the next call should run again
+    """
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(flight.do, "key", fail) for _ in range(2)]
+        while flight.stats()["shared"] < 1:
+            time.sleep(0.01)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    assert flight.do("key", lambda: "ok") == "ok"
+
+
+def _leased_call(lock_dir, log_path, results):
+    flight = SingleFlight(lock_dir=lock_dir, encode=str, decode=str)
+
+    def work():
+        with open(log_path, "a") as log:
+            log.write(f"{os.getpid()}\n")
+        time.sleep(0.5)
+        return f"result from {os.getpid()}"
+
+    results.put(flight.do("https://example.com/soup", work))
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+def test_processes_share_one_call(tmp_path):
+    """
+    GIVEN: Two processes scraping the same URL at the same time
+    WHEN: Both go through a SingleFlight with a shared lock directory
+    THEN: Only one should run the call and both should get its result
+    """
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    log_path = str(tmp_path / "calls.log")
+    processes = [
+        context.Process(
+            target=_leased_call, args=(str(tmp_path / "locks"), log_path, results)
+        )
+        for _ in range(2)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(10)
+
+    with open(log_path) as log:
+        assert len(log.readlines()) == 1
+    assert results.get(timeout=1) == results.get(timeout=1)
+    assert not list((tmp_path / "locks").glob("*.lock"))
+
+
+def test_lock_files_are_removed(tmp_path):
+    """
+    GIVEN: A SingleFlight with a lock directory
+    WHEN: Calls for many different keys finish
+    THEN: No lock file should be left behind for any of them
+    """
+    flight = SingleFlight(lock_dir=str(tmp_path), encode=str, decode=str)
+
+    for i in range(5):
+        assert flight.do(f"https://example.com/{i}", lambda: "soup") == "soup"
+
+    assert not list(tmp_path.glob("*.lock"))
+
+
+def test_lock_dir_requires_codec(tmp_path):
+    """
+    GIVEN: A lock directory without encode/decode
+    WHEN: Creating a SingleFlight
+    THEN: It should raise ValueError
+    """
+    with pytest.raises(ValueError):
+        SingleFlight(lock_dir=str(tmp_path))
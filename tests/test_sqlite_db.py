@@ -0,0 +1,45 @@
+from sqlite_db import SQLiteDatabase
+
+
+def test_in_memory_database_is_shared_between_connections():
+    """
+    GIVEN: An in-memory database
+    WHEN: Writing through one connection and reading through another
+    THEN: The second connection should see the committed rows
+    """
+    db = SQLiteDatabase(None, "test")
+    with db.connect() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+        conn.execute("INSERT INTO items VALUES ('soup')")
+
+    with db.connect() as conn:
+        assert conn.execute("SELECT name FROM items").fetchall() == [("soup",)]
+
+
+def test_in_memory_databases_are_private():
+    """
+    GIVEN: Two in-memory databases with the same name
+    WHEN: Creating a table in one of them
+    THEN: The other should not see it
+    """
+    first, second = SQLiteDatabase(None, "test"), SQLiteDatabase(None, "test")
+    with first.connect() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+
+    with second.connect() as conn:
+        tables = conn.execute("SELECT name FROM sqlite_master").fetchall()
+    assert tables == []
+
+
+def test_file_database_creates_its_directory(tmp_path):
+    """
+    GIVEN: A database path in a directory that doesn't exist
+    WHEN: Creating the database and writing to it
+    THEN: The directory and file should be created
+    """
+    path = tmp_path / "nested" / "data.sqlite3"
+    db = SQLiteDatabase(str(path), "test")
+    with db.connect() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+
+    assert path.exists()
@@ -0,0 +1,61 @@
+import gzip
+import json
+import zlib
+from decimal import Decimal
+
+from streaming import buffered, gzip_chunks, json_array_chunks, ndjson_lines
+
+
+def test_ndjson_lines():
+    """
+    GIVEN: Items holding Decimal values
+    WHEN: Encoding them as NDJSON
+    THEN: Each item should be one JSON line
+    """
+    lines = list(ndjson_lines([{"id": "1", "calories": Decimal("100")}, {"id": "2"}]))
+
+    assert lines == ['{"id": "1", "calories": "100"}\n', '{"id": "2"}\n']
+
+
+def test_json_array_chunks():
+    """
+    GIVEN: Any number of items
+    WHEN: Encoding them piece by piece
+    THEN: The pieces should join into a valid JSON array
+    """
+    assert json.loads("".join(json_array_chunks([]))) == []
+    assert json.loads("".join(json_array_chunks([{"id": "1"}, {"id": "2"}]))) == [
+        {"id": "1"},
+        {"id": "2"},
+    ]
+
+
+def test_buffered_joins_small_pieces():
+    """
+    GIVEN: Many small pieces
+    WHEN: Buffering them
+    THEN: They should be sent in a few larger chunks without losing data
+    """
+    pieces = ["x" * 10] * 100
+
+    chunks = list(buffered(pieces, chunk_size=256))
+
+    assert len(chunks) == 4
+    assert b"".join(chunks) == b"x" * 1000
+
+
+def test_gzip_chunks_decode_incrementally():
+    """
+    GIVEN: A stream of NDJSON lines
+    WHEN: Gzipping it in chunks
+    THEN: Chunks should decode as they arrive and join into valid gzip
+    """
+    lines = [json.dumps({"id": str(i), "name": "Recipe"}) + "\n" for i in range(500)]
+
+    chunks = list(gzip_chunks(lines, chunk_size=4096))
+
+    assert len(chunks) > 2
+    assert gzip.decompress(b"".join(chunks)).decode() == "".join(lines)
+    # The first chunk alone already decodes to complete lines
+    partial = zlib.decompressobj(wbits=31).decompress(chunks[0])
+    assert partial.endswith(b"\n")
@@ -0,0 +1,164 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from structured_data import extract_structured_recipe, find_microdata_recipe
+
+
+@pytest.fixture
+def json_ld_recipe():
+    """A complete schema.org Recipe as found in recipe site JSON-LD."""
+    return {
+        "@context": "https://schema.org",
+        "@type": ["Recipe"],
+        "name": "Tomato Soup",
+        "image": [{"@type": "ImageObject", "url": "https://example.com/soup.jpg"}],
+        "recipeYield": ["4", "4 servings"],
+        "recipeIngredient": ["2 cups stock", "1½ lb tomatoes"],
+        "recipeInstructions": [
+            {
+                "@type": "HowToSection",
+                "itemListElement": [
+                    {"@type": "HowToStep", "text": "Simmer the tomatoes."},
+                    {"@type": "HowToStep", "text": "Blend."},
+                ],
+            }
+        ],
+        "nutrition": {
+            "@type": "NutritionInformation",
+            "calories": "150 kcal",
+            "fatContent": "4 g",
+            "carbohydrateContent": "20 g",
+            "proteinContent": "3.5 g",
+        },
+    }
+
+
+def _page(data):
+    return (
+        '<html><head><script type="application/ld+json">'
+        + json.dumps(data)
+        + "</script></head><body></body></html>"
+    )
+
+
+def test_extract_json_ld_recipe(json_ld_recipe):
+    """
+    GIVEN: A page with a complete JSON-LD Recipe
+    WHEN: extract_structured_recipe is called
+    THEN: Every BaseRecipe field should be mapped from the structured data
+    """
+    structured = extract_structured_recipe(_page(json_ld_recipe))
+
+    assert structured.source == "json-ld"
+    assert structured.missing_fields() == []
+    assert structured.image_url == "https://example.com/soup.jpg"
+    fields = structured.fields
+    assert fields["name"] == "Tomato Soup"
+    assert fields["servings"] == 4
+    assert fields["calories"] == Decimal("150")
+    assert fields["protein"].amount == Decimal("3.5")
+    assert fields["carbs"].amount == Decimal("20")
+    assert fields["ingredients"][1].quantity == Decimal("1.5")
+    assert fields["ingredients"][1].unit == "lb"
+    assert fields["instructions"] == ["Simmer the tomatoes.", "Blend."]
+
+
+def test_extract_json_ld_recipe_in_graph(json_ld_recipe):
+    """
+    GIVEN: A JSON-LD @graph holding a Recipe without nutrition
+    WHEN: extract_structured_recipe is called
+    THEN: The recipe should be found and calories reported missing
+    """
+    del json_ld_recipe["nutrition"]
+    page = _page({"@graph": [{"@type": "WebPage"}, json_ld_recipe]})
+
+    structured = extract_structured_recipe(page)
+
+    assert structured.fields["name"] == "Tomato Soup"
+    assert structured.missing_fields() == ["calories"]
+
+
+def test_extract_json_ld_nutrition_commas(json_ld_recipe):
+    """
+    GIVEN: Nutrition values with a thousands separator and a decimal comma
+    WHEN: extract_structured_recipe is called
+    THEN: "1,200" should read as 1200 and "4,5" as 4.5
+    """
+    json_ld_recipe["nutrition"]["calories"] = "1,200 kcal"
+    json_ld_recipe["nutrition"]["fatContent"] = "4,5 g"
+
+    fields = extract_structured_recipe(_page(json_ld_recipe)).fields
+
+    assert fields["calories"] == Decimal("1200")
+    assert fields["fat"].amount == Decimal("4.5")
+    assert fields["fat"].unit == "g"
+
+
+def test_extract_json_ld_nutrition_without_macros(json_ld_recipe):
+    """
+    GIVEN: A nutrition block with calories but no macros
+    WHEN: extract_structured_recipe is called
+    THEN: Calories should be found and the fields still count as complete
+    """
+    json_ld_recipe["nutrition"] = {"@type": "NutritionInformation", "calories": "150"}
+
+    structured = extract_structured_recipe(_page(json_ld_recipe))
+
+    assert structured.fields["calories"] == Decimal("150")
+    assert "fat" not in structured.fields
+    assert structured.missing_fields() == []
+    assert structured.base_recipe().fat is None
+
+
+def test_extract_microdata_recipe():
+    """
+    GIVEN: A page with a Recipe marked up with microdata
+    WHEN: extract_structured_recipe is called
+    THEN: Its itemprops should be mapped onto BaseRecipe fields
+    """
+    page = """
+        <html><body><div>Header</div>
+        <div itemscope itemtype="https://schema.org/Recipe">
+            <h1 itemprop="name">Soup</h1>
+            <meta itemprop="recipeYield" content="4 servings">
+            <li itemprop="recipeIngredient">2 cups stock</li>
+            <div itemprop="nutrition" itemscope itemtype="https://schema.org/NutritionInformation">
+                <span itemprop="calories">120 calories</span>
+            </div>
+            <ol itemprop="recipeInstructions"><li>Boil</li><li>Serve</li></ol>
+        </div></body></html>
+    """
+
+    structured = extract_structured_recipe(page)
+
+    assert structured.source == "microdata"
+    assert structured.fields["name"] == "Soup"
+    assert structured.fields["servings"] == 4
+    assert structured.fields["calories"] == Decimal("120")
+    assert structured.fields["instructions"] == ["Boil", "Serve"]
+    assert structured.missing_fields() == []
+
+
+def test_extract_structured_recipe_without_data():
+    """
+    GIVEN: Pages without Recipe structured data or with invalid JSON-LD
+    WHEN: extract_structured_recipe is called
+    THEN: It should return None
+    """
+    assert extract_structured_recipe("<html><body>Soup</body></html>") is None
+    invalid = '<script type="application/ld+json">{not json</script>'
+    assert extract_structured_recipe(invalid) is None
+
+
+def test_find_microdata_recipe_without_a_parsable_root(mocker):
+    """
+    GIVEN: A Recipe itemtype whose element can't be parsed back out of the page
+    WHEN: find_microdata_recipe is called
+    THEN: It should return None rather than fail
+    """
+    mocker.patch("structured_data.slice_element", return_value="")
+    page = '<div itemscope itemtype="https://schema.org/Recipe">Soup</div>'
+
+    assert find_microdata_recipe(page) is None
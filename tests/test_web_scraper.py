@@ -1,15 +1,40 @@
+import gzip
+import io
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 from unittest.mock import Mock
 
 import pytest
 import requests
 
+from fetcher import PageFetcher
+from jobs import QueueFull
 from models import BaseRecipe, Recipe
+from recipe_parser import RecipeParser
+
+
+@pytest.fixture
+def mock_base_recipe():
+    """Create a parsed BaseRecipe, as returned for a page before it is stored."""
+    return BaseRecipe.model_validate(
+        {
+            "name": "Test Recipe",
+            "servings": 4,
+            "calories": 500,
+            "ingredients": [{"quantity": "1", "unit": "cup", "name": "test"}],
+            "instructions": ["Step 1"],
+            "fat": {"amount": 5, "unit": "g"},
+            "protein": {"amount": 10, "unit": "g"},
+            "carbs": {"amount": 20, "unit": "g"},
+        }
+    )
 
 
 @pytest.fixture
 def mock_recipe():
-    """Create a mock recipe that behaves like a Recipe model."""
+    """Create a recipe as the parser would return it."""
     # Base recipe fields
     base_recipe_dict = {
         "name": "Test Recipe",
@@ -33,11 +58,7 @@ def mock_recipe():
         "user_email": "test@example.com",
     }
 
-    recipe = Mock(spec=Recipe)
-    recipe.model_dump.return_value = recipe_dict
-    for key, value in recipe_dict.items():
-        setattr(recipe, key, value)
-    return recipe
+    return Recipe.model_validate(recipe_dict)
 
 
 def test_app_creation(app):
@@ -78,15 +99,16 @@ def test_health_check(client):
     assert data["status"] == "healthy"
 
 
-def test_scrape_recipe_success(client, mocker, mock_recipe):
+def test_scrape_recipe_success(
+    client, mocker, mock_recipe, mock_base_recipe, make_http_response
+):
     """
     GIVEN: A valid recipe URL and mocked responses
     WHEN: Accessing the scrape endpoint
     THEN: It should return the parsed recipe
     """
     # Mock the requests.get call
-    mock_response = Mock()
-    mock_response.text = """
+    mock_response = make_http_response("""
         <html>
             <head>
                 <meta name="description" content="Test Recipe Description">
@@ -96,14 +118,15 @@ def test_scrape_recipe_success(client, mocker, mock_recipe):
                 <article>Recipe content</article>
             </body>
         </html>
-    """
-    mock_response.raise_for_status = Mock()
-    mocker.patch("requests.get", return_value=mock_response)
+    """)
+    mocker.patch("requests.Session.get", return_value=mock_response)
 
     # Mock the RecipeParser
     mock_parser = Mock()
-    mock_parser.parse_recipes.return_value = [mock_recipe]
-    mocker.patch("web_scraper.RecipeParser", return_value=mock_parser)
+    mock_parser.recipe_exists.return_value = False
+    mock_parser.resolve_base_recipe.return_value = (mock_base_recipe, "llm")
+    mock_parser.save_base_recipe.return_value = mock_recipe
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
 
     response = client.post(
         "/scrape",
@@ -115,6 +138,122 @@ def test_scrape_recipe_success(client, mocker, mock_recipe):
     assert isinstance(data, list)
     assert len(data) == 1
     assert data[0]["name"] == "Test Recipe"
+    # A new recipe is looked up by ID only, never read in full
+    mock_parser.find_recipe.assert_not_called()
+
+
+def test_scrape_reports_stage_timings(
+    client, mocker, mock_recipe, mock_base_recipe, make_http_response
+):
+    """
+    GIVEN: A scrape that fetches, extracts, parses and stores a recipe
+    WHEN: It completes
+    THEN: The response should carry a Server-Timing header and /metrics the stages
+    """
+    mocker.patch(
+        "requests.Session.get",
+        return_value=make_http_response(
+            '<html><head><meta name="description" content="Pancakes"></head></html>'
+        ),
+    )
+    mock_parser = Mock()
+    mock_parser.recipe_exists.return_value = False
+    mock_parser.resolve_base_recipe.return_value = (mock_base_recipe, "llm")
+    mock_parser.save_base_recipe.return_value = mock_recipe
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
+
+    response = client.post(
+        "/scrape",
+        json={"url": "https://example.com/recipe", "user_email": "test@example.com"},
+    )
+
+    stages = [
+        part.split(";")[0] for part in response.headers["Server-Timing"].split(", ")
+    ]
+    assert stages == [
+        "lookup",
+        "fetch",
+        "extract",
+        "structured_data",
+        "parse",
+        "store",
+        "total",
+    ]
+
+    response = client.get("/metrics")
+    text = response.data.decode()
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert 'recime_stage_duration_seconds_count{stage="fetch"} 1' in text
+    assert 'recime_stage_bytes_count{stage="extract"} 1' in text
+    assert 'recime_scrapes_total{outcome="parsed"} 1' in text
+    assert 'recime_http_cache_events_total{event="miss"} 1' in text
+    assert (
+        'recime_http_request_duration_seconds_count{endpoint="/scrape",'
+        'method="POST",status="200"} 1'
+    ) in text
+
+
+def test_scrape_recipe_already_exists(client, mocker, mock_recipe):
+    """
+    GIVEN: A recipe that is already stored for the user
+    WHEN: Accessing the scrape endpoint
+    THEN: It should return the stored recipe without fetching or parsing
+    """
+    mock_get = mocker.patch("requests.Session.get")
+    mock_parser = Mock()
+    mock_parser.recipe_exists.return_value = True
+    mock_parser.find_recipe.return_value = mock_recipe.model_dump()
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
+
+    response = client.post(
+        "/scrape",
+        json={"url": "https://example.com/recipe", "user_email": "test@example.com"},
+    )
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data[0]["id"] == "test-id"
+    mock_get.assert_not_called()
+    mock_parser.resolve_base_recipe.assert_not_called()
+
+
+def test_scrape_recipe_force(
+    client, mocker, mock_recipe, mock_base_recipe, make_http_response
+):
+    """
+    GIVEN: A recipe that is already stored for the user
+    WHEN: Accessing the scrape endpoint with force=true
+    THEN: It should re-fetch and re-parse the recipe without the caches and
+        overwrite it
+    """
+    mock_response = make_http_response(
+        '<html><head><meta name="description" content="Text"></head></html>'
+    )
+    mocker.patch("requests.Session.get", return_value=mock_response)
+    fetch = mocker.spy(PageFetcher, "fetch")
+    mock_parser = Mock()
+    mock_parser.recipe_exists.return_value = True
+    mock_parser.find_recipe.return_value = mock_recipe.model_dump()
+    mock_parser.resolve_base_recipe.return_value = (mock_base_recipe, "llm")
+    mock_parser.save_base_recipe.return_value = mock_recipe
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
+
+    response = client.post(
+        "/scrape",
+        json={
+            "url": "https://example.com/recipe",
+            "user_email": "test@example.com",
+            "force": True,
+        },
+    )
+
+    assert response.status_code == 200
+    mock_parser.recipe_exists.assert_not_called()
+    mock_parser.find_recipe.assert_not_called()
+    assert mock_parser.save_base_recipe.call_args.kwargs["overwrite"] is True
+    # The page and the parse bypass their caches
+    assert fetch.call_args.kwargs["use_cache"] is False
+    assert mock_parser.resolve_base_recipe.call_args.kwargs["use_cache"] is False
 
 
 def test_scrape_recipe_invalid_url(client):
@@ -132,13 +271,39 @@ def test_scrape_recipe_invalid_url(client):
     assert "error" in data
 
 
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"url": "https://example.com/recipe"},
+        {"url": "https://example.com/recipe", "user_email": ""},
+        {"url": "https://example.com/recipe", "user_email": 42},
+        {"user_email": "test@example.com"},
+    ],
+)
+def test_scrape_recipe_missing_fields(client, mocker, body):
+    """
+    GIVEN: A scrape request without a url or user_email string
+    WHEN: Accessing the scrape endpoint
+    THEN: It should return 400 without fetching or storing anything
+    """
+    session_get = mocker.patch("requests.Session.get")
+
+    response = client.post("/scrape", json=body)
+
+    assert response.status_code == 400
+    assert "required" in json.loads(response.data)["error"]
+    session_get.assert_not_called()
+
+
 def test_scrape_recipe_request_error(client, mocker):
     """
     GIVEN: A URL that causes a request error
     WHEN: Accessing the scrape endpoint
     THEN: It should handle the error gracefully
     """
-    mocker.patch("requests.get", side_effect=requests.RequestException("Network error"))
+    mocker.patch(
+        "requests.Session.get", side_effect=requests.RequestException("Network error")
+    )
 
     response = client.post(
         "/scrape",
@@ -150,17 +315,15 @@ def test_scrape_recipe_request_error(client, mocker):
     assert "error" in data
 
 
-def test_scrape_recipe_no_content(client, mocker):
+def test_scrape_recipe_no_content(client, mocker, make_http_response):
     """
     GIVEN: A URL with no recipe content
     WHEN: Accessing the scrape endpoint
     THEN: It should return a 404 error
     """
     # Mock response with no recipe content
-    mock_response = Mock()
-    mock_response.text = "<html><body></body></html>"
-    mock_response.raise_for_status = Mock()
-    mocker.patch("requests.get", return_value=mock_response)
+    mock_response = make_http_response("<html><body></body></html>")
+    mocker.patch("requests.Session.get", return_value=mock_response)
 
     response = client.post(
         "/scrape",
@@ -172,6 +335,231 @@ def test_scrape_recipe_no_content(client, mocker):
     assert "error" in data
 
 
+def test_scrape_async_returns_job(
+    client, mocker, mock_recipe, mock_base_recipe, make_http_response
+):
+    """
+    GIVEN: A scrape request with async=1
+    WHEN: Submitting it and polling the returned job
+    THEN: It should return 202 with a job ID and the job should hold the recipe
+    """
+    mocker.patch(
+        "requests.Session.get",
+        return_value=make_http_response(
+            '<html><head><meta name="description" content="Test recipe"></head></html>'
+        ),
+    )
+    mock_parser = Mock()
+    mock_parser.recipe_exists.return_value = False
+    mock_parser.resolve_base_recipe.return_value = (mock_base_recipe, "llm")
+    mock_parser.save_base_recipe.return_value = mock_recipe
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
+
+    response = client.post(
+        "/scrape?async=1",
+        json={"url": "https://example.com/recipe", "user_email": "test@example.com"},
+    )
+    data = json.loads(response.data)
+
+    assert response.status_code == 202
+    assert response.headers["Location"] == f"/jobs/{data['job_id']}"
+
+    client.application.extensions["recime"]["jobs"].get().wait(data["job_id"], 5)
+    job = json.loads(client.get(f"/jobs/{data['job_id']}").data)
+    assert job["status"] == "succeeded"
+    assert job["result"][0]["name"] == "Test Recipe"
+
+
+def test_scrape_async_queue_full(client, mocker):
+    """
+    GIVEN: A full job queue
+    WHEN: Submitting an async scrape
+    THEN: It should return 429 with Retry-After
+    """
+    queue = Mock()
+    queue.submit.side_effect = QueueFull("full")
+    jobs = client.application.extensions["recime"]["jobs"]
+    mocker.patch.object(jobs, "get", return_value=queue)
+
+    response = client.post(
+        "/scrape",
+        json={
+            "url": "https://example.com/recipe",
+            "user_email": "test@example.com",
+            "async": True,
+        },
+    )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"]
+
+
+def test_scrape_async_rejects_private_callback_url(client):
+    """
+    GIVEN: An async scrape whose callback URL points at the metadata address
+    WHEN: Submitting it
+    THEN: It should return 400 without queueing a job
+    """
+    response = client.post(
+        "/scrape",
+        json={
+            "url": "https://example.com/recipe",
+            "user_email": "test@example.com",
+            "async": True,
+            "callback_url": "http://169.254.169.254/latest/meta-data/",
+        },
+    )
+
+    assert response.status_code == 400
+    assert "callback_url" in json.loads(response.data)["error"]
+    assert client.application.extensions["recime"]["jobs"].get().depth() == 0
+
+
+def test_get_unknown_job(client):
+    """
+    GIVEN: A job ID that doesn't exist
+    WHEN: Polling it
+    THEN: It should return 404
+    """
+    response = client.get("/jobs/missing")
+
+    assert response.status_code == 404
+
+
+def test_concurrent_scrapes_share_one_parse(
+    app, mocker, mock_recipe, mock_base_recipe, make_http_response
+):
+    """
+    GIVEN: Two users scraping the same URL at the same time
+    WHEN: Both requests are in flight together
+    THEN: The page should be fetched and parsed once and stored for each user
+    """
+    mock_get = mocker.patch(
+        "requests.Session.get",
+        return_value=make_http_response(
+            '<html><head><meta name="description" content="Text"></head></html>'
+        ),
+    )
+
+    def slow_resolve(description, structured, use_cache=True):
+        time.sleep(0.3)
+        return mock_base_recipe, "llm"
+
+    mock_parser = Mock()
+    mock_parser.recipe_exists.return_value = False
+    mock_parser.resolve_base_recipe.side_effect = slow_resolve
+    mock_parser.save_base_recipe.return_value = mock_recipe
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
+
+    def scrape(user_email):
+        return app.test_client().post(
+            "/scrape",
+            json={
+                "url": "https://example.com/recipe?utm_source=x",
+                "user_email": user_email,
+            },
+        )
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        responses = list(executor.map(scrape, ["a@example.com", "b@example.com"]))
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert mock_get.call_count == 1
+    assert mock_parser.resolve_base_recipe.call_count == 1
+    saved_for = {call.args[2] for call in mock_parser.save_base_recipe.call_args_list}
+    assert saved_for == {"a@example.com", "b@example.com"}
+
+
+def test_scrape_batch_streams_ndjson(
+    client, mocker, mock_openai_client, make_http_response, tmp_path
+):
+    """
+    GIVEN: A list of recipe URLs
+    WHEN: Posting them to the batch endpoint
+    THEN: It should stream one NDJSON progress event per URL plus start and done
+    """
+    mocker.patch(
+        "requests.Session.get",
+        side_effect=lambda *args, **kwargs: make_http_response(
+            '<html><head><meta name="description" content="Text"></head></html>'
+        ),
+    )
+    mocker.patch(
+        "web_scraper.RecipeParser.from_config",
+        return_value=RecipeParser(
+            storage_type="jsonl",
+            output_file=str(tmp_path / "recipes.jsonl"),
+            client=mock_openai_client,
+        ),
+    )
+    client.application.config["BULK_IMPORT_HOST_DELAY"] = 0
+
+    response = client.post(
+        "/scrape/batch",
+        json={
+            "urls": ["https://example.com/soup", "https://example.com/stew"],
+            "user_email": "test@example.com",
+        },
+    )
+    events = [json.loads(line) for line in response.data.decode().splitlines()]
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert events[0]["event"] == "start"
+    assert {event["status"] for event in events[1:-1]} == {"parsed"}
+    assert events[-1] == {"event": "done", "parsed": 2, "skipped": 0, "failed": 0}
+
+
+def test_scrape_batch_bookmarks_file_as_sse(client, mocker):
+    """
+    GIVEN: A bookmarks export uploaded as a file
+    WHEN: Posting it to the batch endpoint asking for server-sent events
+    THEN: It should stream SSE messages
+    """
+    importer = mocker.patch("web_scraper.BulkImporter")
+    importer.return_value.run.return_value = iter(
+        [{"event": "start", "total": 1, "resumed": 0}]
+    )
+    mocker.patch("web_scraper.RecipeParser.from_config")
+    bookmarks = b'<DL><DT><A HREF="https://example.com/soup">Soup</A></DL>'
+
+    response = client.post(
+        "/scrape/batch?format=sse",
+        data={
+            "user_email": "test@example.com",
+            "file": (io.BytesIO(bookmarks), "bookmarks.html"),
+        },
+        content_type="multipart/form-data",
+    )
+
+    assert response.mimetype == "text/event-stream"
+    assert response.data.decode().startswith("event: start\n")
+    assert importer.return_value.run.call_args.args[0] == ["https://example.com/soup"]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"urls": ["https://example.com/soup"]},
+        {"urls": [], "user_email": "test@example.com"},
+        {
+            "urls": ["https://example.com/soup"],
+            "user_email": "test@example.com",
+            "import_id": "../etc",
+        },
+    ],
+)
+def test_scrape_batch_rejects_bad_requests(client, body):
+    """
+    GIVEN: A batch request without a user, without URLs or with a bad import_id
+    WHEN: Posting it to the batch endpoint
+    THEN: It should return 400
+    """
+    response = client.post("/scrape/batch", json=body)
+
+    assert response.status_code == 400
+
+
 def test_get_all_recipes_success(client, mocker, mock_recipe):
     """
     GIVEN: A DynamoDB table with recipes
@@ -185,7 +573,7 @@ def test_get_all_recipes_success(client, mocker, mock_recipe):
     # Mock the RecipeParser instance
     mock_parser = Mock()
     mock_parser.table = mock_table
-    mocker.patch("web_scraper.RecipeParser", return_value=mock_parser)
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
 
     response = client.get("/recipes")
     data = json.loads(response.data)
@@ -210,7 +598,7 @@ def test_get_all_recipes_pagination(client, mocker, mock_recipe):
     # Mock the RecipeParser instance
     mock_parser = Mock()
     mock_parser.table = mock_table
-    mocker.patch("web_scraper.RecipeParser", return_value=mock_parser)
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
 
     response = client.get("/recipes")
     data = json.loads(response.data)
@@ -221,6 +609,273 @@ def test_get_all_recipes_pagination(client, mocker, mock_recipe):
     assert data[1]["name"] == "Test Recipe"
 
 
+def test_get_recipes_page_with_cursor(client, mocker, mock_recipe):
+    """
+    GIVEN: A DynamoDB table with more recipes than the requested limit
+    WHEN: Requesting a page of summaries
+    THEN: It should return one page of projected items and a next cursor
+    """
+    mock_table = Mock()
+    mock_table.scan.return_value = {
+        "Items": [{"id": "test-id", "name": "Test Recipe"}],
+        "LastEvaluatedKey": {"id": "test-id"},
+    }
+    mock_parser = Mock()
+    mock_parser.table = mock_table
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
+
+    response = client.get("/recipes?limit=1&fields=summary")
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data["items"] == [{"id": "test-id", "name": "Test Recipe"}]
+    assert data["next_cursor"]
+    scan_kwargs = mock_table.scan.call_args.kwargs
+    assert scan_kwargs["Limit"] == 1
+    assert "ProjectionExpression" in scan_kwargs
+
+    client.get(f"/recipes?limit=500&cursor={data['next_cursor']}")
+    scan_kwargs = mock_table.scan.call_args.kwargs
+    assert scan_kwargs["ExclusiveStartKey"] == {"id": "test-id"}
+    assert scan_kwargs["Limit"] == 100
+
+
+def test_get_recipes_by_user_uses_index(client, mocker, mock_recipe):
+    """
+    GIVEN: A user_email query parameter
+    WHEN: Accessing the recipes endpoint
+    THEN: It should query the user_email index instead of scanning
+    """
+    mock_table = Mock()
+    mock_table.query.return_value = {"Items": [mock_recipe.model_dump()]}
+    mock_parser = Mock()
+    mock_parser.table = mock_table
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
+
+    response = client.get("/recipes?user_email=test@example.com")
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert len(data) == 1
+    assert mock_table.query.call_args.kwargs["IndexName"] == "user_email-index"
+    mock_table.scan.assert_not_called()
+
+
+@pytest.mark.parametrize("query", ["limit=abc", "limit=10&cursor=garbage"])
+def test_get_recipes_rejects_bad_parameters(client, mocker, query):
+    """
+    GIVEN: A malformed limit or cursor
+    WHEN: Accessing the recipes endpoint
+    THEN: It should return 400
+    """
+    mock_parser = Mock()
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
+
+    response = client.get(f"/recipes?{query}")
+
+    assert response.status_code == 400
+    assert "error" in json.loads(response.data)
+
+
+def test_get_recipes_filtered_by_nutrition(app, client, mocker):
+    """
+    GIVEN: Recipes in the nutrition index
+    WHEN: Filtering by calories, sorting by protein and paging
+    THEN: It should read the matching recipes by ID in sort order
+    """
+    stored = {
+        recipe_id: {
+            "id": recipe_id,
+            "user_email": "a@example.com",
+            "calories": calories,
+            "protein": {"amount": protein, "unit": "g"},
+        }
+        for recipe_id, calories, protein in [
+            ("light", 300, 10),
+            ("lean", 400, 35),
+            ("heavy", 900, 50),
+        ]
+    }
+    app.extensions["recime"]["nutrition"].get().add(stored.values())
+    mock_table = Mock()
+    mock_table.name = "recipes"
+    mock_table.meta.client.batch_get_item.side_effect = lambda RequestItems: {
+        "Responses": {
+            "recipes": [stored[key["id"]] for key in RequestItems["recipes"]["Keys"]]
+        }
+    }
+    mocker.patch(
+        "web_scraper.RecipeParser.from_config", return_value=Mock(table=mock_table)
+    )
+
+    response = client.get(
+        "/recipes?max_calories_per_serving=500&sort=-protein_g&limit=1"
+    )
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert [item["id"] for item in data["items"]] == ["lean"]
+    data = json.loads(
+        client.get(
+            "/recipes?max_calories_per_serving=500&sort=-protein_g"
+            f"&limit=1&cursor={data['next_cursor']}"
+        ).data
+    )
+    assert [item["id"] for item in data["items"]] == ["light"]
+    assert data["next_cursor"] is None
+    mock_table.scan.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "query", ["max_calories_per_serving=lots", "sort=flavor", "sort=-"]
+)
+def test_get_recipes_rejects_bad_nutrition_parameters(client, mocker, query):
+    """
+    GIVEN: A non-numeric nutrition filter or an unknown sort column
+    WHEN: Accessing the recipes endpoint
+    THEN: It should return 400
+    """
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=Mock())
+
+    response = client.get(f"/recipes?{query}")
+
+    assert response.status_code == 400
+    assert "error" in json.loads(response.data)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, gzipped",
+    [(None, False), ("gzip", True), ("gzip;q=0, identity", False)],
+)
+def test_get_recipes_ndjson_stream(
+    client, mocker, mock_recipe, accept_encoding, gzipped
+):
+    """
+    GIVEN: A DynamoDB table whose scan returns two pages
+    WHEN: Requesting recipes as NDJSON, accepting gzip or not
+    THEN: It should stream one line per recipe across both pages
+    """
+    mock_table = Mock()
+    mock_table.scan.side_effect = [
+        {"Items": [mock_recipe.model_dump()], "LastEvaluatedKey": {"id": "a"}},
+        {"Items": [mock_recipe.model_dump()]},
+    ]
+    mock_parser = Mock()
+    mock_parser.table = mock_table
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
+
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+    response = client.get("/recipes?format=ndjson", headers=headers)
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "application/x-ndjson"
+    body = response.data
+    if gzipped:
+        assert response.headers["Content-Encoding"] == "gzip"
+        body = gzip.decompress(body)
+    else:
+        assert "Content-Encoding" not in response.headers
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+    assert [line["name"] for line in lines] == ["Test Recipe", "Test Recipe"]
+
+
+def test_get_recipes_json_stream(client, mocker, mock_recipe):
+    """
+    GIVEN: A DynamoDB table with recipes
+    WHEN: Requesting a streamed JSON array
+    THEN: The body should be the same array the default mode returns
+    """
+    mock_table = Mock()
+    mock_table.scan.return_value = {"Items": [mock_recipe.model_dump()]}
+    mock_parser = Mock()
+    mock_parser.table = mock_table
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
+
+    streamed = client.get("/recipes?format=json-stream")
+    buffered = client.get("/recipes")
+
+    assert streamed.is_streamed
+    assert json.loads(streamed.data) == json.loads(buffered.data)
+
+
+def test_get_recipes_stream_error_before_first_page(client, mocker):
+    """
+    GIVEN: A DynamoDB table whose first scan fails
+    WHEN: Requesting an NDJSON stream
+    THEN: It should return 500 instead of an empty stream
+    """
+    mock_parser = Mock()
+    mock_parser.table.scan.side_effect = Exception("DynamoDB error")
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
+
+    response = client.get("/recipes?format=ndjson")
+
+    assert response.status_code == 500
+
+
+def test_get_recipe_scaled_to_servings(client, mocker):
+    """
+    GIVEN: A stored recipe for 4 servings
+    WHEN: Requesting it for 2 servings
+    THEN: Its ingredient amounts should be halved
+    """
+    mock_table = Mock()
+    mock_table.get_item.return_value = {
+        "Item": {
+            "id": "test-id",
+            "servings": Decimal("4"),
+            "ingredients": [
+                {"name": "flour", "quantity": Decimal("3"), "unit": "cups"}
+            ],
+            "normalized_ingredients": [
+                {"quantity": Decimal("3"), "quantity_max": None, "unit": "cup"}
+            ],
+        }
+    }
+    mocker.patch(
+        "web_scraper.RecipeParser.from_config", return_value=Mock(table=mock_table)
+    )
+
+    data = json.loads(client.get("/recipes/test-id").data)
+    assert data["servings"] == "4"
+
+    response = client.get("/recipes/test-id?servings=2")
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data["servings"] == 2
+    assert data["ingredients"] == [{"name": "flour", "quantity": "1.5", "unit": "cups"}]
+    mock_table.get_item.assert_called_with(Key={"id": "test-id"})
+
+
+@pytest.mark.parametrize(
+    "query, item, status",
+    [
+        ("?servings=0", {}, 400),
+        ("?servings=two", {}, 400),
+        ("", None, 404),
+        ("?servings=2", {"id": "test-id", "servings": 0, "ingredients": []}, 422),
+    ],
+)
+def test_get_recipe_errors(client, mocker, query, item, status):
+    """
+    GIVEN: Invalid servings, a missing recipe or one without a servings count
+    WHEN: Requesting the recipe
+    THEN: It should return the matching error status
+    """
+    mock_table = Mock()
+    mock_table.get_item.return_value = {"Item": item} if item is not None else {}
+    mocker.patch(
+        "web_scraper.RecipeParser.from_config", return_value=Mock(table=mock_table)
+    )
+
+    response = client.get(f"/recipes/test-id{query}")
+
+    assert response.status_code == status
+    assert "error" in json.loads(response.data)
+
+
 def test_delete_recipe_success(client, mocker):
     """
     GIVEN: A valid recipe ID
@@ -233,7 +888,7 @@ def test_delete_recipe_success(client, mocker):
     # Mock the RecipeParser instance
     mock_parser = Mock()
     mock_parser.table = mock_table
-    mocker.patch("web_scraper.RecipeParser", return_value=mock_parser)
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
 
     response = client.delete("/recipes/test-id")
     data = json.loads(response.data)
@@ -254,10 +909,187 @@ def test_delete_recipe_error(client, mocker):
     # Mock the RecipeParser instance
     mock_parser = Mock()
     mock_parser.table = mock_table
-    mocker.patch("web_scraper.RecipeParser", return_value=mock_parser)
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=mock_parser)
 
     response = client.delete("/recipes/test-id")
     data = json.loads(response.data)
 
     assert response.status_code == 500
     assert "error" in data
+
+
+def test_search_recipes(app, client):
+    """
+    GIVEN: Recipes in the search index for two users
+    WHEN: Searching as one user with a partly typed term
+    THEN: It should return that user's matching recipe summaries
+    """
+    app.extensions["recime"]["search"].get().add(
+        [
+            {"id": "r1", "name": "Lemon Tart", "user_email": "a@example.com"},
+            {"id": "r2", "name": "Lemon Cake", "user_email": "b@example.com"},
+        ]
+    )
+
+    response = client.get("/recipes/search?q=lem&user_email=a@example.com")
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert [item["id"] for item in data["items"]] == ["r1"]
+    assert data["items"][0]["name"] == "Lemon Tart"
+
+
+@pytest.mark.parametrize("query", ["", "?q=%20", "?q=tart&limit=many"])
+def test_search_recipes_rejects_bad_parameters(client, query):
+    """
+    GIVEN: A search request without terms or with an invalid limit
+    WHEN: Accessing the search endpoint
+    THEN: It should return 400
+    """
+    response = client.get(f"/recipes/search{query}")
+
+    assert response.status_code == 400
+
+
+def test_delete_recipe_removes_it_from_search(app, client, mocker):
+    """
+    GIVEN: An indexed recipe
+    WHEN: Deleting it
+    THEN: It should no longer be found by search
+    """
+    mocker.patch("web_scraper.RecipeParser.from_config", return_value=Mock())
+    app.extensions["recime"]["search"].get().add(
+        [{"id": "test-id", "name": "Lemon Tart", "user_email": "a@example.com"}]
+    )
+
+    assert client.delete("/recipes/test-id").status_code == 200
+
+    data = json.loads(client.get("/recipes/search?q=lemon").data)
+    assert data["items"] == []
+
+
+def test_cookable_recipes(app, client):
+    """
+    GIVEN: Indexed recipes
+    WHEN: Asking what can be cooked with comma-separated and repeated ingredients
+    THEN: It should rank the recipes by coverage
+    """
+    app.extensions["recime"]["ingredients"].get().add(
+        [
+            {
+                "id": "r1",
+                "name": "Pancakes",
+                "user_email": "a@example.com",
+                "ingredients": [{"name": "flour"}, {"name": "eggs"}, {"name": "milk"}],
+            },
+            {
+                "id": "r2",
+                "name": "Omelette",
+                "user_email": "a@example.com",
+                "ingredients": [{"name": "eggs"}, {"name": "butter"}],
+            },
+        ]
+    )
+
+    response = client.get("/recipes/cookable?ingredients=eggs,butter&ingredients=milk")
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert [item["id"] for item in data["items"]] == ["r2", "r1"]
+    assert data["items"][1]["missing"] == ["flour"]
+
+
+@pytest.mark.parametrize(
+    "query", ["", "?ingredients=,", "?ingredients=egg&max_missing=some"]
+)
+def test_cookable_recipes_rejects_bad_parameters(client, query):
+    """
+    GIVEN: A request without ingredients or with an invalid max_missing
+    WHEN: Accessing the cookable endpoint
+    THEN: It should return 400
+    """
+    assert client.get(f"/recipes/cookable{query}").status_code == 400
+
+
+def test_cache_stats(client):
+    """
+    GIVEN: A Flask application with the LLM cache enabled
+    WHEN: Accessing the cache stats endpoint
+    THEN: It should return the hit/miss counters
+    """
+    response = client.get("/cache/stats")
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data["llm"]["hits"] == 0
+    assert data["llm"]["misses"] == 0
+
+
+def test_parser_reused_across_requests(client, mocker):
+    """
+    GIVEN: A Flask application
+    WHEN: Several requests that need storage are made
+    THEN: Only one RecipeParser should be created for the process
+    """
+    mock_parser = Mock()
+    mock_parser.table.scan.return_value = {"Items": []}
+    from_config = mocker.patch(
+        "web_scraper.RecipeParser.from_config", return_value=mock_parser
+    )
+
+    client.get("/recipes")
+    client.get("/recipes")
+    client.delete("/recipes/test-id")
+
+    assert from_config.call_count == 1
+
+
+def test_scrape_recipe_json_ld_fast_path(
+    client, mocker, mock_openai_client, make_http_response, tmp_path
+):
+    """
+    GIVEN: A page with a complete JSON-LD Recipe
+    WHEN: Accessing the scrape endpoint
+    THEN: It should return the recipe without calling OpenAI
+    """
+    recipe_json_ld = {
+        "@type": "Recipe",
+        "name": "Tomato Soup",
+        "image": "https://example.com/soup.jpg",
+        "recipeYield": "4",
+        "recipeIngredient": ["2 cups stock"],
+        "recipeInstructions": "Simmer.\nBlend.",
+        "nutrition": {
+            "calories": "150 kcal",
+            "fatContent": "4 g",
+            "carbohydrateContent": "20 g",
+            "proteinContent": "3 g",
+        },
+    }
+    page = (
+        '<html><head><script type="application/ld+json">'
+        + json.dumps(recipe_json_ld)
+        + "</script></head><body></body></html>"
+    )
+    mocker.patch("requests.Session.get", return_value=make_http_response(page))
+    mocker.patch(
+        "web_scraper.RecipeParser.from_config",
+        return_value=RecipeParser(
+            storage_type="file",
+            output_file=str(tmp_path / "recipes.json"),
+            client=mock_openai_client,
+        ),
+    )
+
+    response = client.post(
+        "/scrape",
+        json={"url": "https://example.com/soup", "user_email": "test@example.com"},
+    )
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data[0]["name"] == "Tomato Soup"
+    assert data[0]["parse_method"] == "json-ld"
+    assert data[0]["image_url"] == "https://example.com/soup.jpg"
+    assert data[0]["instructions"] == ["Simmer.", "Blend."]
+    mock_openai_client.beta.chat.completions.parse.assert_not_called()
@@ -1,14 +1,40 @@
+import itertools
+import json
 import logging
 import os
+import re
 import time
-import urllib.parse
 
-import requests
-from bs4 import BeautifulSoup
-from flask import Flask, jsonify, request
+import boto3
+from flask import Flask, Response, g, jsonify, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 
+from bulk_import import BulkImporter, Checkpoint, format_sse, read_urls
+from clients import ProcessLocal
 from config import config
+from dynamodb_store import (
+    SUMMARY_FIELDS,
+    decode_cursor,
+    encode_cursor,
+    iter_recipes,
+    iter_recipes_by_id,
+    query_recipes,
+)
+from fetcher import FetchError, PageFetcher
+from html_extractor import extract_recipe_content
+from ingredient_index import IngredientIndex
+from ingredient_units import scale_recipe
+from jobs import JobQueue, QueueFull
+from llm_cache import LLMCache
+from metrics import BYTES_BUCKETS, Metrics, counter, server_timing, start_timing
+from models import ParsedPage, to_json
+from nutrition_index import SORT_KEYS, NutritionIndex, parse_filters
+from rate_limiter import RateLimiter
 from recipe_parser import RecipeParser
+from search_index import SearchIndex
+from singleflight import SingleFlight, normalize_url
+from streaming import buffered, gzip_chunks, json_array_chunks, ndjson_lines
+from structured_data import extract_structured_recipe
 
 # Configure logging
 logging.basicConfig(
@@ -17,95 +43,573 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class ScrapeError(Exception):
+    """A scrape that failed for a reason the client should see."""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Serializes responses with pydantic-core, so models need no model_dump first."""
+
+    def dumps(self, obj, **kwargs):
+        # Keys keep their order (e.g. a Recipe's field order) instead of sorting
+        return to_json(obj, indent=kwargs.get("indent"))
+
+
 def create_app(config_name="default"):
     app = Flask(__name__)
+    app.json = JSONProvider(app)
 
     # Load configuration
     app.config.from_object(config[config_name])
 
-    def fetch_webpage(url):
-        try:
-            # Send a GET request to the URL with timeout
-            response = requests.get(
-                url,
-                timeout=app.config["REQUEST_TIMEOUT"],
+    # Shared by every OpenAI request this app makes
+    llm_cache = LLMCache.from_config(app.config)
+    rate_limiter = RateLimiter.from_config(
+        app.config, processes=app.config["OPENAI_RATE_LIMIT_PROCESSES"]
+    )
+
+    # Clients are created once per process on first use instead of per request,
+    # so connection pools, TLS sessions and credentials are reused
+    fetcher = ProcessLocal(lambda: PageFetcher.from_config(app.config))
+    dynamodb = ProcessLocal(
+        lambda: boto3.resource("dynamodb", region_name=app.config["AWS_REGION"])
+    )
+    search = ProcessLocal(lambda: SearchIndex(app.config["SEARCH_INDEX_PATH"]))
+    ingredients = ProcessLocal(
+        lambda: IngredientIndex(app.config["INGREDIENT_INDEX_PATH"])
+    )
+    nutrition = ProcessLocal(lambda: NutritionIndex(app.config["NUTRITION_INDEX_PATH"]))
+
+    def create_metrics():
+        metrics = Metrics(
+            app.config["METRICS_DB_PATH"], app.config["METRICS_FLUSH_INTERVAL"]
+        )
+        metrics.add_collector(collect_cache_metrics)
+        return metrics
+
+    def collect_cache_metrics():
+        http = fetcher.get().stats()
+        flights = flight.get().stats()
+        samples = {
+            **counter(
+                "recime_http_cache_events_total", http["cache_hits"], event="hit"
+            ),
+            **counter(
+                "recime_http_cache_events_total",
+                http["revalidated"],
+                event="revalidated",
+            ),
+            **counter(
+                "recime_http_cache_events_total", http["cache_misses"], event="miss"
+            ),
+            **counter(
+                "recime_http_cache_bytes_total",
+                http["bytes_downloaded"],
+                kind="downloaded",
+            ),
+            **counter(
+                "recime_http_cache_bytes_total", http["bytes_saved"], kind="saved"
+            ),
+            **counter(
+                "recime_singleflight_calls_total", flights["calls"], result="call"
+            ),
+            **counter(
+                "recime_singleflight_calls_total", flights["shared"], result="shared"
+            ),
+        }
+        if llm_cache is not None:
+            llm = llm_cache.stats()
+            samples.update(
+                counter("recime_llm_cache_lookups_total", llm["hits"], result="hit")
+            )
+            samples.update(
+                counter("recime_llm_cache_lookups_total", llm["misses"], result="miss")
             )
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
-            return soup
-        except requests.RequestException as e:
+        return samples
+
+    metrics = ProcessLocal(create_metrics)
+    # The parser owns the OpenAI client, which it creates on first use
+    parser = ProcessLocal(
+        lambda: RecipeParser.from_config(
+            app.config,
+            storage_type="dynamodb",
+            cache=llm_cache,
+            rate_limiter=rate_limiter,
+            dynamodb=dynamodb.get(),
+            indexes=[search.get(), ingredients.get(), nutrition.get()],
+            metrics=metrics.get(),
+        )
+    )
+    flight = ProcessLocal(
+        lambda: SingleFlight(
+            lock_dir=app.config["SINGLEFLIGHT_DIR"],
+            encode=ParsedPage.model_dump_json,
+            decode=ParsedPage.model_validate_json,
+        )
+    )
+    app.extensions["recime"] = {
+        "fetcher": fetcher,
+        "dynamodb": dynamodb,
+        "parser": parser,
+        "search": search,
+        "ingredients": ingredients,
+        "nutrition": nutrition,
+        "flight": flight,
+        "metrics": metrics,
+    }
+
+    @app.before_request
+    def start_request_timing():
+        g.request_start = time.perf_counter()
+        g.timings = start_timing()
+
+    @app.after_request
+    def record_request_timing(response):
+        if "request_start" not in g:
+            return response
+        seconds = time.perf_counter() - g.request_start
+        metrics.get().observe(
+            "recime_http_request_duration_seconds",
+            seconds,
+            method=request.method,
+            endpoint=request.url_rule.rule if request.url_rule else "unmatched",
+            status=str(response.status_code),
+        )
+        # Stage timings show in the browser's network panel and in curl -v
+        response.headers["Server-Timing"] = server_timing(g.timings, seconds)
+        return response
+
+    def fetch_webpage(url, use_cache=True):
+        try:
+            with metrics.get().stage("fetch"):
+                html = fetcher.get().fetch(url, use_cache=use_cache)
+        except FetchError as e:
             logger.error(f"Error fetching {url}: {str(e)}")
             return None
+        if html:
+            metrics.get().observe(
+                "recime_stage_bytes", len(html.encode()), BYTES_BUCKETS, stage="fetch"
+            )
+        return html
 
-    def extract_recipe_content(soup):
+    def scrape(url, user_email, force=False):
+        """
+        Fetch, parse and store the recipe at url for user_email.
+
+        Args:
+            url: URL of the recipe page
+            user_email: Email of the user who owns the recipe
+            force: Re-fetch and re-parse the recipe, bypassing the page and
+                LLM caches, even if it is already stored
+
+        Returns:
+            list: The stored recipe as a one-item list (the new Recipe, or the
+                stored item if the recipe already existed)
+
+        Raises:
+            ScrapeError: If the recipe couldn't be scraped
+        """
+        recipe_parser = parser.get()
+        if not force:
+            # Most scrapes are of new recipes, so the lookup reads only the ID
+            # and the whole item is read only when it's returned
+            existing_recipe = None
+            with metrics.get().stage("lookup"):
+                if recipe_parser.recipe_exists(url, user_email):
+                    existing_recipe = recipe_parser.find_recipe(url, user_email)
+            if existing_recipe:
+                logger.info(f"Recipe from {url} already exists, skipping scrape")
+                metrics.get().inc("recime_scrapes_total", outcome="existing")
+                return [existing_recipe]
+
+        # Concurrent scrapes of the same page share one fetch and parse; each
+        # caller then stores its own copy of the recipe. Forced scrapes don't
+        # share with unforced ones, which may be served from the caches
+        key = normalize_url(url) + ("#force" if force else "")
         try:
-            main_content = (
-                soup.find("meta", attrs={"name": "description"}).get("content")
-                or soup.find("article")
-                or soup.find("main")
-                or soup.find("div", class_="content")
+            page = flight.get().do(key, lambda: fetch_and_parse(url, force))
+        except Exception:
+            metrics.get().inc("recime_scrapes_total", outcome="failed")
+            raise
+        with metrics.get().stage("store"):
+            recipe = recipe_parser.save_base_recipe(
+                page.recipe,
+                url,
+                user_email,
+                page.image_url,
+                page.parse_method,
+                overwrite=force,
             )
+        metrics.get().inc("recime_scrapes_total", outcome="parsed")
+        return [recipe]
+
+    def fetch_and_parse(url, force=False):
+        html = fetch_webpage(url, use_cache=not force)
+        if not html:
+            raise ScrapeError("Failed to fetch webpage", 400)
 
-            # Extract and decode image URL from og:image meta tag
-            image_url = None
-            og_image = soup.find("meta", property="og:image")
-            if og_image and og_image.get("content"):
-                image_url = urllib.parse.unquote(og_image["content"])
+        with metrics.get().stage("extract"):
+            recipe_content, image_url = extract_recipe_content(html)
+        with metrics.get().stage("structured_data"):
+            structured = extract_structured_recipe(html)
+        if recipe_content:
+            metrics.get().observe(
+                "recime_stage_bytes",
+                len(recipe_content.encode()),
+                BYTES_BUCKETS,
+                stage="extract",
+            )
+        if not recipe_content and not structured:
+            raise ScrapeError("No recipe content found", 404)
+        if structured:
+            image_url = image_url or structured.image_url
+            logger.info(
+                f"Found {structured.source} recipe data for {url}, "
+                f"missing fields: {structured.missing_fields()}"
+            )
 
-            return main_content, image_url
+        try:
+            # Includes the LLM cache lookup; the OpenAI call itself is "llm"
+            with metrics.get().stage("parse"):
+                base_recipe, parse_method = parser.get().resolve_base_recipe(
+                    recipe_content, structured, use_cache=not force
+                )
         except Exception as e:
-            logger.error(f"Error extracting recipe content: {str(e)}")
-            return None, None
+            logger.error(f"Error parsing recipe from {url}: {str(e)}")
+            raise ScrapeError("Failed to parse recipe content", 400) from e
+        return ParsedPage(
+            recipe=base_recipe, image_url=image_url, parse_method=parse_method
+        )
+
+    # Background scrapes submitted with POST /scrape?async=1
+    jobs = ProcessLocal(
+        lambda: JobQueue.from_config(
+            lambda payload: scrape(
+                payload["url"], payload["user_email"], payload["force"]
+            ),
+            app.config,
+        )
+    )
+    app.extensions["recime"]["jobs"] = jobs
+
+    def flag(data, name):
+        return str(data.get(name, request.args.get(name, ""))).lower() in (
+            "1",
+            "true",
+        )
+
+    def is_text(value):
+        return isinstance(value, str) and bool(value.strip())
 
     @app.route("/scrape", methods=["POST"])
     def scrape_recipe():
         data = request.json
         url = data.get("url")
         user_email = data.get("user_email")
-        logger.info(f"Scraping recipe from {url} for user {user_email}")
-        try:
-            soup = fetch_webpage(url)
-            if not soup:
-                return jsonify({"error": "Failed to fetch webpage"}), 400
+        # force=true re-parses a recipe even if it is already stored
+        force = flag(data, "force")
 
-            recipe_content, image_url = extract_recipe_content(soup)
-            if not recipe_content:
-                return jsonify({"error": "No recipe content found"}), 404
+        # Recipes are built without validating these again, so check them here
+        if not is_text(url) or not is_text(user_email):
+            return jsonify({"error": "url and user_email are required"}), 400
 
-            parser = RecipeParser(storage_type="dynamodb")
-            recipes = parser.parse_recipes(
-                [recipe_content], [url], [user_email], [image_url]
+        if flag(data, "async"):
+            try:
+                # Jobs are shared per user: a job's result is that user's own
+                # stored recipe, whose ID comes from the URL as given. Work for
+                # the same page across users is shared by the single-flight
+                # group in scrape(), keyed on the normalized URL
+                job = jobs.get().submit(
+                    {"url": url, "user_email": user_email, "force": force},
+                    key=json.dumps([url, user_email, force]),
+                    callback_url=data.get("callback_url"),
+                )
+            except QueueFull as e:
+                logger.warning(f"Rejecting scrape of {url}: {str(e)}")
+                response = jsonify({"error": "Too many queued scrapes, retry later"})
+                response.headers["Retry-After"] = "30"
+                return response, 429
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            logger.info(
+                f"Queued scrape of {url} for user {user_email} as job {job['id']}"
             )
+            response = jsonify({"job_id": job["id"], "status": job["status"]})
+            response.headers["Location"] = f"/jobs/{job['id']}"
+            return response, 202
 
-            if not recipes:
-                return jsonify({"error": "Failed to parse recipe content"}), 400
-
-            recipes_list = [recipe.model_dump() for recipe in recipes]
-            return jsonify(recipes_list)
+        logger.info(f"Scraping recipe from {url} for user {user_email}")
+        try:
+            return jsonify(scrape(url, user_email, force))
+        except ScrapeError as e:
+            return jsonify({"error": str(e)}), e.status_code
         except Exception as e:
             logger.error(f"Error processing recipe from {url}: {str(e)}")
             return jsonify({"error": "Internal server error"}), 500
 
+    @app.route("/scrape/batch", methods=["POST"])
+    def scrape_batch():
+        """Import many URLs, streaming progress as NDJSON (or SSE with format=sse)."""
+        if "file" in request.files:
+            data = request.form
+            urls = read_urls(request.files["file"].read().decode("utf-8", "replace"))
+        else:
+            data = request.get_json(silent=True) or {}
+            urls = data.get("urls") or []
+            if isinstance(urls, str):
+                urls = read_urls(urls)
+            else:
+                urls = read_urls("\n".join(str(url) for url in urls))
+        user_email = data.get("user_email")
+        force = flag(data, "force")
+        import_id = data.get("import_id")
+
+        if not is_text(user_email):
+            return jsonify({"error": "user_email is required"}), 400
+        if not urls:
+            return jsonify({"error": "No URLs found"}), 400
+        if len(urls) > app.config["BULK_IMPORT_MAX_URLS"]:
+            return (
+                jsonify(
+                    {
+                        "error": f"At most {app.config['BULK_IMPORT_MAX_URLS']} "
+                        "URLs per import"
+                    }
+                ),
+                413,
+            )
+        checkpoint = None
+        if import_id:
+            # Re-posting the same import_id resumes where the last run stopped
+            if not re.fullmatch(r"[A-Za-z0-9_-]{1,64}", str(import_id)):
+                return jsonify({"error": "Invalid import_id"}), 400
+            checkpoint = Checkpoint(
+                os.path.join(
+                    app.config["BULK_IMPORT_CHECKPOINT_DIR"], f"{import_id}.jsonl"
+                )
+            )
+
+        importer = BulkImporter(
+            fetcher.get(),
+            parser.get(),
+            fetch_workers=app.config["BULK_IMPORT_FETCH_WORKERS"],
+            host_delay=app.config["BULK_IMPORT_HOST_DELAY"],
+        )
+        logger.info(f"Importing {len(urls)} URLs for user {user_email}")
+        events = importer.run(urls, user_email, force, checkpoint)
+
+        if request.args.get("format") == "sse" or "text/event-stream" in (
+            request.headers.get("Accept", "")
+        ):
+            body = (format_sse(event) for event in events)
+            mimetype = "text/event-stream"
+        else:
+            body = ndjson_lines(events)
+            mimetype = "application/x-ndjson"
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        # Ask nginx not to buffer, so progress reaches the client as it happens
+        response.headers["X-Accel-Buffering"] = "no"
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    @app.route("/jobs/<job_id>", methods=["GET"])
+    def get_job(job_id):
+        job = jobs.get().get(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job), 200
+
+    def stream_recipes(recipes, output_format):
+        """
+        Stream recipes while scan pages arrive, as NDJSON or as one JSON array.
+
+        The response is gzipped when the client accepts it. The first page is
+        read before responding, so errors reading it still get a 500.
+        """
+        recipes = iter(recipes)
+        first = next(recipes, None)
+        recipes = itertools.chain([first] if first is not None else [], recipes)
+
+        def logged(items):
+            try:
+                yield from items
+            except Exception as e:
+                # Headers are already sent; the client sees a truncated body
+                logger.error(f"Error streaming recipes: {str(e)}")
+
+        if output_format == "ndjson":
+            pieces = ndjson_lines(logged(recipes))
+            mimetype = "application/x-ndjson"
+        else:
+            pieces = json_array_chunks(logged(recipes))
+            mimetype = "application/json"
+
+        gzip = request.accept_encodings["gzip"] > 0
+        body = gzip_chunks(pieces) if gzip else buffered(pieces)
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        if gzip:
+            response.headers["Content-Encoding"] = "gzip"
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
+    def filtered_recipes(
+        table, filters, sort, user_email, cursor, limit, fields, output_format
+    ):
+        """
+        List recipes matching nutrition filters, in sort order.
+
+        Matching IDs come from the nutrition index; the recipes are then read
+        by ID. Pages are addressed by offset, kept in the cursor.
+        """
+        offset = decode_cursor(cursor).get("offset", 0) if cursor else 0
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        ids, total = nutrition.get().query(
+            filters,
+            user_email=user_email,
+            sort=sort,
+            offset=offset,
+            limit=None if output_format in ("ndjson", "json-stream") else limit,
+        )
+        recipes = iter_recipes_by_id(table, ids, fields)
+        if output_format in ("ndjson", "json-stream"):
+            return stream_recipes(recipes, output_format)
+        if limit is None:
+            return jsonify(list(recipes))
+        end = offset + len(ids)
+        return jsonify(
+            {
+                "items": list(recipes),
+                "next_cursor": (
+                    encode_cursor({"offset": end}) if end < total else None
+                ),
+            }
+        )
+
     @app.route("/recipes", methods=["GET"])
     def get_all_recipes():
+        user_email = request.args.get("user_email")
+        cursor = request.args.get("cursor")
+        fields = SUMMARY_FIELDS if request.args.get("fields") == "summary" else None
+        max_limit = app.config["RECIPES_PAGE_MAX_LIMIT"]
+        limit = None
+        if "limit" in request.args:
+            try:
+                limit = max(1, min(int(request.args["limit"]), max_limit))
+            except ValueError:
+                return jsonify({"error": "Invalid limit"}), 400
+        elif cursor:
+            limit = max_limit
+        try:
+            filters = parse_filters(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        sort = request.args.get("sort")
+        if sort is not None and sort.lstrip("-") not in SORT_KEYS:
+            return jsonify({"error": f"Invalid sort: {sort}"}), 400
+
         try:
-            parser = RecipeParser(storage_type="dynamodb")
-            # Scan the DynamoDB table to get all recipes
-            response = parser.table.scan()
-            recipes = response.get("Items", [])
-
-            # Handle pagination if there are more items
-            while "LastEvaluatedKey" in response:
-                response = parser.table.scan(
-                    ExclusiveStartKey=response["LastEvaluatedKey"]
+            table = parser.get().table
+            output_format = request.args.get("format")
+            if filters or sort:
+                return filtered_recipes(
+                    table,
+                    filters,
+                    sort or "-created_at",
+                    user_email,
+                    cursor,
+                    limit,
+                    fields,
+                    output_format,
                 )
-                recipes.extend(response.get("Items", []))
+            if output_format in ("ndjson", "json-stream"):
+                return stream_recipes(
+                    iter_recipes(table, user_email, fields), output_format
+                )
+            # Without limit or cursor, keep returning the whole list as an array
+            if limit is None:
+                return jsonify(list(iter_recipes(table, user_email, fields)))
 
-            return jsonify(recipes)
+            recipes, next_cursor = query_recipes(
+                table, user_email, limit=limit, cursor=cursor, fields=fields
+            )
+            return jsonify({"items": recipes, "next_cursor": next_cursor})
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
         except Exception as e:
             logger.error(f"Error fetching recipes: {str(e)}")
             return jsonify({"error": "Failed to fetch recipes"}), 500
 
+    @app.route("/recipes/search", methods=["GET"])
+    def search_recipes():
+        """Rank recipes matching every term of q; the last term matches as a prefix."""
+        text = request.args.get("q", "")
+        if not text.strip():
+            return jsonify({"error": "q is required"}), 400
+        try:
+            limit = max(
+                1,
+                min(
+                    int(request.args.get("limit", app.config["SEARCH_DEFAULT_LIMIT"])),
+                    app.config["RECIPES_PAGE_MAX_LIMIT"],
+                ),
+            )
+        except ValueError:
+            return jsonify({"error": "Invalid limit"}), 400
+
+        try:
+            results = search.get().search(
+                text,
+                user_email=request.args.get("user_email"),
+                limit=limit,
+                prefix=request.args.get("prefix", "true").lower() not in ("0", "false"),
+            )
+            return jsonify({"items": results})
+        except Exception as e:
+            logger.error(f"Error searching recipes for {text!r}: {str(e)}")
+            return jsonify({"error": "Failed to search recipes"}), 500
+
+    @app.route("/recipes/cookable", methods=["GET"])
+    def cookable_recipes():
+        """Rank recipes by how many of their ingredients are on hand."""
+        on_hand = [
+            name.strip()
+            for value in request.args.getlist("ingredients")
+            for name in value.split(",")
+            if name.strip()
+        ]
+        if not on_hand:
+            return jsonify({"error": "ingredients is required"}), 400
+        try:
+            limit = max(
+                1,
+                min(
+                    int(request.args.get("limit", app.config["SEARCH_DEFAULT_LIMIT"])),
+                    app.config["RECIPES_PAGE_MAX_LIMIT"],
+                ),
+            )
+            max_missing = request.args.get("max_missing")
+            max_missing = int(max_missing) if max_missing is not None else None
+        except ValueError:
+            return jsonify({"error": "Invalid limit or max_missing"}), 400
+
+        try:
+            results = ingredients.get().query(
+                on_hand,
+                user_email=request.args.get("user_email"),
+                limit=limit,
+                max_missing=max_missing,
+            )
+            return jsonify({"items": results})
+        except Exception as e:
+            logger.error(f"Error ranking recipes for {on_hand}: {str(e)}")
+            return jsonify({"error": "Failed to rank recipes"}), 500
+
     @app.route("/")
     def index():
         return jsonify(
@@ -116,12 +620,60 @@ def create_app(config_name="default"):
     def health_check():
         return jsonify({"status": "healthy"}), 200
 
+    @app.route("/cache/stats")
+    def cache_stats():
+        return (
+            jsonify(
+                {
+                    "llm": llm_cache.stats() if llm_cache is not None else None,
+                    "http": fetcher.get().stats(),
+                }
+            ),
+            200,
+        )
+
+    @app.route("/metrics")
+    def prometheus_metrics():
+        """Prometheus metrics, summed over every gunicorn worker."""
+        return Response(
+            metrics.get().render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    @app.route("/recipes/<recipe_id>", methods=["GET"])
+    def get_recipe(recipe_id):
+        """Return one recipe, scaled to the servings parameter if given."""
+        servings = None
+        if "servings" in request.args:
+            try:
+                servings = int(request.args["servings"])
+            except ValueError:
+                servings = 0
+            if servings < 1:
+                return jsonify({"error": "Invalid servings"}), 400
+
+        try:
+            recipe = parser.get().table.get_item(Key={"id": recipe_id}).get("Item")
+        except Exception as e:
+            logger.error(f"Error fetching recipe {recipe_id}: {str(e)}")
+            return jsonify({"error": "Failed to fetch recipe"}), 500
+        if recipe is None:
+            return jsonify({"error": "Recipe not found"}), 404
+        if servings is None:
+            return jsonify(recipe)
+        try:
+            return jsonify(scale_recipe(recipe, servings))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 422
+
     @app.route("/recipes/<recipe_id>", methods=["DELETE"])
     def delete_recipe(recipe_id):
         try:
-            parser = RecipeParser(storage_type="dynamodb")
             # Delete the recipe from DynamoDB
-            parser.table.delete_item(Key={"id": recipe_id})
+            parser.get().table.delete_item(Key={"id": recipe_id})
+            search.get().remove(recipe_id)
+            ingredients.get().remove(recipe_id)
+            nutrition.get().remove(recipe_id)
             return jsonify({"message": "Recipe deleted successfully"}), 200
         except Exception as e:
             logger.error(f"Error deleting recipe {recipe_id}: {str(e)}")